@@ -0,0 +1,10 @@
+"""Analysis package for MiGUEL
+
+Contains studies that run on top of the dispatch, e.g. unmet load analytics, the Monte Carlo
+reliability assessment and the parameter sensitivity analysis.
+"""
+from .unmet_load import UnmetLoad, contiguous_intervals
+from .reliability import MonteCarlo
+from .sensitivity import SensitivityAnalysis
+
+__all__ = ["UnmetLoad", "contiguous_intervals", "MonteCarlo", "SensitivityAnalysis"]
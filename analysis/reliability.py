@@ -0,0 +1,265 @@
+import numpy as np
+import pandas as pd
+# MiGUEL modules
+from analysis.unmet_load import contiguous_intervals
+from components.grid import BlackoutSchedule
+from dispatch.base import DispatchState, get_strategy
+
+
+class MonteCarlo:
+    """
+    Monte Carlo reliability assessment
+    Stochastic realizations of load, RE production and grid blackouts are dispatched in batches with a
+    vectorizable dispatch strategy. Realizations are added until the reliability indicators converge.
+        LOLP: loss of load probability (share of time steps with unmet load)
+        LOLE: loss of load expectation [h]
+        ENS: energy not served [kWh]
+        Autonomy: supply duration of the local system during blackouts (grid connected) or between
+                  loss of load events (off grid) [h]
+    """
+
+    def __init__(self,
+                 env,
+                 strategy: str = 'vectorized-greedy',
+                 load_sigma: float = 0.1,
+                 re_sigma: float = 0.1,
+                 re_scale_sigma: float = 0.1,
+                 blackout_frequency: float = None,
+                 blackout_duration: float = None,
+                 duration: str = 'exponential',
+                 batch_size: int = 50,
+                 min_runs: int = 100,
+                 max_runs: int = 5000,
+                 tolerance: float = 0.02,
+                 seed: int = None,
+                 h2_policy: str = 'priority'):
+        """
+        :param env: environment.Environment
+            system environment
+        :param strategy: str
+            vectorizable dispatch strategy
+        :param load_sigma: float
+            standard deviation of the relative load deviation per time step
+        :param re_sigma: float
+            standard deviation of the relative RE production deviation per time step
+        :param re_scale_sigma: float
+            standard deviation of the relative RE production deviation per realization (e.g. weather year)
+        :param blackout_frequency: float
+            mean number of blackouts [1/a], None uses the environment blackout data
+        :param blackout_duration: float
+            mean blackout duration [h]
+        :param duration: str
+            blackout duration distribution ('exponential' or 'lognormal')
+        :param batch_size: int
+            realizations dispatched together
+        :param min_runs: int
+            minimum number of realizations
+        :param max_runs: int
+            maximum number of realizations
+        :param tolerance: float
+            relative standard error of mean LOLP and ENS for convergence
+        :param seed: int
+            random seed
+        :param h2_policy: str
+            allocation policy of the hydrogen subsystem
+        """
+        self.env = env
+        self.strategy = get_strategy(strategy) if isinstance(strategy, str) else strategy
+        if not self.strategy.vectorizable:
+            raise ValueError(f'Dispatch strategy {self.strategy.name} is not vectorizable.')
+        self.load_sigma = load_sigma
+        self.re_sigma = re_sigma
+        self.re_scale_sigma = re_scale_sigma
+        self.blackout_frequency = blackout_frequency
+        self.blackout_duration = blackout_duration
+        self.duration = duration
+        self.batch_size = batch_size
+        self.min_runs = min_runs
+        self.max_runs = max_runs
+        self.tolerance = tolerance
+        self.rng = np.random.default_rng(seed)
+        self.h2_policy = h2_policy
+        self.dt = env.i_step / 60
+        self.load = env.calc_load()
+        self.re_production = {re.name: np.nan_to_num(re.df['P [W]'].to_numpy(dtype=float))
+                              for re in env.re_supply}
+        self.results = pd.DataFrame(columns=['LOLP', 'LOLE [h]', 'ENS [kWh]', 'ENS [%]', 'Max outage [h]'])
+        self.autonomy = np.array([])
+        self.converged = False
+
+    ''' Stochastic realizations '''
+
+    def sample_load(self, runs: int):
+        """
+        :param runs: int
+        :return: np.ndarray
+            load [W] (runs x time steps)
+        """
+        noise = self.rng.normal(1, self.load_sigma, size=(runs, len(self.load)))
+
+        return self.load * np.clip(noise, 0, None)
+
+    def sample_re(self, runs: int):
+        """
+        :param runs: int
+        :return: dict
+            RE production [W] (runs x time steps)
+        """
+        scale = np.clip(self.rng.normal(1, self.re_scale_sigma, size=(runs, 1)), 0, None)
+        re_production = {}
+        for name, production in self.re_production.items():
+            noise = np.clip(self.rng.normal(1, self.re_sigma, size=(runs, len(production))), 0, None)
+            re_production[name] = production * scale * noise
+
+        return re_production
+
+    def sample_grid(self, runs: int):
+        """
+        :param runs: int
+        :return: np.ndarray
+            grid available (runs x time steps)
+        """
+        env = self.env
+        n = len(self.load)
+        if not env.grid_connection:
+            return np.zeros((runs, n), dtype=bool)
+        if self.blackout_frequency is not None:
+            blackout = BlackoutSchedule.sample_masks(time=env.time,
+                                                     runs=runs,
+                                                     frequency=self.blackout_frequency,
+                                                     mean_duration=self.blackout_duration,
+                                                     duration=self.duration,
+                                                     seed=self.rng)
+            return ~blackout
+        if env.blackout:
+            return np.tile(~env.df['Blackout'].to_numpy(dtype=bool), (runs, 1))
+
+        return np.ones((runs, n), dtype=bool)
+
+    ''' Simulation '''
+
+    def run_batch(self, runs: int):
+        """
+        Dispatch a batch of realizations
+        :param runs: int
+        :return: tuple
+            reliability indicators (pd.DataFrame), autonomy durations [h]
+        """
+        grid_available = self.sample_grid(runs)
+        state = DispatchState(env=self.env,
+                              load=self.sample_load(runs),
+                              re_production=self.sample_re(runs),
+                              grid_available=grid_available,
+                              h2_policy=self.h2_policy)
+        columns = self.strategy.dispatch(state=state)
+        p_res = np.asarray(columns['P_Res [W]'])
+
+        return self.indicators(p_res=p_res, load=state.load, grid_available=grid_available)
+
+    def indicators(self, p_res: np.ndarray, load: np.ndarray, grid_available: np.ndarray):
+        """
+        Calculate reliability indicators per realization
+        :param p_res: np.ndarray
+            unmet load [W] (runs x time steps)
+        :param load: np.ndarray
+            load [W] (runs x time steps)
+        :param grid_available: np.ndarray
+            grid available (runs x time steps)
+        :return: tuple
+            reliability indicators (pd.DataFrame), autonomy durations [h]
+        """
+        runs, n = p_res.shape
+        unmet = p_res > 1e-6
+        ens = p_res.sum(axis=1) * self.dt / 1000
+        energy = load.sum(axis=1) * self.dt / 1000
+        outages = contiguous_intervals(unmet)
+        max_outage = np.zeros(runs)
+        np.maximum.at(max_outage, outages[0], (outages[2] - outages[1]) * self.dt)
+        df = pd.DataFrame({'LOLP': unmet.mean(axis=1),
+                           'LOLE [h]': unmet.sum(axis=1) * self.dt,
+                           'ENS [kWh]': ens,
+                           'ENS [%]': np.divide(ens, energy, out=np.zeros(runs), where=energy > 0) * 100,
+                           'Max outage [h]': max_outage})
+        # Autonomy
+        if self.env.grid_connection:
+            run, start, end = contiguous_intervals(~grid_available)
+            # First time step with unmet load at or after each time step
+            position = np.where(unmet, np.arange(n), n)
+            next_unmet = np.minimum.accumulate(position[:, ::-1], axis=1)[:, ::-1]
+            autonomy = (np.minimum(next_unmet[run, start], end) - start) * self.dt
+        else:
+            run, start, end = contiguous_intervals(~unmet)
+            autonomy = (end - start) * self.dt
+
+        return df, autonomy
+
+    def run(self):
+        """
+        Run realizations in batches until LOLP and ENS converge or max_runs is reached
+        :return: pd.DataFrame
+            reliability indicators per realization
+        """
+        results = []
+        autonomy = []
+        runs = 0
+        self.converged = False
+        while runs < self.max_runs:
+            batch = min(self.batch_size, self.max_runs - runs)
+            df, durations = self.run_batch(runs=batch)
+            results.append(df)
+            autonomy.append(durations)
+            runs += batch
+            self.results = pd.concat(results, ignore_index=True)
+            if runs >= self.min_runs and self.check_convergence():
+                self.converged = True
+                break
+        self.autonomy = np.concatenate(autonomy) if autonomy else np.array([])
+
+        return self.results
+
+    def check_convergence(self):
+        """
+        Relative standard error of the mean LOLP and ENS below tolerance
+        :return: bool
+        """
+        for col in ['LOLP', 'ENS [kWh]']:
+            values = self.results[col].to_numpy(dtype=float)
+            mean = values.mean()
+            if mean <= 0:
+                continue
+            if values.std(ddof=1) / np.sqrt(len(values)) / mean > self.tolerance:
+                return False
+
+        return True
+
+    def summary(self):
+        """
+        Summarize reliability indicators
+        :return: pd.Series
+        """
+        df = self.results
+        autonomy = self.autonomy if len(self.autonomy) > 0 else np.array([0.0])
+
+        return pd.Series({'Realizations': len(df),
+                          'Converged': self.converged,
+                          'LOLP': df['LOLP'].mean(),
+                          'LOLE [h]': df['LOLE [h]'].mean(),
+                          'ENS [kWh]': df['ENS [kWh]'].mean(),
+                          'ENS P95 [kWh]': df['ENS [kWh]'].quantile(0.95),
+                          'ENS [%]': df['ENS [%]'].mean(),
+                          'Max outage [h]': df['Max outage [h]'].max(),
+                          'Autonomy median [h]': np.median(autonomy),
+                          'Autonomy P5 [h]': np.percentile(autonomy, 5)})
+
+    def autonomy_distribution(self, bins: int = 20):
+        """
+        Histogram of autonomy durations
+        :param bins: int
+        :return: pd.DataFrame
+        """
+        counts, edges = np.histogram(self.autonomy, bins=bins)
+
+        return pd.DataFrame({'From [h]': edges[:-1],
+                             'To [h]': edges[1:],
+                             'Count': counts,
+                             'Share [%]': counts / max(counts.sum(), 1) * 100})
@@ -0,0 +1,250 @@
+import numpy as np
+import pandas as pd
+
+
+class SensitivityAnalysis:
+    """
+    One-at-a-time sensitivity of LCOE, lifetime CO2 emissions and load coverage to component and
+    economic parameters
+    Every parameter is varied by +/- delta. Perturbations are grouped by the earliest simulation stage they
+    affect and the groups run from the last to the first stage on a single SimulationPipeline, so the stages
+    ahead of a group are computed once and shared by all of its runs:
+        evaluation: economic parameters (dispatch is reused)
+        hydrogen: electrolyser, H2 storage and fuel cell parameters (RE self supply and storage stage reused)
+        storage: energy storage and grid parameters (RE self supply reused)
+        yield: RE nominal power, RE production is scaled (weather data reused)
+    Results are elasticities (relative change of the result / relative change of the parameter), e.g. for
+    tornado charts.
+    """
+
+    # Stage groups in run order
+    groups = ('evaluation', 'hydrogen', 'storage', 'yield')
+    # Component lists of the environment by stage
+    component_stages = {'storage': 'storage', 'grid': 'storage',
+                        'electrolyser': 'hydrogen', 'H2Storage': 'hydrogen', 'fuel_cell': 'hydrogen',
+                        'pv': 'yield', 'wind_turbine': 'yield', 're_supply': 'yield'}
+    # Size dependent economic and ecological values (scaled with sizing parameters)
+    size_attributes = ('c_invest', 'c_op_main', 'co2_init')
+    # Results
+    metrics = ('LCOE [US$/kWh]', 'Lifetime CO2 emissions [t]', 'Coverage [-]')
+
+    def __init__(self,
+                 env,
+                 parameters: list = None,
+                 delta: float = 0.1,
+                 strategy: str = 'vectorized-greedy',
+                 h2_policy: str = 'priority'):
+        """
+        :param env: environment.Environment
+            system environment
+        :param parameters: list
+            parameters as dict {'component': environment list name (None for environment parameters),
+                                'index': position in the list, 'attribute': parameter name,
+                                'label': name in the results (optional)},
+            defaults to storage capacities, electrolyser and fuel cell power, discount rate and CO2 price
+        :param delta: float
+            relative parameter variation
+        :param strategy: str
+            dispatch strategy (vectorized-greedy shares the storage stage)
+        :param h2_policy: str
+            allocation policy of the hydrogen subsystem
+        """
+        # pipeline imports operation, which imports the analysis package
+        from pipeline import SimulationPipeline
+
+        self.env = env
+        self.delta = delta
+        self.parameters = self.default_parameters() if parameters is None else [dict(p) for p in parameters]
+        self.pipeline = SimulationPipeline(env=env,
+                                           strategy=strategy,
+                                           h2_policy=h2_policy,
+                                           export=False)
+        for parameter in self.parameters:
+            parameter.setdefault('component', None)
+            parameter.setdefault('index', 0)
+            parameter.setdefault('label', self.label(parameter))
+        self.baseline = None
+        self.results = None
+        self.stages_run = {}
+
+    ''' Parameters '''
+
+    def default_parameters(self):
+        """
+        :return: list
+            parameters of the system components
+        """
+        parameters = [{'component': 'storage', 'index': i, 'attribute': 'c'} for i in range(len(self.env.storage))]
+        parameters += [{'component': 'electrolyser', 'index': i, 'attribute': 'p_n'}
+                       for i in range(len(self.env.electrolyser))]
+        parameters += [{'component': 'fuel_cell', 'index': i, 'attribute': 'max_power'}
+                       for i in range(len(self.env.fuel_cell))]
+        parameters += [{'component': None, 'attribute': 'd_rate'},
+                       {'component': None, 'attribute': 'avg_co2_price'}]
+
+        return parameters
+
+    def target(self, parameter: dict):
+        """
+        :param parameter: dict
+        :return: object
+            environment or component of the parameter
+        """
+        if parameter['component'] is None:
+            return self.env
+        components = getattr(self.env, parameter['component'])
+        if isinstance(components, list):
+            return components[parameter['index']]
+
+        return components
+
+    def label(self, parameter: dict):
+        """
+        :param parameter: dict
+        :return: str
+        """
+        if parameter['component'] is None:
+            return parameter['attribute']
+
+        return f'{self.target(parameter).name} {parameter["attribute"]}'
+
+    def stage(self, parameter: dict):
+        """
+        Earliest simulation stage affected by the parameter
+        :param parameter: dict
+        :return: str
+        """
+        if parameter['component'] is None:
+            return 'evaluation'
+        stage = self.component_stages.get(parameter['component'], 'hydrogen')
+        if stage == 'yield':
+            return 'yield' if parameter['attribute'] == 'p_n' else 'evaluation'
+        if parameter['attribute'] not in self.pipeline.dispatch_attributes:
+            return 'evaluation'
+
+        return stage
+
+    def apply(self, parameter: dict, factor: float):
+        """
+        Scale parameter
+        :param parameter: dict
+        :param factor: float
+        :return: dict
+            original values (see restore)
+        """
+        target = self.target(parameter)
+        attribute = parameter['attribute']
+        original = {attribute: getattr(target, attribute)}
+        setattr(target, attribute, original[attribute] * factor)
+        if self.stage(parameter) != 'evaluation':
+            # Sizing parameter: investment, operation cost and initial emissions scale with the size
+            for key in self.size_attributes:
+                value = getattr(target, key, None)
+                if isinstance(value, (int, float)):
+                    original[key] = value
+                    setattr(target, key, value * factor)
+        if self.stage(parameter) == 'yield':
+            original['df'] = target.df
+            target.df = target.df.copy()
+            target.df['P [W]'] = target.df['P [W]'] * factor
+
+        return original
+
+    def restore(self, parameter: dict, original: dict):
+        """
+        :param parameter: dict
+        :param original: dict
+            values returned by apply
+        :return: None
+        """
+        target = self.target(parameter)
+        for key, value in original.items():
+            setattr(target, key, value)
+
+    ''' Simulation '''
+
+    def evaluate(self):
+        """
+        Run pipeline and collect results
+        :return: dict
+            metric: value
+        """
+        self.pipeline.last_run = []
+        operator, evaluation = self.pipeline.run()
+        for stage in self.pipeline.last_run:
+            self.stages_run[stage] = self.stages_run.get(stage, 0) + 1
+        system = evaluation.evaluation_df.loc['System']
+        energy = operator.energy_consumption
+        coverage = 1 - operator.unmet_load.energy / energy if energy > 0 else np.nan
+
+        return dict(zip(self.metrics, (float(system['LCOE [US$/kWh]']),
+                                       float(system['Lifetime CO2 emissions [t]']),
+                                       float(coverage))))
+
+    def run(self):
+        """
+        Run baseline and perturbed simulations
+        :return: pd.DataFrame
+            parameter value, results at -delta and +delta and elasticities per parameter
+        """
+        self.stages_run = {}
+        self.baseline = self.evaluate()
+        rows = {}
+        for group in self.groups:
+            for parameter in self.parameters:
+                if self.stage(parameter) != group:
+                    continue
+                value = getattr(self.target(parameter), parameter['attribute'])
+                row = {'Stage': group, 'Value': value}
+                results = {}
+                for sign, factor in (('-', 1 - self.delta), ('+', 1 + self.delta)):
+                    original = self.apply(parameter=parameter, factor=factor)
+                    try:
+                        results[sign] = self.evaluate()
+                    finally:
+                        self.restore(parameter=parameter, original=original)
+                for metric in self.metrics:
+                    row[f'{metric} -'] = results['-'][metric]
+                    row[f'{metric} +'] = results['+'][metric]
+                    row[f'Elasticity {metric}'] = self.elasticity(low=results['-'][metric],
+                                                                  high=results['+'][metric],
+                                                                  base=self.baseline[metric],
+                                                                  value=value)
+                rows[parameter['label']] = row
+        self.results = pd.DataFrame.from_dict(rows, orient='index')
+
+        return self.results
+
+    def elasticity(self, low: float, high: float, base: float, value: float):
+        """
+        Central difference elasticity
+        :param low: float
+            result at -delta
+        :param high: float
+            result at +delta
+        :param base: float
+            baseline result
+        :param value: float
+            baseline parameter value
+        :return: float
+            NaN for baseline result or parameter value 0
+        """
+        if base == 0 or value == 0 or not np.isfinite(base):
+            return np.nan
+
+        return ((high - low) / base) / (2 * self.delta)
+
+    def tornado(self, metric: str = 'LCOE [US$/kWh]'):
+        """
+        Results sorted by the impact on metric
+        :param metric: str
+        :return: pd.DataFrame
+            low and high result per parameter
+        """
+        if self.results is None:
+            self.run()
+        df = self.results[[f'{metric} -', f'{metric} +']].copy()
+        df.columns = ['Low', 'High']
+        order = (df['High'] - df['Low']).abs().sort_values(ascending=False).index
+
+        return df.loc[order]
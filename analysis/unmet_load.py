@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+
+def contiguous_intervals(mask: np.ndarray):
+    """
+    Contiguous True intervals per row
+    :param mask: np.ndarray
+        (time steps) or (runs x time steps)
+    :return: tuple
+        row, start, end (exclusive) per interval
+    """
+    mask = np.atleast_2d(np.asarray(mask, dtype=bool))
+    runs, n = mask.shape
+    padded = np.zeros((runs, n + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    row, start = np.nonzero(edges == 1)
+    _, end = np.nonzero(edges == -1)
+
+    return row, start, end
+
+
+class UnmetLoad:
+    """
+    Unmet load analytics of a dispatch result
+    Time steps with residual load are grouped into contiguous outage intervals with duration, energy and
+    peak power. Monthly and hourly aggregates are derived from the same residual array.
+    """
+
+    def __init__(self,
+                 p_res: pd.Series,
+                 t_step: float,
+                 threshold: float = 0.01):
+        """
+        :param p_res: pd.Series
+            residual (unmet) load [W] with time index
+        :param t_step: float
+            time step [h]
+        :param threshold: float
+            minimum unmet power [W]
+        """
+        self.t_step = t_step
+        self.threshold = threshold
+        self.time = pd.DatetimeIndex(p_res.index)
+        self.p_res = np.nan_to_num(p_res.to_numpy(dtype=float))
+        self.mask = self.p_res > threshold
+        self.unmet = np.where(self.mask, self.p_res, 0)
+        self.events = self.build_events()
+
+    def build_events(self):
+        """
+        Group unmet load time steps into outage intervals
+        :return: pd.DataFrame
+            Start, End, Duration [h], Energy [kWh], Peak [W] per interval
+        """
+        _, start, end = contiguous_intervals(self.mask)
+        columns = ['Start', 'End', 'Duration [h]', 'Energy [kWh]', 'Peak [W]']
+        if len(start) == 0:
+            return pd.DataFrame(columns=columns)
+        energy = np.add.reduceat(self.unmet, start)
+        peak = np.maximum.reduceat(self.unmet, start)
+        # reduceat sums up to the next start, time steps in between are zero
+        stamps = self.time.append(pd.DatetimeIndex([self.time[-1] + pd.Timedelta(hours=self.t_step)]))
+
+        return pd.DataFrame({'Start': stamps[start],
+                             'End': stamps[end],
+                             'Duration [h]': (end - start) * self.t_step,
+                             'Energy [kWh]': energy * self.t_step / 1000,
+                             'Peak [W]': np.round(peak, 2)},
+                            columns=columns)
+
+    @property
+    def covered(self):
+        """
+        :return: bool
+            load covered in all time steps
+        """
+        return not self.mask.any()
+
+    @property
+    def max_power(self):
+        """
+        :return: float
+            maximum unmet power [W]
+        """
+        return round(float(self.unmet.max()), 2) if len(self.unmet) > 0 else 0.0
+
+    @property
+    def energy(self):
+        """
+        :return: float
+            energy not served [kWh]
+        """
+        return float(self.unmet.sum() * self.t_step / 1000)
+
+    @property
+    def hours(self):
+        """
+        :return: float
+            hours with unmet load [h]
+        """
+        return float(self.mask.sum() * self.t_step)
+
+    @property
+    def power_sink(self):
+        """
+        Unmet power in time steps with unmet load
+        :return: pd.DataFrame
+        """
+        return pd.DataFrame({'P [W]': np.round(self.unmet[self.mask], 2)},
+                            index=pd.Index(self.time[self.mask], name='Time'))
+
+    def heatmap(self, value: str = 'energy'):
+        """
+        Month x hour of day aggregate
+        :param value: str
+            'energy': energy not served [kWh]
+            'hours': hours with unmet load [h]
+        :return: pd.DataFrame
+        """
+        grid = np.zeros((12, 24))
+        weights = self.unmet * self.t_step / 1000 if value == 'energy' else self.mask * self.t_step
+        np.add.at(grid, (self.time.month - 1, self.time.hour), weights)
+
+        return pd.DataFrame(grid, index=pd.Index(range(1, 13), name='Month'), columns=range(24))
+
+    def monthly(self):
+        """
+        Monthly aggregate
+        :return: pd.DataFrame
+        """
+        energy = self.heatmap(value='energy').sum(axis=1)
+        hours = self.heatmap(value='hours').sum(axis=1)
+        events = self.events.groupby(pd.DatetimeIndex(self.events['Start']).month).size() \
+            if len(self.events) > 0 else pd.Series(dtype=int)
+
+        return pd.DataFrame({'Energy [kWh]': energy,
+                             'Hours [h]': hours,
+                             'Events': events.reindex(energy.index, fill_value=0)})
+
+    def summary(self):
+        """
+        :return: pd.Series
+        """
+        duration = self.events['Duration [h]']
+
+        return pd.Series({'Covered': self.covered,
+                          'Events': len(self.events),
+                          'Hours [h]': self.hours,
+                          'Energy [kWh]': self.energy,
+                          'Max power [W]': self.max_power,
+                          'Longest event [h]': float(duration.max()) if len(duration) > 0 else 0.0,
+                          'LOLP': float(self.mask.mean()) if len(self.mask) > 0 else 0.0})
@@ -0,0 +1,403 @@
+"""
+Headless batch runs of MiGUEL system specifications
+
+    python batch.py run system.json --output results
+    python batch.py manifest runs.json --workers 4
+
+A system specification (JSON) declares location, time, economy, ecology, grid and components:
+
+    {"name": "Off grid system",
+     "location": {"latitude": -3.53, "longitude": -64.41, "altitude": 50, "terrain": "..."},
+     "time": {"start": "2024-01-01 00:00", "end": "2024-12-30 23:59", "step": 60, "timezone": "Etc/GMT-4"},
+     "economy": {"d_rate": 0.03, "lifetime": 20, "electricity_price": 0.15, "currency": "US$"},
+     "ecology": {"co2_grid": 0.098},
+     "grid_connection": false,
+     "tariff": {"import_price": 0.12, "periods": [{"price": 0.25, "hours": ["17:00", "21:00"]}],
+                "demand_charge": 8.0, "export_price": 0.05, "export_cap": 20000},
+     "csv_sep": ";", "csv_decimal": ",",
+     "load": {"load_profile": "load.csv", "time_format": "%d.%m.%Y %H:%M"},
+     "flexible_load": [{"p_n": 5000, "energy": 20000, "windows": [["08:00", "18:00"]]}],
+     "pv": [{"p_n": 100000, "pv_profile": "re.csv", "column": "PV [W]"}],
+     "storage": [{"p_n": 550000, "c": 850000, "soc": 0.25}],
+     "electrolyser": [...], "h2_storage": [...], "fuel_cell": [...],
+     "diesel_generator": [{"p_n": 50000, "fuel_consumption": 14, "min_runtime": 2}],
+     "dispatch": {"strategy": "vectorized-greedy", "h2_policy": "priority"}}
+
+A manifest lists runs with a specification (file or inline) and optional parameter overrides:
+
+    {"output": "results",
+     "runs": [{"name": "base", "spec": "system.json"},
+              {"name": "large_storage", "spec": "system.json", "set": {"storage.0.c": 1200000}}]}
+
+Relative file paths are resolved against the directory of the specification. Remote services
+(elevation, geocoding, PVGIS weather data) are only used with --online. With --cache, results of
+identical specifications are taken from a persistent result cache (cache.ResultCache). Results of each run are
+written to <output>/<name>: spec.json, operator.csv, evaluation.csv, summary.json (error.txt on failure).
+The exit code is 1 if any run failed.
+"""
+import os
+import sys
+import json
+import time
+import copy
+import argparse
+import traceback
+import datetime as dt
+from concurrent.futures import ProcessPoolExecutor
+
+# Project root on sys.path (export paths of the MiGUEL modules refer to sys.path[1])
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+
+''' Specification '''
+
+
+def load_json(path: str):
+    """
+    :param path: str
+    :return: dict
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def resolve_path(path: str, base_dir: str):
+    """
+    :param path: str
+    :param base_dir: str
+        directory of the specification
+    :return: str
+    """
+    if path is None or os.path.isabs(path):
+        return path
+
+    return os.path.normpath(os.path.join(base_dir, path))
+
+
+def apply_overrides(spec: dict, overrides: dict):
+    """
+    Set specification values by dotted path (e.g. 'storage.0.c', 'economy.d_rate')
+    :param spec: dict
+    :param overrides: dict
+        dotted path: value
+    :return: dict
+        modified copy of spec
+    """
+    spec = copy.deepcopy(spec)
+    for key, value in (overrides or {}).items():
+        target = spec
+        parts = key.split('.')
+        for part in parts[:-1]:
+            target = target[int(part)] if isinstance(target, list) else target.setdefault(part, {})
+        last = parts[-1]
+        if isinstance(target, list):
+            target[int(last)] = value
+        else:
+            target[last] = value
+
+    return spec
+
+
+def parse_time(time: dict):
+    """
+    :param time: dict
+        start, end (ISO format), step [min], timezone
+    :return: dict
+        Environment time parameters
+    """
+    return {'start': dt.datetime.fromisoformat(time['start']),
+            'end': dt.datetime.fromisoformat(time['end']),
+            'step': dt.timedelta(minutes=time.get('step', 60)),
+            'timezone': time.get('timezone')}
+
+
+def read_profile(component: dict, base_dir: str, key: str, sep: str, decimal: str):
+    """
+    Read power profile of a component from csv
+    :param component: dict
+        component specification with profile file and optional column, time_format and dayfirst
+    :param base_dir: str
+    :param key: str
+        profile key ('pv_profile', 'wt_profile')
+    :param sep: str
+    :param decimal: str
+    :return: pd.Series
+    """
+    from profiles import read_profile, DAYFIRST
+
+    path = resolve_path(component[key], base_dir)
+    df = read_profile(path=path,
+                      sep=sep,
+                      decimal=decimal,
+                      time_format=component.get('time_format'),
+                      dayfirst=component.get('dayfirst', DAYFIRST))
+    column = component.get('column', df.columns[0])
+
+    return df[column].astype(float)
+
+
+def build_environment(spec: dict, base_dir: str = '.', online: bool = False):
+    """
+    Create Environment with components from specification
+    :param spec: dict
+        system specification
+    :param base_dir: str
+        directory for relative file paths
+    :param online: bool
+        allow requests to remote services
+    :return: environment.Environment
+    """
+    from environment import Environment
+    from components.grid import Tariff
+
+    sep = spec.get('csv_sep', ',')
+    decimal = spec.get('csv_decimal', '.')
+    env = Environment(name=spec.get('name', 'MiGUEL system'),
+                      location=spec['location'],
+                      time=parse_time(spec['time']),
+                      economy=spec.get('economy'),
+                      ecology=spec.get('ecology'),
+                      grid_connection=spec.get('grid_connection', False),
+                      feed_in=spec.get('feed_in', False),
+                      blackout=spec.get('blackout', False),
+                      blackout_data=resolve_path(spec.get('blackout_data'), base_dir),
+                      weather_data=resolve_path(spec.get('weather_data'), base_dir),
+                      csv_sep=sep,
+                      csv_decimal=decimal,
+                      offline=not online)
+    if spec.get('tariff') is not None:
+        env.set_tariff(Tariff(**spec['tariff']))
+    # Single load or list of loads
+    loads = spec.get('load', {})
+    for load in (loads if isinstance(loads, list) else [loads]):
+        load = dict(load)
+        if 'load_profile' in load:
+            load['load_profile'] = resolve_path(load['load_profile'], base_dir)
+        env.add_load(**load)
+    for flexible_load in spec.get('flexible_load', []):
+        env.add_flexible_load(**flexible_load)
+    for pv in spec.get('pv', []):
+        pv = dict(pv)
+        if 'pv_profile' in pv:
+            pv['pv_profile'] = read_profile(pv, base_dir, 'pv_profile', sep, decimal)
+        pv.pop('column', None)
+        pv.pop('dayfirst', None)
+        pv.pop('time_format', None)
+        env.add_pv(**pv)
+    for wt in spec.get('wind_turbine', []):
+        wt = dict(wt)
+        if 'wt_profile' in wt:
+            wt['wt_profile'] = read_profile(wt, base_dir, 'wt_profile', sep, decimal)
+        wt.pop('column', None)
+        wt.pop('dayfirst', None)
+        wt.pop('time_format', None)
+        env.add_wind_turbine(**wt)
+    for es in spec.get('storage', []):
+        env.add_storage(**es)
+    for el in spec.get('electrolyser', []):
+        env.add_electrolyser(**el)
+    for hs in spec.get('h2_storage', []):
+        env.add_H2_Storage(**hs)
+    for fc in spec.get('fuel_cell', []):
+        env.add_fuel_cell(**fc)
+    for dg in spec.get('diesel_generator', []):
+        env.add_diesel_generator(**dg)
+
+    return env
+
+
+''' Runs '''
+
+
+def run_spec(name: str, spec: dict, base_dir: str, output: str, online: bool = False, cache: str = None):
+    """
+    Run Environment -> Operator -> Evaluation for one specification and write results
+    :param name: str
+        run name (result directory)
+    :param spec: dict
+        system specification
+    :param base_dir: str
+        directory for relative file paths
+    :param output: str
+        output directory
+    :param online: bool
+        allow requests to remote services
+    :param cache: str
+        result cache directory
+    :return: dict
+        run summary
+    """
+    run_dir = os.path.join(output, name)
+    os.makedirs(run_dir, exist_ok=True)
+    if os.path.exists(os.path.join(run_dir, 'error.txt')):
+        os.remove(os.path.join(run_dir, 'error.txt'))
+    with open(os.path.join(run_dir, 'spec.json'), 'w', encoding='utf-8') as file:
+        json.dump(spec, file, indent=2)
+    summary = {'Run': name, 'Status': 'failed'}
+    start = time.perf_counter()
+    try:
+        from pipeline import SimulationPipeline
+        from cache import ResultCache
+        dispatch = spec.get('dispatch', {})
+        env = build_environment(spec=spec, base_dir=base_dir, online=online)
+        pipeline = SimulationPipeline(env=env,
+                                      strategy=dispatch.get('strategy', 'vectorized-greedy'),
+                                      h2_policy=dispatch.get('h2_policy', 'priority'),
+                                      cache=ResultCache(path=cache) if cache is not None else None,
+                                      export=False)
+        operator = pipeline.dispatch()
+        sep = env.csv_sep
+        decimal = env.csv_decimal
+        operator.df.to_csv(os.path.join(run_dir, 'operator.csv'), sep=sep, decimal=decimal)
+        summary.update({'Energy consumption [kWh]': float(operator.energy_consumption),
+                        'Peak load [W]': float(operator.peak_load),
+                        'Unmet energy [kWh]': operator.unmet_load.energy,
+                        'Unmet hours [h]': operator.unmet_load.hours})
+        if spec.get('evaluate', True):
+            evaluation = pipeline.evaluate()
+            evaluation.evaluation_df.to_csv(os.path.join(run_dir, 'evaluation.csv'), sep=sep, decimal=decimal)
+            if 'System' in evaluation.evaluation_df.index:
+                for key, value in evaluation.evaluation_df.loc['System'].items():
+                    if isinstance(value, (int, float)) and not pd.isna(value):
+                        summary[key] = float(value)
+        summary['Cached'] = 'cache' in pipeline.last_run
+        summary['Status'] = 'finished'
+    except Exception:
+        error = traceback.format_exc()
+        with open(os.path.join(run_dir, 'error.txt'), 'w', encoding='utf-8') as file:
+            file.write(error)
+        summary['Error'] = error.strip().splitlines()[-1]
+    summary['Runtime [s]'] = round(time.perf_counter() - start, 3)
+    with open(os.path.join(run_dir, 'summary.json'), 'w', encoding='utf-8') as file:
+        json.dump(summary, file, indent=2)
+
+    return summary
+
+
+def read_manifest(path: str):
+    """
+    Read manifest and resolve run specifications
+    :param path: str
+    :return: tuple
+        output directory, list of (name, spec, base_dir)
+    """
+    manifest = load_json(path)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    output = resolve_path(manifest.get('output', 'results'), base_dir)
+    runs = []
+    for i, run in enumerate(manifest['runs']):
+        spec = run['spec']
+        spec_dir = base_dir
+        if isinstance(spec, str):
+            spec_path = resolve_path(spec, base_dir)
+            spec_dir = os.path.dirname(spec_path)
+            spec = load_json(spec_path)
+        name = run.get('name', f'run_{i + 1}')
+        runs.append((name, apply_overrides(spec, run.get('set')), spec_dir))
+    names = [name for name, _, _ in runs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f'Duplicate run names in manifest: {duplicates}')
+
+    return output, runs
+
+
+def run_batch(runs: list, output: str, workers: int = 1, online: bool = False, cache: str = None):
+    """
+    Run specifications in parallel worker processes
+    :param runs: list
+        (name, spec, base_dir)
+    :param output: str
+        output directory
+    :param workers: int
+        number of worker processes
+    :param online: bool
+        allow requests to remote services
+    :param cache: str
+        result cache directory
+    :return: pd.DataFrame
+        run summaries
+    """
+    os.makedirs(output, exist_ok=True)
+    if workers <= 1:
+        summaries = [run_spec(name, spec, base_dir, output, online, cache) for name, spec, base_dir in runs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_spec, name, spec, base_dir, output, online, cache)
+                       for name, spec, base_dir in runs]
+            summaries = []
+            for (name, _, _), future in zip(runs, futures):
+                try:
+                    summaries.append(future.result())
+                except Exception as e:
+                    # Worker process crashed
+                    summaries.append({'Run': name, 'Status': 'failed', 'Error': repr(e)})
+    df = pd.DataFrame(summaries).set_index('Run')
+    df.to_csv(os.path.join(output, 'summary.csv'))
+
+    return df
+
+
+''' Command line '''
+
+
+def parse_args(argv: list = None):
+    """
+    :param argv: list
+    :return: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(prog='batch.py',
+                                     description='Headless MiGUEL runs from system specifications')
+    parser.add_argument('--online', action='store_true',
+                        help='allow requests to remote services (elevation, geocoding, PVGIS)')
+    parser.add_argument('--cache', default=None,
+                        help='result cache directory (identical specifications are not simulated again)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='run system specifications')
+    run.add_argument('specs', nargs='+', help='system specification files (.json)')
+    run.add_argument('--output', '-o', default='results', help='output directory')
+    run.add_argument('--workers', '-j', type=int, default=1, help='parallel worker processes')
+    manifest = commands.add_parser('manifest', help='run all specifications of a manifest')
+    manifest.add_argument('manifest', help='manifest file (.json)')
+    manifest.add_argument('--output', '-o', default=None, help='output directory (overrides manifest)')
+    manifest.add_argument('--workers', '-j', type=int, default=os.cpu_count(), help='parallel worker processes')
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list = None):
+    """
+    :param argv: list
+        command line arguments
+    :return: int
+        exit code (0: all runs finished, 1: failed runs)
+    """
+    args = parse_args(argv)
+    if args.command == 'run':
+        output = args.output
+        runs = []
+        for path in args.specs:
+            name = os.path.splitext(os.path.basename(path))[0]
+            runs.append((name, load_json(path), os.path.dirname(os.path.abspath(path))))
+    else:
+        output, runs = read_manifest(args.manifest)
+        if args.output is not None:
+            output = args.output
+    summary = run_batch(runs=runs,
+                        output=output,
+                        workers=args.workers,
+                        online=args.online,
+                        cache=args.cache)
+    failed = summary[summary['Status'] != 'finished']
+    print(summary.to_string())
+    if len(failed) > 0:
+        print(f'{len(failed)} of {len(summary)} runs failed.', file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
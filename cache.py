@@ -0,0 +1,256 @@
+import os
+import glob
+import pickle
+import hashlib
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# MiGUEL packages contributing to the code version
+SOURCE_PATTERNS = ('*.py', 'components/*.py', 'dispatch/*.py', 'analysis/*.py')
+
+_code_version = None
+
+
+def code_version():
+    """
+    Hash of the MiGUEL source files (results of other code versions are not reused)
+    :return: str
+    """
+    global _code_version
+    if _code_version is None:
+        sha = hashlib.sha1()
+        for pattern in SOURCE_PATTERNS:
+            for path in sorted(glob.glob(os.path.join(ROOT, pattern))):
+                sha.update(os.path.relpath(path, ROOT).encode())
+                with open(path, 'rb') as file:
+                    sha.update(file.read())
+        _code_version = sha.hexdigest()
+
+    return _code_version
+
+
+class ResultCache:
+    """
+    Content-addressed store of simulation results
+    Entries are keyed by a hash of the complete system specification (time grid, location, weather data,
+    load and RE profiles, component parameters, dispatch strategy, economic parameters, code version)
+    and contain the Operator result arrays, the Evaluation results and the dispatched component states.
+    The least recently used entries are removed once the store exceeds max_size.
+    """
+
+    # Component DataFrames changed by the dispatch
+    component_frames = ('df', 'df_electrolyser', 'hstorage_df', 'df_fc')
+    # Component states changed by the dispatch (scalars, storage cycle counts and aging)
+    component_states = ('current_level', 'operating_hours', 'q_remain', 'cycles', 'aging')
+
+    def __init__(self,
+                 path: str,
+                 max_size: float = 1024):
+        """
+        :param path: str
+            cache directory
+        :param max_size: float
+            maximum size of all entries [MB]
+        """
+        self.path = path
+        self.max_size = max_size * 1024 ** 2
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.path, exist_ok=True)
+
+    ''' Keys '''
+
+    @staticmethod
+    def hash_frame(df: pd.DataFrame):
+        """
+        :param df: pd.DataFrame
+        :return: str
+        """
+        if df is None or len(df) == 0:
+            return None
+
+        return hashlib.sha1(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes()).hexdigest()
+
+    def key(self, pipeline):
+        """
+        Cache key of the pipeline environment and settings
+        :param pipeline: pipeline.SimulationPipeline
+        :return: str
+        """
+        env = pipeline.env
+        weather = env.weather_data[0] if isinstance(env.weather_data, tuple) else env.weather_data
+
+        return pipeline.hash_values(code_version(),
+                                    pipeline.fingerprint('evaluation'),
+                                    str(env.t_start), str(env.t_end), env.i_step, env.timezone,
+                                    env.latitude, env.longitude, env.altitude,
+                                    self.hash_frame(weather))
+
+    def file(self, key: str):
+        """
+        :param key: str
+        :return: str
+        """
+        return os.path.join(self.path, f'{key}.pkl')
+
+    ''' Store '''
+
+    def get(self, key: str):
+        """
+        :param key: str
+        :return: dict
+            cache entry, None if not cached
+        """
+        path = self.file(key)
+        try:
+            with open(path, 'rb') as file:
+                entry = pickle.load(file)
+            # Mark as recently used
+            os.utime(path)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        return entry
+
+    def put(self, key: str, operator, evaluation, components: list):
+        """
+        Store results
+        :param key: str
+        :param operator: operation.Operator
+        :param evaluation: evaluation.Evaluation
+        :param components: list
+            system components with dispatched states
+        :return: None
+        """
+        entry = self.result_entry(operator=operator, evaluation=evaluation)
+        entry['components'] = [self.component_state(component) for component in components]
+        path = self.file(key)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as file:
+            pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self.evict()
+
+    @staticmethod
+    def result_entry(operator, evaluation):
+        """
+        :param operator: operation.Operator
+        :param evaluation: evaluation.Evaluation
+            None if not evaluated
+        :return: dict
+            Operator result arrays and Evaluation results
+        """
+        df = operator.df
+        entry = {'index': pd.DatetimeIndex(df.index).to_numpy(),
+                 'columns': {col: df[col].to_numpy() for col in df.columns},
+                 'evaluation': None}
+        if evaluation is not None:
+            entry['evaluation'] = {name: value for name, value in vars(evaluation).items() if name not in ('env', 'op')}
+
+        return entry
+
+    def component_state(self, component):
+        """
+        :param component: component object
+        :return: dict
+            dispatched frames and states of the component
+        """
+        state = {}
+        for attribute in self.component_frames + self.component_states:
+            value = getattr(component, attribute, None)
+            if isinstance(value, pd.DataFrame):
+                state[attribute] = value.copy()
+            elif isinstance(value, (int, float, np.floating, tuple, dict)):
+                state[attribute] = value
+
+        return state
+
+    def restore(self, entry: dict, env, operator_class, evaluation_class, components: list, **kwargs):
+        """
+        Create Operator and Evaluation from a cache entry
+        :param entry: dict
+        :param env: environment.Environment
+        :param operator_class: operation.Operator
+        :param evaluation_class: evaluation.Evaluation
+        :param components: list
+            system components (order of the stored components)
+        :param kwargs:
+            Operator.from_results parameters
+        :return: tuple
+            operation.Operator, evaluation.Evaluation
+        """
+        for component, state in zip(components, entry['components']):
+            for attribute, value in state.items():
+                setattr(component, attribute, value.copy() if isinstance(value, pd.DataFrame) else value)
+
+        return self.restore_results(entry=entry,
+                                    env=env,
+                                    operator_class=operator_class,
+                                    evaluation_class=evaluation_class,
+                                    **kwargs)
+
+    @staticmethod
+    def restore_results(entry: dict, env, operator_class, evaluation_class, **kwargs):
+        """
+        Create Operator and Evaluation from result_entry without dispatch and evaluation
+        :param entry: dict
+        :param env: environment.Environment
+            dispatched environment
+        :param operator_class: operation.Operator
+        :param evaluation_class: evaluation.Evaluation
+        :param kwargs:
+            Operator.from_results parameters
+        :return: tuple
+            operation.Operator, evaluation.Evaluation (None if not evaluated)
+        """
+        df = pd.DataFrame(entry['columns'], index=pd.DatetimeIndex(entry['index']))
+        operator = operator_class.from_results(env=env, df=df, **kwargs)
+        if entry['evaluation'] is None:
+            return operator, None
+        evaluation = evaluation_class.__new__(evaluation_class)
+        evaluation.env = env
+        evaluation.op = operator
+        for key, value in entry['evaluation'].items():
+            setattr(evaluation, key, value)
+
+        return operator, evaluation
+
+    def size(self):
+        """
+        :return: int
+            size of all entries [bytes]
+        """
+        return sum(os.path.getsize(path) for path in glob.glob(os.path.join(self.path, '*.pkl')))
+
+    def evict(self):
+        """
+        Remove least recently used entries above max_size
+        :return: None
+        """
+        entries = []
+        for path in glob.glob(os.path.join(self.path, '*.pkl')):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """
+        Remove all entries
+        :return: None
+        """
+        for path in glob.glob(os.path.join(self.path, '*.pkl')):
+            os.remove(path)
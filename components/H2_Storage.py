@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import datetime as dt
 from components.electrolyser import Electrolyser
@@ -83,6 +84,19 @@ class H2Storage:
             'Initial Level [kg]': self.current_level,
         }
 
+    def output_schema(self):
+        """
+        Operator.df result columns of the component
+        :return: dict
+            column: initial value
+        """
+        return {f'{self.name} [W]': 0.0,
+                f'{self.name}: H2 Outflow [kg]': 0.0,
+                f'{self.name}: H2 Inflow [kg]': 0.0,
+                f'{self.name} _Storage Level [kg]': np.nan,
+                f'{self.name} SOC[%]': np.nan,
+                f'{self.name} level [kg]': np.nan}
+
     def charge(self, clock: dt.datetime, inflow: float, el: Electrolyser):
         """
         Charge the hydrogen storage.
@@ -0,0 +1,190 @@
+import numpy as np
+
+
+def turning_points(x: np.ndarray):
+    """
+    Reversals of a series (first and last value included), plateaus are merged
+    :param x: np.ndarray
+    :return: np.ndarray
+        values at the reversals
+    """
+    x = np.asarray(x, dtype=float)
+    if len(x) < 2:
+        return x
+    x = x[np.concatenate(([True], np.diff(x) != 0))]
+    if len(x) < 3:
+        return x
+    direction = np.sign(np.diff(x))
+    reversals = np.flatnonzero(direction[1:] != direction[:-1]) + 1
+
+    return np.concatenate((x[:1], x[reversals], x[-1:]))
+
+
+class RainflowCounter:
+    """
+    Streaming rainflow cycle counter (ASTM E1049 three point method)
+    Chunks of a series (e.g. the SOC of a multi-year dispatch) are reduced to their reversals (vectorized)
+    and passed through the counting stack, the open reversals are carried to the next chunk.
+    Memory and run time are O(n) in the series length.
+    """
+
+    def __init__(self):
+        self.stack = []
+        self.tail = np.empty(0)
+        self.started = False
+        self.full = []
+        self.half = []
+
+    def update(self, values: np.ndarray):
+        """
+        Count cycles of the next chunk
+        :param values: np.ndarray
+        :return: None
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        points = turning_points(np.concatenate((self.tail, values)))
+        # The first point of a continued series has already been counted, the last one is not yet confirmed
+        confirmed = points[1 if self.started else 0:-1]
+        self.tail = points[-2:] if len(points) > 1 else points
+        self.started = self.started or len(confirmed) > 0
+        self.count(confirmed)
+
+    def count(self, points: np.ndarray):
+        """
+        Pass reversals through the counting stack
+        :param points: np.ndarray
+            reversals
+        :return: None
+        """
+        stack = self.stack
+        full = self.full
+        half = self.half
+        for point in points.tolist():
+            stack.append(point)
+            while len(stack) >= 3:
+                x = abs(stack[-1] - stack[-2])
+                y = abs(stack[-2] - stack[-3])
+                if x < y:
+                    break
+                if len(stack) == 3:
+                    half.append(y)
+                    del stack[0]
+                else:
+                    full.append(y)
+                    del stack[-3:-1]
+
+    def finish(self):
+        """
+        Close the series: the last reversal passes the counting stack, residual reversals are counted as
+        half cycles
+        :return: tuple
+            ranges (np.ndarray), counts (np.ndarray, 1 full cycle / 0.5 half cycle)
+        """
+        # The first point of a series without confirmed reversals has not been counted yet
+        last = self.tail[-1:] if self.started else self.tail
+        self.count(last)
+        self.tail = np.empty(0)
+        self.started = self.started or len(last) > 0
+        half = self.half + np.abs(np.diff(self.stack)).tolist()
+        ranges = np.concatenate((np.asarray(self.full, dtype=float), np.asarray(half, dtype=float)))
+        counts = np.concatenate((np.ones(len(self.full)), np.full(len(half), 0.5)))
+        keep = ranges > 0
+
+        return ranges[keep], counts[keep]
+
+
+def count_cycles(values: np.ndarray, chunk_size: int = 1000000):
+    """
+    Rainflow cycle count of a series
+    :param values: np.ndarray
+    :param chunk_size: int
+        values per chunk
+    :return: tuple
+        ranges (np.ndarray), counts (np.ndarray)
+    """
+    counter = RainflowCounter()
+    for start in range(0, len(values), chunk_size):
+        counter.update(values[start:start + chunk_size])
+
+    return counter.finish()
+
+
+class BatteryDegradation:
+    """
+    Calendar and cycle aging of an energy storage
+    Cycle aging follows a Woehler curve: cycles to end of life at depth of discharge DoD
+        N(DoD) = cycle_life * (DoD / dod_ref) ** -k
+    and the damage of the rainflow cycles is summed up (Palmgren-Miner). Calendar aging is linear over the
+    calendar lifetime. The storage reaches its end of life (capacity eol * nominal capacity) at damage 1.
+    """
+
+    def __init__(self,
+                 calendar_life: float,
+                 cycle_life: float = 5000,
+                 dod_ref: float = 0.8,
+                 k: float = 1.3,
+                 eol: float = 0.8):
+        """
+        :param calendar_life: float
+            calendar lifetime [a]
+        :param cycle_life: float
+            cycles to end of life at dod_ref
+        :param dod_ref: float
+            reference depth of discharge of cycle_life
+        :param k: float
+            Woehler exponent
+        :param eol: float
+            remaining capacity at end of life
+        """
+        self.calendar_life = calendar_life
+        self.cycle_life = cycle_life
+        self.dod_ref = dod_ref
+        self.k = k
+        self.eol = eol
+
+    def cycle_damage(self, ranges: np.ndarray, counts: np.ndarray):
+        """
+        :param ranges: np.ndarray
+            cycle depth of discharge (SOC range)
+        :param counts: np.ndarray
+        :return: float
+            cycle damage
+        """
+        return float(np.sum(counts * (ranges / self.dod_ref) ** self.k) / self.cycle_life)
+
+    def run(self, ranges: np.ndarray, counts: np.ndarray, years: float, lifetime: int):
+        """
+        Aging of the counted cycles of the simulation period, extrapolated over the project lifetime
+        :param ranges: np.ndarray
+            cycle depth of discharge (see count_cycles)
+        :param counts: np.ndarray
+            cycle counts
+        :param years: float
+            length of the simulation period [a]
+        :param lifetime: int
+            project lifetime [a]
+        :return: dict
+            equivalent full cycles [1/a], cycle and calendar damage [1/a], years to end of life,
+            replacement years, state of health at the end of each project year
+        """
+        cycle_damage = self.cycle_damage(ranges=ranges, counts=counts) / years
+        calendar_damage = 1 / self.calendar_life if self.calendar_life > 0 else 0.0
+        damage = cycle_damage + calendar_damage
+        years_to_eol = 1 / damage if damage > 0 else np.inf
+        replacement_years = []
+        replacement = years_to_eol
+        while replacement < lifetime - 1:
+            replacement_years.append(max(int(round(replacement)), 1))
+            replacement += years_to_eol
+        year = np.arange(1, lifetime + 1)
+        soh = 1 - (1 - self.eol) * np.mod(year * damage, 1)
+
+        return {'equivalent_cycles': float(np.sum(counts * ranges) / years),
+                'cycle_damage': cycle_damage,
+                'calendar_damage': calendar_damage,
+                'years_to_eol': years_to_eol,
+                'replacement_years': replacement_years,
+                'soh': soh.tolist()}
@@ -0,0 +1,220 @@
+import numpy as np
+import pandas as pd
+
+# Lower heating value of diesel [kWh/l]
+LHV_DIESEL = 9.97
+
+
+class DieselGenerator:
+    """
+    Class to represent diesel generators
+    The generator covers the residual load as last priority of the dispatch. Part load fuel consumption follows
+    a relative fuel curve (fuel at load l relative to the fuel consumption at nominal power):
+        fc(l) = -1.66360855 l^4 + 3.96330272 l^3 - 3.19877674 l^2 + 1.8990825 l
+    Minimum load and minimum runtime are applied to the whole time series with array operations.
+    """
+
+    # Relative fuel curve coefficients (l^4 ... l^0)
+    fuel_curve = (-1.66360855, 3.96330272, -3.19877674, 1.8990825, 0.0)
+
+    def __init__(self,
+                 env,
+                 name: str = None,
+                 p_n: float = None,
+                 fuel_consumption: float = None,
+                 p_min: float = 0.3,
+                 min_runtime: float = 1,
+                 fuel_price: float = None,
+                 lifetime: int = 15,
+                 c_invest_n: float = 500,
+                 c_op_main_n: float = 20,
+                 c_var_n: float = 0.021,
+                 co2_init: float = 70,
+                 c_invest: float = None,
+                 c_op_main: float = None):
+        """
+        :param env: environment.Environment
+            generator Environment
+        :param name: str
+            generator name
+        :param p_n: float
+            nominal power [W]
+        :param fuel_consumption: float
+            fuel consumption at nominal power [l/h], defaults to 0.28 l/kWh
+        :param p_min: float
+            minimum load (share of nominal power)
+        :param min_runtime: float
+            minimum runtime after start [h]
+        :param fuel_price: float
+            fuel price [US$/l], defaults to env.diesel_price
+        :param lifetime: int
+            lifetime [a]
+        :param c_invest_n: float
+            specific investment cost [US$/kW]
+        :param c_op_main_n: float
+            operation and maintenance cost [US$/kW/a]
+        :param c_var_n: float
+            variable cost [US$/kWh]
+        :param co2_init: float
+            initial CO2-emissions during production [kg/kW]
+        """
+        self.env = env
+        self.name = name
+        self.p_n = p_n  # W
+        if fuel_consumption is None:
+            fuel_consumption = 0.28 * self.p_n / 1000
+        self.fuel_consumption = fuel_consumption  # l/h
+        self.p_min = p_min
+        self.min_runtime = min_runtime  # h
+        self.fuel_price = fuel_price
+        self.lifetime = lifetime  # a
+        self.operating_hours = 0.0
+        # Economical and ecological parameters
+        self.c_invest_n = c_invest_n  # US$/kW
+        self.c_op_main_n = c_op_main_n  # US$/kW/a
+        self.c_var_n = c_var_n  # US$/kWh
+        self.co2_init = co2_init * self.p_n / 1000  # kg
+        if c_invest is None:
+            self.c_invest = self.c_invest_n * self.p_n / 1000
+        else:
+            self.c_invest = c_invest
+        if c_op_main is None:
+            self.c_op_main = self.c_op_main_n * self.p_n / 1000
+        else:
+            self.c_op_main = c_op_main
+        self.replacement_parameters = self.calc_replacements()
+        self.replacement_cost = sum(self.replacement_parameters[0].values())
+        self.replacement_co2 = sum(self.replacement_parameters[1].values())
+
+        self.df = pd.DataFrame({'P [W]': np.zeros(len(self.env.time)),
+                                'Fuel [l]': np.zeros(len(self.env.time))},
+                               index=self.env.time)
+
+        # Dict with technical data
+        self.technical_data = {'Component': 'Diesel Generator',
+                               'Name': self.name,
+                               'Nominal Power [kW]': round(self.p_n / 1000, 3),
+                               f'Specific investment cost [{self.env.currency}/kW]': int(self.c_invest_n),
+                               f'Investment cost [{self.env.currency}]': int(self.c_invest),
+                               f'Specific operation maintenance cost [{self.env.currency}/kW]': int(self.c_op_main_n),
+                               f'Operation maintenance cost [{self.env.currency}/a]': int(self.c_op_main)}
+
+    def output_schema(self):
+        """
+        Operator.df result columns of the component
+        :return: dict
+            column: initial value
+        """
+        return {f'{self.name} [W]': 0.0,
+                f'{self.name} Fuel [l]': 0.0}
+
+    def calc_fuel(self, power: np.ndarray):
+        """
+        Part load fuel consumption
+        :param power: np.ndarray
+            generator power [W]
+        :return: np.ndarray
+            fuel consumption per time step [l]
+        """
+        load = np.clip(np.asarray(power, dtype=float) / self.p_n, 0, 1)
+
+        return self.fuel_consumption * np.polyval(self.fuel_curve, load) * self.env.i_step / 60
+
+    def last_start(self, running: np.ndarray, carry: tuple = None):
+        """
+        Position of the last start up to every time step
+        :param running: np.ndarray
+            generator requested in time step (runs x time steps)
+        :param carry: tuple
+            (requested in the last time step, remaining minimum runtime steps) of the previous chunk
+        :return: np.ndarray
+        """
+        steps = int(np.ceil(self.min_runtime * 60 / self.env.i_step))
+        requested, remaining = (False, 0) if carry is None else carry
+        n = running.shape[-1]
+        position = np.arange(n)
+        requested = np.broadcast_to(np.asarray(requested, dtype=bool)[..., None], running[..., :1].shape)
+        starts = running & ~np.concatenate((requested, running[..., :-1]), axis=-1)
+        # A start in the previous chunk lies remaining - steps before the first time step
+        initial = np.asarray(remaining)[..., None] - steps
+
+        return np.maximum.accumulate(np.where(starts, position, initial), axis=-1)
+
+    def min_runtime_steps(self, running: np.ndarray, carry: tuple = None):
+        """
+        Extend every start to the minimum runtime
+        :param running: np.ndarray
+            generator requested in time step (runs x time steps)
+        :param carry: tuple
+            (requested in the last time step, remaining minimum runtime steps) of the previous chunk
+        :return: np.ndarray
+            generator running in time step
+        """
+        steps = int(np.ceil(self.min_runtime * 60 / self.env.i_step))
+        if steps <= 1:
+            return running
+        position = np.arange(running.shape[-1])
+
+        return running | (position - self.last_start(running, carry=carry) < steps)
+
+    def runtime_carry(self, running: np.ndarray, carry: tuple = None):
+        """
+        Runtime state at the end of a chunk (chunked dispatch)
+        :param running: np.ndarray
+            generator requested in time step (runs x time steps)
+        :param carry: tuple
+            runtime state of the previous chunk
+        :return: tuple
+            requested in the last time step, remaining minimum runtime steps
+        """
+        n = running.shape[-1]
+        if n == 0:
+            return (False, 0) if carry is None else carry
+        steps = int(np.ceil(self.min_runtime * 60 / self.env.i_step))
+        if steps <= 1:
+            return running[..., -1].copy(), np.zeros(running.shape[:-1], dtype=int)
+        last = self.last_start(running, carry=carry)[..., -1]
+
+        return running[..., -1].copy(), np.clip(last + steps - n, 0, None)
+
+    def dispatch(self, p_res: np.ndarray, update: bool = True, carry: tuple = None):
+        """
+        Cover residual load
+        While running the generator operates at least at minimum load, power above the residual load is curtailed.
+        :param p_res: np.ndarray
+            residual load [W] (time steps or runs x time steps)
+        :param update: bool
+            write results to the component DataFrame
+        :param carry: tuple
+            runtime state of the previous chunk (see runtime_carry)
+        :return: tuple
+            load supply [W], generator power [W], fuel [l]
+        """
+        p_res = np.nan_to_num(np.asarray(p_res, dtype=float))
+        running = self.min_runtime_steps(p_res > 0, carry=carry)
+        power = np.where(running, np.clip(p_res, self.p_min * self.p_n, self.p_n), 0)
+        supply = np.minimum(power, np.clip(p_res, 0, None))
+        fuel = np.where(running, self.calc_fuel(power), 0)
+        if update:
+            # Multi-run arrays: the first run is written to the component
+            self.df['P [W]'] = np.atleast_2d(power)[0]
+            self.df['Fuel [l]'] = np.atleast_2d(fuel)[0]
+            self.operating_hours = np.count_nonzero(np.atleast_2d(running)[0]) * self.env.i_step / 60
+
+        return supply, power, fuel
+
+    def calc_replacements(self):
+        """
+        Calculate diesel generator replacement cost
+        :return: dict
+            replacement years + cost in US$
+        """
+        c_invest_replacement = {}
+        co2_replacement = {}
+        if self.lifetime <= 0:
+            return c_invest_replacement, co2_replacement
+        for year in range(int(self.lifetime), int(self.env.lifetime), int(self.lifetime)):
+            c_invest_replacement[year] = (self.c_invest_n * self.p_n / 1000) / ((1 + self.env.d_rate) ** year)
+            co2_replacement[year] = self.co2_init / ((1 + self.env.d_rate) ** year)
+
+        return c_invest_replacement, co2_replacement
@@ -1,8 +1,6 @@
 import pandas as pd
 import numpy as np
 import datetime as dt
-from scipy.interpolate import interp1d
-import matplotlib.pyplot as plt
 
 
 class Electrolyser:
@@ -59,6 +57,19 @@ class Electrolyser:
                                f'specific operation maintenance cost[US $/ kW]': int(self.c_op_main_n),
                                f'operation maintenance cost [US$/a]': int(self.c_op_main_n * self.p_n / 1000)}
 
+    def output_schema(self):
+        """
+        Operator.df result columns of the component
+        :return: dict
+            column: initial value
+        """
+        return {f'{self.name} [W]': 0.0,
+                f'{self.name} power [W]': 0.0,
+                f'{self.name}_Input_Power [W]': 0.0,
+                f'{self.name} [%]': 0.0,
+                f'{self.name}_Hydrogen [kg]': 0.0,
+                f'{self.name} Efficiency [%]': 0.0}
+
     def run (self,
              clock,
              power: float):
@@ -70,25 +81,29 @@ class Electrolyser:
                power[W]
         :return: clock power
         """
-        power = min(power, self.p_n)
-        p_relative = round(((power/self.p_n) * 100),2)
+        power, p_relative, efficiency, h2_production = self.calc_operating_point(power=power)
+        self.df_electrolyser.at[clock, 'Efficiency'] = round(efficiency, 2)
+        self.df_electrolyser.at[clock, 'P[W]'] = power
         self.df_electrolyser.at[clock, 'P[%]'] = p_relative
+        self.df_electrolyser.at[clock, 'H2_Production [kg]'] = h2_production
 
+    def calc_operating_point(self, power: float):
+        """
+        Calculate operating point of the electrolyser without logging
+        :param power: float
+            available input power [W]
+        :return: tuple
+            power [W], relative power [%], efficiency, H2 production [kg]
+        """
+        power = min(power, self.p_n)
+        p_relative = round(((power / self.p_n) * 100), 2)
         efficiency = self.calc_efficiency(p_rel=p_relative)
-        print(f"EFFICIENCY ELEKTROLYSEUR :{efficiency}")
-        self.df_electrolyser.at[clock, 'Efficiency'] = round(efficiency, 2)
-
-        if p_relative >= self.p_min:      # Bedingung minimale Leisteung
-            h2_production = self. calc_H2_production(clock, power=power, eff=efficiency)
-            #set values
-            self.df_electrolyser.at[clock, 'P[W]'] = round(power,2)
-            self.df_electrolyser.at[clock, 'P[%]'] = p_relative
-            self.df_electrolyser.at[clock, 'H2_Production [kg]'] = h2_production
+        if p_relative < self.p_min or power <= 0:   # Bedingung minimale Leistung
+            return 0.0, 0.0, efficiency, 0.0
+        energy = round(power * (self.env.i_step / 60), 2)  # [Wh]
+        h2_production = max(0.0, round((energy * efficiency) / (33.33 * 1000), 2))
 
-        else:
-            self.df_electrolyser.at[clock, 'P[W]'] = 0
-            self.df_electrolyser.at[clock, 'P[%]'] = 0
-            self.df_electrolyser.at[clock, 'H2_Production [kg]'] = 0
+        return round(power, 2), p_relative, efficiency, h2_production
 
 
     def calc_efficiency(self,p_rel: float = None) -> float:
@@ -0,0 +1,145 @@
+import datetime as dt
+import numpy as np
+import pandas as pd
+
+
+def group_cumsum(values: np.ndarray, starts: np.ndarray):
+    """
+    Cumulative sum restarting at the group starts (groups of consecutive positions)
+    :param values: np.ndarray
+    :param starts: np.ndarray
+        first position of every group
+    :return: np.ndarray
+    """
+    cum = np.cumsum(values)
+    offset = np.zeros(len(values))
+    offset[starts[1:]] = cum[starts[1:] - 1]
+
+    return cum - np.maximum.accumulate(offset)
+
+
+class FlexibleLoad:
+    """
+    Class to represent shiftable loads (e.g. pumps, cold storage)
+    A flexible load consumes a fixed amount of energy in daily time windows. The energy is scheduled into the
+    RE surplus of the window, energy not covered by surplus is consumed at the end of the window (deadline).
+    Scheduling works on whole arrays, the only loop is over the daily windows.
+    """
+
+    def __init__(self,
+                 env,
+                 name: str = None,
+                 p_n: float = None,
+                 energy: float = None,
+                 windows: list = None):
+        """
+        :param env: environment.Environment
+            load Environment
+        :param name: str
+            load name
+        :param p_n: float
+            maximum power [W]
+        :param energy: float
+            energy demand per time window [Wh]
+        :param windows: list
+            daily time windows [(start, end)] as 'HH:MM' (end before start spans midnight),
+            defaults to the whole day
+        """
+        self.env = env
+        self.name = name
+        self.p_n = p_n  # W
+        self.energy = energy  # Wh
+        self.windows = tuple((str(start), str(end)) for start, end in (windows or [('00:00', '00:00')]))
+        self.df = pd.DataFrame({'P [W]': np.zeros(len(env.time))}, index=env.time)
+
+    def output_schema(self):
+        """
+        Operator.df result columns of the component
+        :return: dict
+            column: initial value
+        """
+        return {f'{self.name} [W]': 0.0}
+
+    @staticmethod
+    def minutes(value: str):
+        """
+        :param value: str
+            time of day 'HH:MM'
+        :return: int
+            minutes after midnight
+        """
+        time = dt.datetime.strptime(value, '%H:%M')
+
+        return time.hour * 60 + time.minute
+
+    def window_groups(self, index: pd.DatetimeIndex = None):
+        """
+        Time window of every time step
+        :param index: pd.DatetimeIndex
+            time steps, defaults to the simulation time
+        :return: tuple
+            window occurrence per time step (-1 outside of the windows), required energy per occurrence [Wh]
+        """
+        index = pd.DatetimeIndex(self.env.time if index is None else index)
+        minute = (index.hour * 60 + index.minute).to_numpy()
+        day = ((index.normalize() - index[0].normalize()) // pd.Timedelta(days=1)).to_numpy()
+        groups = np.full(len(index), -1, dtype=np.int64)
+        for w, (start, end) in enumerate(self.windows):
+            start, end = self.minutes(start), self.minutes(end)
+            if end > start:
+                inside = (minute >= start) & (minute < end)
+                occurrence = day
+            else:
+                # Window spans midnight (or the whole day for start == end)
+                inside = (minute >= start) | (minute < end)
+                occurrence = day - (minute < end)
+            groups[inside] = (occurrence[inside] + 1) * len(self.windows) + w
+        # Windows cut by the simulation period require a share of the energy
+        length = {}
+        for w, (start, end) in enumerate(self.windows):
+            duration = (self.minutes(end) - self.minutes(start)) % (24 * 60) or 24 * 60
+            length[w] = duration / self.env.i_step
+        ids, counts = np.unique(groups[groups >= 0], return_counts=True)
+        required = {g: self.energy * min(c / length[g % len(self.windows)], 1) for g, c in zip(ids, counts)}
+
+        return groups, required
+
+    def schedule(self, surplus: np.ndarray, index: pd.DatetimeIndex = None):
+        """
+        Schedule flexible load into RE surplus
+        :param surplus: np.ndarray
+            RE surplus [W]
+        :param index: pd.DatetimeIndex
+            time steps of a part of the simulation time (chunked dispatch, the component DataFrame is not
+            updated), defaults to the simulation time
+        :return: np.ndarray
+            load [W]
+        """
+        surplus = np.nan_to_num(np.asarray(surplus, dtype=float))
+        dt_h = self.env.i_step / 60
+        groups, required = self.window_groups(index=index)
+        power = np.zeros(len(groups))
+        inside = np.flatnonzero(groups >= 0)
+        if len(inside) == 0 or self.energy is None or self.p_n is None:
+            if index is None:
+                self.df['P [W]'] = power
+            return power
+        g = groups[inside]
+        starts = np.flatnonzero(np.concatenate(([True], (g[1:] != g[:-1]) | (np.diff(inside) > 1))))
+        ends = np.append(starts[1:], len(g))
+        group_energy = np.array([required[key] for key in g[starts]])
+        energy = np.repeat(group_energy, ends - starts)
+        # 1) RE surplus in time order
+        available = np.minimum(np.clip(surplus[inside], 0, None), self.p_n) * dt_h
+        cum = group_cumsum(available, starts)
+        used = np.clip(energy - (cum - available), 0, available)
+        # 2) Remaining energy at the end of the window
+        remaining = np.repeat(group_energy - np.add.reduceat(used, starts), ends - starts)
+        capacity = self.p_n * dt_h - used
+        cum = group_cumsum(capacity[::-1], len(g) - ends[::-1])[::-1]
+        forced = np.clip(remaining - (cum - capacity), 0, capacity)
+        power[inside] = (used + forced) / dt_h
+        if index is None:
+            self.df['P [W]'] = power
+
+        return power
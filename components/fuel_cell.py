@@ -1,6 +1,5 @@
 import pandas as pd
 import datetime as dt
-from scipy.interpolate import interp1d
 import os
 
 
@@ -58,7 +57,8 @@ class FuelCell:
         self.df_fc = pd.DataFrame(index=self.env.time, columns=['Power Output [W]', 'H2 Consumed [kg]'])
         self.df_fc.fillna(0, inplace=True)
 
-        # Efficiency interpolator
+        # Efficiency interpolator (scipy imported on first use)
+        from scipy.interpolate import interp1d
         eff_path = os.path.join(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')), 'data', 'Fuelcell_efficiency_curve.csv')
         try:
             df_eff = pd.read_csv(eff_path, sep=',', decimal='.')
@@ -73,6 +73,15 @@ class FuelCell:
         self.replacement_cost = sum(self.replacement_parameters[0].values())
         self.replacement_co2 = sum(self.replacement_parameters[1].values())
 
+    def output_schema(self):
+        """
+        Operator.df result columns of the component
+        :return: dict
+            column: initial value
+        """
+        return {f'{self.name} [W]': 0.0,
+                f'{self.name} Power[W]': 0.0}
+
     def get_efficiency(self, p_rel: float = None):
         """Returns the interpolated efficiency for a relative power [%]. Defaults to 100% rated power."""
         if p_rel is None:
@@ -83,6 +92,38 @@ class FuelCell:
         except Exception:
             return float(self.efficiency_interpolator(p_rel)) if callable(self.efficiency_interpolator) else 0.5
 
+    def calc_operating_point(self, power: float, h2_available: float):
+        """
+        Calculate power output and hydrogen consumption for a power request.
+        If the available hydrogen is not sufficient, the power is reduced iteratively
+        until power and part-load efficiency match the available hydrogen.
+        :param power: float
+            requested power [W]
+        :param h2_available: float
+            withdrawable hydrogen [kg]
+        :return: tuple
+            power output [W], hydrogen consumed [kg]
+        """
+        t_step = self.env.i_step / 60
+        fc_power = min(power, self.max_power)
+        if fc_power <= 0 or h2_available <= 0:
+            return 0.0, 0.0
+        eff = self.get_efficiency(p_rel=(fc_power / self.max_power) * 100)
+        if eff <= 0:
+            return 0.0, 0.0
+        required_h2 = fc_power * t_step / (33.33 * 1000 * eff)
+        if required_h2 <= h2_available:
+            return fc_power, required_h2
+        # Reduce power to match available hydrogen
+        for _ in range(10):
+            fc_power = min((h2_available * 33.33 * 1000 * eff) / t_step, self.max_power)
+            eff_new = self.get_efficiency(p_rel=(fc_power / self.max_power) * 100)
+            if abs(eff - eff_new) < 1e-4 or eff_new <= 0:
+                break
+            eff = eff_new
+
+        return fc_power, h2_available
+
     def fc_operate(self, clock: dt.datetime, hydrogen_used: float, eff: float, power_output: float):
         """Logs the operation of the fuel cell based on planned H2 amount, efficiency and power."""
         time_step = self.env.i_step / 60
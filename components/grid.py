@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 
@@ -21,3 +22,463 @@ class Grid:
         self.df = pd.DataFrame(columns=['P [W]', 'Blackout'],
                                index=self.env.time)
         self.c_var_n = c_var_n
+
+    def output_schema(self):
+        """
+        Operator.df result columns of the component
+        :return: dict
+            column: initial value
+        """
+        return {f'{self.name} [W]': 0.0}
+
+
+class BlackoutSchedule:
+    """
+    Grid blackouts stored as intervals [start, end)
+    The per time step blackout mask is derived with vectorized operations, so blackout data does not
+    have to match the simulation horizon. Synthetic blackouts follow a Poisson arrival process.
+    """
+
+    durations = ('exponential', 'lognormal')
+
+    def __init__(self, intervals: list = None):
+        """
+        :param intervals: list
+            blackout intervals [(start, end)] as datetimes
+        """
+        intervals = [] if intervals is None else intervals
+        self.intervals = sorted((pd.Timestamp(start), pd.Timestamp(end)) for start, end in intervals)
+
+    def __len__(self):
+        return len(self.intervals)
+
+    @classmethod
+    def from_mask(cls, time, mask):
+        """
+        Convert blackout mask to intervals
+        :param time: pd.Series/pd.DatetimeIndex
+            time stamps of the mask
+        :param mask: array-like
+            blackout in time step
+        :return: BlackoutSchedule
+        """
+        time = pd.DatetimeIndex(time)
+        mask = np.asarray(mask, dtype=bool)
+        if len(time) == 0:
+            return cls()
+        t_step = time[1] - time[0] if len(time) > 1 else pd.Timedelta(minutes=60)
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        stamps = time.append(pd.DatetimeIndex([time[-1] + t_step]))
+
+        return cls(list(zip(stamps[starts], stamps[ends])))
+
+    @classmethod
+    def from_csv(cls, path: str, time, sep: str = ','):
+        """
+        Read blackout data
+            Interval format: columns 'Start' and 'End'
+            Time step format: column 'Blackout' (first time step = simulation start)
+        :param path: str
+            file path
+        :param time: pd.Series/pd.DatetimeIndex
+            simulation time stamps
+        :param sep: str
+            csv separator
+        :return: BlackoutSchedule
+        """
+        df = pd.read_csv(path, sep=sep)
+        if {'Start', 'End'}.issubset(df.columns):
+            return cls(list(zip(pd.to_datetime(df['Start']), pd.to_datetime(df['End']))))
+        values = df['Blackout'].to_numpy(dtype=bool)
+        if len(values) != len(time):
+            print(f'Blackout data ({len(values)} time steps) does not match the simulation horizon '
+                  f'({len(time)} time steps), missing time steps without blackout.')
+        mask = np.zeros(len(time), dtype=bool)
+        mask[:min(len(values), len(time))] = values[:len(time)]
+
+        return cls.from_mask(time=time, mask=mask)
+
+    def to_mask(self, time):
+        """
+        Blackout mask for time stamps
+        :param time: pd.Series/pd.DatetimeIndex
+            time stamps
+        :return: np.ndarray
+            blackout in time step
+        """
+        t = pd.DatetimeIndex(time).to_numpy()
+        if len(self.intervals) == 0:
+            return np.zeros(len(t), dtype=bool)
+        starts = np.searchsorted(t, np.array([i[0] for i in self.intervals], dtype='datetime64[ns]'), side='left')
+        ends = np.searchsorted(t, np.array([i[1] for i in self.intervals], dtype='datetime64[ns]'), side='left')
+        counter = np.zeros(len(t) + 1, dtype=int)
+        np.add.at(counter, starts, 1)
+        np.add.at(counter, ends, -1)
+
+        return np.cumsum(counter)[:-1] > 0
+
+    def to_df(self):
+        """
+        :return: pd.DataFrame
+            blackout intervals
+        """
+        df = pd.DataFrame(self.intervals, columns=['Start', 'End'])
+        df['Duration [h]'] = (df['End'] - df['Start']).dt.total_seconds() / 3600
+
+        return df
+
+    @staticmethod
+    def sample_events(runs: int,
+                      horizon: float,
+                      frequency: float,
+                      mean_duration: float,
+                      duration: str = 'exponential',
+                      sigma: float = 1.0,
+                      seed=None):
+        """
+        Sample blackout events (Poisson arrivals, random durations)
+        :param runs: int
+            number of realizations
+        :param horizon: float
+            simulation horizon [h]
+        :param frequency: float
+            mean number of blackouts [1/a]
+        :param mean_duration: float
+            mean blackout duration [h]
+        :param duration: str
+            duration distribution ('exponential' or 'lognormal')
+        :param sigma: float
+            standard deviation of log(duration) for lognormal durations
+        :param seed: int/np.random.Generator
+            random seed
+        :return: tuple
+            realization index, start [h], duration [h] per event
+        """
+        if duration not in BlackoutSchedule.durations:
+            raise ValueError(f'Unknown duration distribution {duration}. Choose from {BlackoutSchedule.durations}.')
+        rng = np.random.default_rng(seed)
+        counts = rng.poisson(frequency * horizon / 8760, size=runs)
+        run = np.repeat(np.arange(runs), counts)
+        # Poisson process: arrivals are uniformly distributed for a given number of events
+        start = rng.uniform(0, horizon, size=counts.sum())
+        if duration == 'exponential':
+            length = rng.exponential(mean_duration, size=counts.sum())
+        else:
+            length = rng.lognormal(np.log(mean_duration) - sigma ** 2 / 2, sigma, size=counts.sum())
+
+        return run, start, length
+
+    @classmethod
+    def generate(cls, time, frequency: float, mean_duration: float, seed=None, **kwargs):
+        """
+        Generate synthetic blackout schedule
+        :param time: pd.Series/pd.DatetimeIndex
+            simulation time stamps
+        :param frequency: float
+            mean number of blackouts [1/a]
+        :param mean_duration: float
+            mean blackout duration [h]
+        :param seed: int
+            random seed
+        :return: BlackoutSchedule
+        """
+        time = pd.DatetimeIndex(time)
+        t_step = time[1] - time[0]
+        horizon = len(time) * t_step / pd.Timedelta(hours=1)
+        _, start, length = cls.sample_events(runs=1,
+                                             horizon=horizon,
+                                             frequency=frequency,
+                                             mean_duration=mean_duration,
+                                             seed=seed,
+                                             **kwargs)
+        start = time[0] + pd.to_timedelta(start, unit='h')
+        end = start + pd.to_timedelta(length, unit='h')
+
+        return cls(list(zip(start, end)))
+
+    @classmethod
+    def sample_masks(cls, time, runs: int, frequency: float, mean_duration: float, seed=None, **kwargs):
+        """
+        Generate blackout masks for many stochastic realizations
+        :param time: pd.Series/pd.DatetimeIndex
+            simulation time stamps
+        :param runs: int
+            number of realizations
+        :param frequency: float
+            mean number of blackouts [1/a]
+        :param mean_duration: float
+            mean blackout duration [h]
+        :param seed: int
+            random seed
+        :return: np.ndarray
+            blackout in time step (runs x time steps)
+        """
+        time = pd.DatetimeIndex(time)
+        n = len(time)
+        step = (time[1] - time[0]) / pd.Timedelta(hours=1)
+        run, start, length = cls.sample_events(runs=runs,
+                                               horizon=n * step,
+                                               frequency=frequency,
+                                               mean_duration=mean_duration,
+                                               seed=seed,
+                                               **kwargs)
+        # Time steps starting within [start, end)
+        first = np.clip(np.ceil(start / step).astype(int), 0, n)
+        last = np.clip(np.ceil((start + length) / step).astype(int), 0, n)
+        counter = np.zeros((runs, n + 1), dtype=int)
+        np.add.at(counter, (run, first), 1)
+        np.add.at(counter, (run, last), -1)
+
+        return np.cumsum(counter, axis=1)[:, :-1] > 0
+
+
+class Tariff:
+    """
+    Grid tariff: time-of-use / seasonal import prices, demand charge on the peak import of each billing period,
+    export prices and export cap
+    Prices and bills are evaluated with array operations on the grid flows (time steps or runs x time steps),
+    many tariffs can be priced on the results of one dispatch (see compare).
+    """
+
+    def __init__(self,
+                 import_price: float = 0.0,
+                 periods: list = None,
+                 demand_charge: float = 0.0,
+                 billing_period: str = 'M',
+                 export_price=0.0,
+                 export_cap: float = None,
+                 name: str = None):
+        """
+        :param import_price: float
+            base import price [US$/kWh]
+        :param periods: list
+            time-of-use periods as dict {'price': float [US$/kWh],
+                                         'hours': ('HH:MM', 'HH:MM') (end before start spans midnight),
+                                         'months': [1, ..., 12],
+                                         'weekdays': [0 (Monday), ..., 6]},
+            missing keys apply to all time steps, later periods override earlier ones
+        :param demand_charge: float
+            demand charge on the peak import of each billing period [US$/kW]
+        :param billing_period: str
+            billing period of the demand charge (pandas period alias, e.g. 'M' month)
+        :param export_price: float/dict
+            export price [US$/kWh], dict with prices by source {'PV': float, 'WT': float}
+        :param export_cap: float
+            maximum export power [W], export above the cap is curtailed
+        :param name: str
+            tariff name
+        """
+        self.name = name
+        self.import_price = import_price
+        self.periods = [dict(period) for period in (periods or [])]
+        self.demand_charge = demand_charge
+        self.billing_period = billing_period
+        self.export_price = export_price
+        self.export_cap = export_cap
+
+    def __repr__(self):
+        return (f'Tariff(name={self.name!r}, import_price={self.import_price!r}, periods={self.periods!r}, '
+                f'demand_charge={self.demand_charge!r}, billing_period={self.billing_period!r}, '
+                f'export_price={self.export_price!r}, export_cap={self.export_cap!r})')
+
+    @classmethod
+    def flat(cls, env):
+        """
+        Flat tariff from the economic parameters of the environment
+        :param env: environment.Environment
+        :return: Tariff
+        """
+        return cls(import_price=env.electricity_price or 0.0,
+                   export_price={'PV': env.pv_feed_in_tariff or 0.0, 'WT': env.wt_feed_in_tariff or 0.0},
+                   name='flat')
+
+    ''' Prices '''
+
+    @staticmethod
+    def minutes(value: str):
+        """
+        :param value: str
+            time of day 'HH:MM'
+        :return: int
+            minutes after midnight
+        """
+        hour, minute = str(value).split(':')[:2]
+
+        return int(hour) * 60 + int(minute)
+
+    def import_prices(self, time):
+        """
+        Import price of every time step
+        :param time: pd.Series/pd.DatetimeIndex
+            time stamps
+        :return: np.ndarray
+            import price [US$/kWh]
+        """
+        index = pd.DatetimeIndex(time)
+        prices = np.full(len(index), float(self.import_price))
+        minute = (index.hour * 60 + index.minute).to_numpy()
+        for period in self.periods:
+            mask = np.ones(len(index), dtype=bool)
+            if period.get('hours') is not None:
+                start, end = (self.minutes(value) for value in period['hours'])
+                if end > start:
+                    mask &= (minute >= start) & (minute < end)
+                else:
+                    mask &= (minute >= start) | (minute < end)
+            if period.get('months') is not None:
+                mask &= np.isin(index.month, list(period['months']))
+            if period.get('weekdays') is not None:
+                mask &= np.isin(index.weekday, list(period['weekdays']))
+            prices[mask] = period['price']
+
+        return prices
+
+    def export_rate(self, source: str = None):
+        """
+        :param source: str
+            export source ('PV', 'WT')
+        :return: float
+            export price [US$/kWh]
+        """
+        if isinstance(self.export_price, dict):
+            return float(self.export_price.get(source, 0.0) or 0.0)
+
+        return float(self.export_price or 0.0)
+
+    def export_share(self, export: np.ndarray):
+        """
+        Share of the export power below the export cap
+        :param export: np.ndarray
+            total export power [W]
+        :return: np.ndarray
+            exported share of the export power
+        """
+        export = np.nan_to_num(np.asarray(export, dtype=float))
+        if self.export_cap is None:
+            return np.ones_like(export)
+
+        return np.where(export > self.export_cap, self.export_cap / np.where(export > 0, export, 1), 1.0)
+
+    ''' Bill '''
+
+    def billing_starts(self, time):
+        """
+        :param time: pd.Series/pd.DatetimeIndex
+            time stamps (sorted)
+        :return: np.ndarray
+            first time step of every billing period
+        """
+        index = pd.DatetimeIndex(time)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        codes = pd.factorize(index.to_period(self.billing_period))[0]
+
+        return np.flatnonzero(np.concatenate(([True], codes[1:] != codes[:-1])))
+
+    def peak_demand(self, grid_import: np.ndarray, time):
+        """
+        Peak import of every billing period
+        :param grid_import: np.ndarray
+            grid import [W] (time steps or runs x time steps)
+        :param time: pd.Series/pd.DatetimeIndex
+            time stamps
+        :return: np.ndarray
+            peak import [kW] (billing periods or runs x billing periods)
+        """
+        grid_import = np.clip(np.nan_to_num(np.asarray(grid_import, dtype=float)), 0, None)
+
+        return np.maximum.reduceat(grid_import, self.billing_starts(time), axis=-1) / 1000
+
+    def export_revenue(self, grid_export, i_step: float):
+        """
+        Export energy below the export cap and export revenue
+        :param grid_export: dict/np.ndarray
+            export power [W] by source {'PV': np.ndarray, 'WT': np.ndarray} or total export power
+        :param i_step: float
+            time step [min]
+        :return: tuple
+            export energy [kWh], export revenue [US$]
+        """
+        if grid_export is None:
+            return 0.0, 0.0
+        if not isinstance(grid_export, dict):
+            grid_export = {None: grid_export}
+        grid_export = {source: np.nan_to_num(np.asarray(p, dtype=float)) for source, p in grid_export.items()}
+        share = self.export_share(sum(grid_export.values()))
+        export_energy = 0.0
+        export_revenue = 0.0
+        for source, power in grid_export.items():
+            energy = (power * share).sum(axis=-1) * i_step / 60 / 1000
+            export_energy = export_energy + energy
+            export_revenue = export_revenue + energy * self.export_rate(source)
+
+        return export_energy, export_revenue
+
+    def bill(self, grid_import: np.ndarray, time, i_step: float, grid_export=None):
+        """
+        Grid bill of the simulation period
+        :param grid_import: np.ndarray
+            grid import [W] (time steps or runs x time steps)
+        :param time: pd.Series/pd.DatetimeIndex
+            time stamps
+        :param i_step: float
+            time step [min]
+        :param grid_export: dict/np.ndarray
+            export power [W] by source {'PV': np.ndarray, 'WT': np.ndarray} or total export power
+        :return: dict
+            import energy [kWh], energy cost, demand cost, export energy [kWh], export revenue, total cost [US$]
+        """
+        dt = i_step / 60
+        grid_import = np.clip(np.nan_to_num(np.asarray(grid_import, dtype=float)), 0, None)
+        energy_cost = grid_import @ self.import_prices(time) * dt / 1000
+        demand_cost = self.peak_demand(grid_import, time).sum(axis=-1) * self.demand_charge
+        export_energy, export_revenue = self.export_revenue(grid_export=grid_export, i_step=i_step)
+
+        return {'Import [kWh]': grid_import.sum(axis=-1) * dt / 1000,
+                'Energy cost': energy_cost,
+                'Demand cost': demand_cost,
+                'Export [kWh]': export_energy,
+                'Export revenue': export_revenue,
+                'Total': energy_cost + demand_cost - export_revenue}
+
+    @staticmethod
+    def compare(tariffs: list, grid_import: np.ndarray, time, i_step: float, grid_export=None):
+        """
+        Price the grid flows of one dispatch with several tariffs
+        Import prices of all tariffs are stacked (tariffs x time steps) and evaluated in one matrix product.
+        :param tariffs: list
+            Tariff objects
+        :param grid_import: np.ndarray
+            grid import [W]
+        :param time: pd.Series/pd.DatetimeIndex
+            time stamps
+        :param i_step: float
+            time step [min]
+        :param grid_export: dict/np.ndarray
+            export power [W] by source or total export power
+        :return: pd.DataFrame
+            bill per tariff
+        """
+        dt = i_step / 60
+        grid_import = np.clip(np.nan_to_num(np.asarray(grid_import, dtype=float)), 0, None)
+        prices = np.vstack([tariff.import_prices(time) for tariff in tariffs])
+        energy_cost = prices @ grid_import * dt / 1000
+        # Peaks are computed once per billing period alias
+        peaks = {}
+        rows = []
+        for k, tariff in enumerate(tariffs):
+            if tariff.billing_period not in peaks:
+                peaks[tariff.billing_period] = tariff.peak_demand(grid_import, time).sum()
+            export_energy, export_revenue = tariff.export_revenue(grid_export=grid_export, i_step=i_step)
+            demand_cost = peaks[tariff.billing_period] * tariff.demand_charge
+            rows.append({'Tariff': tariff.name if tariff.name is not None else k,
+                         'Import [kWh]': grid_import.sum() * dt / 1000,
+                         'Energy cost': energy_cost[k],
+                         'Demand cost': demand_cost,
+                         'Export [kWh]': export_energy,
+                         'Export revenue': export_revenue,
+                         'Total': energy_cost[k] + demand_cost - export_revenue})
+
+        return pd.DataFrame(rows).set_index('Tariff')
@@ -3,6 +3,8 @@ import os
 import pandas as pd
 import datetime as dt
 import numpy as np
+# MiGUEL modules
+from profiles import read_profile, DAYFIRST
 
 
 class Load:
@@ -15,7 +17,25 @@ class Load:
                  name: str = None,
                  annual_consumption: float = None,
                  ref_profile: str = None,
-                 load_profile: str = None):
+                 load_profile: str = None,
+                 time_format: str = None,
+                 dayfirst: bool = DAYFIRST):
+        """
+        :param env: environment.Environment
+            load Environment
+        :param name: str
+            load name
+        :param annual_consumption: float
+            annual energy demand [kWh]
+        :param ref_profile: str
+            reference load profile
+        :param load_profile: str
+            load profile path (csv)
+        :param time_format: str
+            strftime format of the load profile time stamps
+        :param dayfirst: bool
+            day first if the time stamp format is inferred
+        """
         self.env = env
         self.name = name
         if annual_consumption is not None:
@@ -32,11 +52,11 @@ class Load:
 
         if load_profile is not None:
             # Read provided load_profile
-            self.load_profile = pd.read_csv(load_profile,
-                                            index_col=0,
-                                            header=0,
-                                            sep=self.env.csv_sep,
-                                            decimal=self.env.csv_decimal)
+            self.load_profile = read_profile(path=load_profile,
+                                             sep=self.env.csv_sep,
+                                             decimal=self.env.csv_decimal,
+                                             time_format=time_format,
+                                             dayfirst=dayfirst)
             self.original_load_profile = self.load_profile
         else:
             # Differentiate ghanaian or bdew reference load profile
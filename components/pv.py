@@ -187,6 +187,21 @@ class PV:
             self.config = ConfigParser()
             self.create_config()
 
+    def output_schema(self):
+        """
+        Operator.df result columns of the component
+        :return: dict
+            column: initial value
+        """
+        schema = {f'{self.name} [W]': 0.0,
+                  f'{self.name} production [W]': 0.0,
+                  f'{self.name} remain [W]': 0.0}
+        if self.env.grid_connection and self.env.feed_in:
+            schema[f'{self.name} Feed in [W]'] = 0.0
+            schema[f'{self.name} Feed in [{self.env.currency}]'] = 0.0
+
+        return schema
+
     def create_pvlib_parameters(self):
         """
         Create pvlib parameters
@@ -1,6 +1,8 @@
 import datetime as dt
 import numpy as np
 import pandas as pd
+# MiGUEL modules
+from components.degradation import BatteryDegradation, count_cycles
 
 # TODO: Add Bleach-Acid, LiIon and Redox-Flow parameters (soc-boarders, efficiency, specific cost and co2 emissions)
 
@@ -27,7 +29,11 @@ class Storage:
                  c_var_n: float = 0,
                  co2_init: float = 103,
                  c_invest: float = None,
-                 c_op_main: float = None):
+                 c_op_main: float = None,
+                 cycle_life: float = 5000,
+                 dod_ref: float = 0.8,
+                 k: float = 1.3,
+                 eol: float = 0.8):
         """
         :param env: environment.Environment
             storage Environment
@@ -57,6 +63,14 @@ class Storage:
             variable cost [US$/kWh]
         :param co2_init: float
             initial CO2-emissions during production [US$/kW]
+        :param cycle_life: float
+            cycles to end of life at depth of discharge dod_ref
+        :param dod_ref: float
+            reference depth of discharge of cycle_life
+        :param k: float
+            Woehler exponent of the cycle life
+        :param eol: float
+            remaining capacity at end of life
         """
         self.env = env
         self.name = name
@@ -83,6 +97,14 @@ class Storage:
         else:
             self.c_op_main = c_op_main
         self.lifetime = lifetime  # a
+        # Degradation
+        self.cycle_life = cycle_life
+        self.dod_ref = dod_ref
+        self.k = k
+        self.eol = eol
+        # Rainflow cycles of the dispatched SOC (ranges, counts, simulated years)
+        self.cycles = None
+        self.aging = None
         self.replacements = self.env.lifetime / self.lifetime - 1
         self.replacement_parameters = self.calc_replacements()
         self.replacement_cost = sum(self.replacement_parameters[0].values())
@@ -103,6 +125,16 @@ class Storage:
                                f'Specific operation maintenance cost [{self.env.currency}/kWh]': int(self.c_op_main_n),
                                f'Operation maintenance cost [{self.env.currency}/a]': int(self.c_op_main_n * self.c / 1000)}
 
+    def output_schema(self):
+        """
+        Operator.df result columns of the component
+        :return: dict
+            column: initial value
+        """
+        return {f'{self.name} [W]': 0.0,
+                f'{self.name}_capacity [Wh]': np.nan,
+                f'{self.name} soc': np.nan}
+
     def set_initial_values(self):
         """
         Set initial values for ES
@@ -111,7 +143,7 @@ class Storage:
         initial_time = self.df.index[0]
         self.df.at[initial_time, 'SOC'] = self.soc
         self.df.at[initial_time, 'Q [Wh]'] = self.c * self.df.at[initial_time, 'SOC']
-        self.df['P [W]'] = 0
+        self.df['P [W]'] = 0.0
 
     def charge(self, clock: dt.datetime, power: float):
         """
@@ -207,23 +239,63 @@ class Storage:
         return power
 
 
+    def calc_aging(self, soc: np.ndarray):
+        """
+        Count cycles of the dispatched state of charge and update aging and replacements
+        :param soc: np.ndarray
+            state of charge of the simulation period
+        :return: dict
+            aging results (see components.degradation.BatteryDegradation)
+        """
+        soc = pd.Series(soc, dtype=float).ffill().fillna(self.soc).to_numpy()
+        ranges, counts = count_cycles(soc)
+        years = len(soc) * self.env.i_step / (60 * 24 * 365)
+        self.cycles = (ranges, counts, years)
+        self.replacement_parameters = self.calc_replacements()
+        self.replacement_cost = sum(self.replacement_parameters[0].values())
+        self.replacement_co2 = sum(self.replacement_parameters[1].values())
+
+        return self.aging
+
+    def calc_degradation(self):
+        """
+        Calendar and cycle aging over the project lifetime
+        :return: dict
+            aging results, None before dispatch
+        """
+        if self.cycles is None:
+            return None
+        ranges, counts, years = self.cycles
+        model = BatteryDegradation(calendar_life=self.lifetime,
+                                   cycle_life=self.cycle_life,
+                                   dod_ref=self.dod_ref,
+                                   k=self.k,
+                                   eol=self.eol)
+        aging = model.run(ranges=ranges, counts=counts, years=years, lifetime=int(self.env.lifetime))
+        aging['capacity [Wh]'] = [self.c * soh for soh in aging['soh']]
+
+        return aging
+
     def calc_replacements(self):
         """
         Calculate energy storage replacement cost
+        Replacement years follow the calendar and cycle aging of the dispatched state of charge, before the
+        dispatch the calendrical lifetime is used.
         :return: dict
             replacement years + cost in US$
         """
         c_invest_replacement = {}
         co2_replacement = {}
-        replacements = self.env.lifetime / self.lifetime
-        interval = self.env.lifetime / replacements
-        for year in range(int(interval), int(replacements*interval)-1, int(interval)):
-            c_invest_replacement[year] = (self.c_invest_n * self.c/1000) / ((1 + self.env.d_rate) ** year)
-            co2_replacement[year] = (self.co2_init  ) / ((1 + self.env.d_rate) ** year)
+        self.aging = self.calc_degradation()
+        if self.aging is not None:
+            years = self.aging['replacement_years']
+        else:
+            replacements = self.env.lifetime / self.lifetime
+            interval = self.env.lifetime / replacements
+            years = range(int(interval), int(replacements*interval)-1, int(interval))
+        for year in years:
+            c_invest_replacement[year] = c_invest_replacement.get(year, 0) + \
+                (self.c_invest_n * self.c/1000) / ((1 + self.env.d_rate) ** year)
+            co2_replacement[year] = co2_replacement.get(year, 0) + (self.co2_init) / ((1 + self.env.d_rate) ** year)
 
         return c_invest_replacement, co2_replacement
-
-
-
-
-
@@ -4,7 +4,7 @@ import os
 import numpy as np
 import datetime as dt
 import pandas as pd
-import windpowerlib
+# windpowerlib is imported lazily inside methods
 from configparser import ConfigParser
 
 
@@ -112,6 +112,21 @@ class WindTurbine:
             self.config = ConfigParser()
             self.create_config()
 
+    def output_schema(self):
+        """
+        Operator.df result columns of the component
+        :return: dict
+            column: initial value
+        """
+        schema = {f'{self.name} [W]': 0.0,
+                  f'{self.name} production [W]': 0.0,
+                  f'{self.name} remain [W]': 0.0}
+        if self.env.grid_connection and self.env.feed_in:
+            schema[f'{self.name} Feed in [W]'] = 0.0
+            schema[f'{self.name} Feed in [{self.env.currency}]'] = 0.0
+
+        return schema
+
     def get_turbine_data(self):
         """
         Get turbine data from windpowerlib
@@ -154,6 +169,8 @@ class WindTurbine:
         Create windpowerlib.WindTurbine object in self.WindTurbine
         :return: None
         """
+        import windpowerlib
+
         wind_turbine = windpowerlib.WindTurbine(**self.turbine_data)
 
         return wind_turbine
@@ -163,7 +180,9 @@ class WindTurbine:
         Create windpowerlib.ModelChain object in self.ModelChain
         :return: None
         """
-        modelchain = windpowerlib.modelchain.ModelChain(power_plant=self.windturbine)
+        from windpowerlib.modelchain import ModelChain
+
+        modelchain = ModelChain(power_plant=self.windturbine)
 
         return modelchain
 
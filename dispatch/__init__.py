@@ -0,0 +1,24 @@
+"""Dispatch package for MiGUEL
+
+Contains dispatch engines that complement the time step dispatch of `operation.Operator` and the
+registry of dispatch strategies selectable by name (`Operator(env, strategy='vectorized-greedy')`).
+"""
+from .base import DispatchState, DispatchStrategy, available_strategies, get_strategy, register_strategy
+from .hydrogen import HydrogenSystem
+from .checkpoint import DispatchCheckpoint
+from .greedy import GreedyCurrent, LoadFollowingFC, VectorizedGreedy
+from .predictive import RollingHorizonDispatch
+from .streaming import StreamingDispatch
+
+__all__ = ["DispatchState",
+           "DispatchStrategy",
+           "available_strategies",
+           "get_strategy",
+           "register_strategy",
+           "HydrogenSystem",
+           "DispatchCheckpoint",
+           "GreedyCurrent",
+           "VectorizedGreedy",
+           "LoadFollowingFC",
+           "RollingHorizonDispatch",
+           "StreamingDispatch"]
@@ -0,0 +1,197 @@
+import numpy as np
+# MiGUEL modules
+from components.pv import PV
+from dispatch.fleet import StorageFleet
+
+STRATEGIES = {}
+
+
+class DispatchState:
+    """
+    Component state arrays handed to dispatch strategies
+    Power values in [W], energy in [Wh], time step in [h]. Time series have the time as last axis,
+    vectorizable strategies accept additional leading axes (e.g. several stochastic realizations).
+    """
+
+    def __init__(self,
+                 env,
+                 load: np.ndarray,
+                 re_production: dict,
+                 grid_available: np.ndarray = None,
+                 h2_policy: str = 'priority',
+                 re_stage: tuple = None,
+                 storage_stage: tuple = None,
+                 start: int = 0,
+                 update_components: bool = True):
+        """
+        :param env: environment.Environment
+            system environment (component parameters)
+        :param load: np.ndarray
+            load [W]
+        :param re_production: dict
+            RE component name: production [W] (dispatch order)
+        :param grid_available: np.ndarray
+            grid available in time step (e.g. synthetic blackouts), defaults to the environment blackout data
+        :param h2_policy: str
+            allocation policy of the hydrogen subsystem
+        :param re_stage: tuple
+            cached result of self_supply() for unchanged load and RE production
+        :param storage_stage: tuple
+            cached result of the storage stage for unchanged RE self supply, storage and grid parameters
+        :param start: int
+            position of the first time step in the simulation time (chunked dispatch)
+        :param update_components: bool
+            write results to the component DataFrames (only for 1D arrays of the full simulation time)
+        """
+        self.env = env
+        self.re_stage = re_stage
+        self.storage_stage = storage_stage
+        self.load = np.nan_to_num(np.asarray(load, dtype=float))
+        self.n = self.load.shape[-1]
+        self.start = start
+        self.update_components = update_components and self.load.ndim == 1
+        self.index = env.time[start:start + self.n]
+        self.dt = env.i_step / 60
+        self.h2_policy = h2_policy
+        # RE components
+        self.re_production = {name: np.nan_to_num(np.asarray(p, dtype=float)) for name, p in re_production.items()}
+        self.re_is_pv = {re.name: isinstance(re, PV) for re in env.re_supply}
+        # Energy storage
+        self.storage = env.storage
+        self.es_p = np.array([es.p_n for es in env.storage], dtype=float)
+        self.es_c = np.array([es.c for es in env.storage], dtype=float)
+        self.es_soc = np.array([es.soc for es in env.storage], dtype=float)
+        self.es_soc_min = np.array([es.soc_min for es in env.storage], dtype=float)
+        self.es_soc_max = np.array([es.soc_max for es in env.storage], dtype=float)
+        self.es_n_charge = np.array([es.n_charge for es in env.storage], dtype=float)
+        self.es_n_discharge = np.array([es.n_discharge for es in env.storage], dtype=float)
+        self.storage_policy = getattr(env, 'storage_policy', 'priority')
+        self.fleet = StorageFleet(storage=env.storage, dt=self.dt, policy=self.storage_policy)
+        # Hydrogen storage levels [kg] and diesel generator runtime states at the first time step
+        self.hs_level = np.array([hs.current_level for hs in env.H2Storage], dtype=float)
+        self.dg_carry = {}
+        # Grid
+        self.grid = env.grid.name if env.grid is not None else None
+        self.grid_connection = bool(env.grid_connection)
+        self.blackout = bool(env.grid_connection and env.blackout)
+        if grid_available is not None:
+            self.grid_available = np.asarray(grid_available, dtype=bool) & self.grid_connection
+            self.blackout = self.blackout or (self.grid_connection and not self.grid_available.all())
+        elif self.blackout:
+            self.grid_available = ~env.df['Blackout'].to_numpy(dtype=bool)[start:start + self.n]
+        else:
+            self.grid_available = np.full(self.n, self.grid_connection)
+
+    @classmethod
+    def from_operator(cls, operator):
+        """
+        Collect state arrays from Operator
+        :param operator: operation.Operator
+        :return: DispatchState
+        """
+        env = operator.env
+        re_production = {re.name: re.df['P [W]'].to_numpy(dtype=float) for re in env.re_supply}
+
+        return cls(env=env,
+                   load=operator.df['Load [W]'].to_numpy(dtype=float),
+                   re_production=re_production,
+                   h2_policy=operator.h2_policy,
+                   re_stage=getattr(operator, 're_stage', None),
+                   storage_stage=getattr(operator, 'storage_stage', None))
+
+    def self_supply(self):
+        """
+        Cover load from RE components in dispatch order (first dispatch stage, cached)
+        :return: tuple
+            columns, PV surplus [W], wind surplus [W], residual load [W] (runs x time steps)
+        """
+        load = np.atleast_2d(self.load)
+        if self.re_stage is None or self.re_stage[3].shape != load.shape:
+            columns = {}
+            p_res = load.copy()
+            pv_remain = np.zeros_like(load)
+            wt_remain = np.zeros_like(load)
+            for name, production in self.re_production.items():
+                production = np.broadcast_to(production, load.shape)
+                supply = np.clip(np.minimum(production, p_res), 0, None)
+                remain = np.clip(production - p_res, 0, None)
+                p_res = np.clip(p_res - supply, 0, None)
+                columns[f'{name} [W]'] = supply
+                columns[f'{name} remain [W]'] = remain
+                if self.re_is_pv.get(name, True):
+                    pv_remain += remain
+                else:
+                    wt_remain += remain
+            columns['P_Remain_total [W]'] = pv_remain + wt_remain
+            self.re_stage = (columns, pv_remain, wt_remain, p_res)
+        columns, pv_remain, wt_remain, p_res = self.re_stage
+
+        return dict(columns), pv_remain, wt_remain, p_res
+
+
+class DispatchStrategy:
+    """
+    Base class of dispatch strategies
+    Vectorizable strategies implement dispatch(state) on component state arrays and return flow arrays
+    (Operator.df column: np.ndarray). Strategies that need the Operator (e.g. time step access to the
+    component DataFrames) implement run(operator). Strategies with checkpoints support the checkpoint/resume
+    options of operation.Operator.
+    """
+
+    name = None
+    vectorizable = False
+    checkpoints = False
+
+    def dispatch(self, state: DispatchState):
+        """
+        :param state: DispatchState
+            component state arrays
+        :return: dict
+            Operator.df column: flow array
+        """
+        raise NotImplementedError(f'Dispatch strategy {self.name} does not work on state arrays.')
+
+    def run(self, operator):
+        """
+        :param operator: operation.Operator
+        :return: dict
+            Operator.df column: flow array
+        """
+        return self.dispatch(state=DispatchState.from_operator(operator))
+
+
+def register_strategy(cls):
+    """
+    Register dispatch strategy (class decorator)
+    :param cls: DispatchStrategy
+    :return: DispatchStrategy
+    """
+    if not cls.name:
+        raise ValueError('Dispatch strategy requires a name.')
+    STRATEGIES[cls.name] = cls
+
+    return cls
+
+
+def get_strategy(name: str, **kwargs):
+    """
+    Create dispatch strategy by name
+    :param name: str
+        registered strategy name
+    :param kwargs: dict
+        strategy parameters
+    :return: DispatchStrategy
+    """
+    if name not in STRATEGIES:
+        raise KeyError(f'Unknown dispatch strategy {name}. Available: {list(STRATEGIES)}')
+
+    return STRATEGIES[name](**kwargs)
+
+
+def available_strategies():
+    """
+    Registered strategies
+    :return: dict
+        name: vectorizable
+    """
+    return {name: cls.vectorizable for name, cls in STRATEGIES.items()}
@@ -0,0 +1,141 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+
+class DispatchCheckpoint:
+    """
+    Checkpoint of the time step dispatch (operation.Operator.greedy_dispatch)
+    A checkpoint consists of segment files (.npz) with the Operator.df results, energy storage states and
+    RE surplus arrays of the time steps since the previous checkpoint, and an index file with the cursor
+    (last dispatched time step) and the segment list. Every time step is written once, so the checkpoint
+    cost is linear in the simulation time. A checkpoint resumes an interrupted run or serves as warm start
+    for what-if branches (e.g. other storage parameters) from a mid-year state; branches share the
+    segments of the checkpoint they start from.
+    """
+
+    storage_columns = ('P [W]', 'Q [Wh]', 'SOC')
+
+    def __init__(self,
+                 cursor: int = -1,
+                 segments: list = None,
+                 storage: list = None):
+        """
+        :param cursor: int
+            index of the last dispatched time step (-1: nothing dispatched)
+        :param segments: list
+            segment file paths in time order
+        :param storage: list
+            names of the checkpointed energy storages
+        """
+        self.cursor = cursor
+        self.segments = [] if segments is None else list(segments)
+        self.storage = [] if storage is None else list(storage)
+
+    @classmethod
+    def from_operator(cls, operator):
+        """
+        Empty checkpoint of the dispatch
+        :param operator: operation.Operator
+        :return: DispatchCheckpoint
+        """
+        return cls(storage=[es.name for es in operator.env.storage])
+
+    def save(self, operator, path: str, cursor: int, pv_surplus: np.ndarray, wt_surplus: np.ndarray):
+        """
+        Write the time steps since the previous checkpoint as segment and update the index file
+        (atomic replace of an existing file)
+        :param operator: operation.Operator
+        :param path: str
+            index file path (.npz), segments are written next to it
+        :param cursor: int
+            index of the last dispatched time step
+        :param pv_surplus: np.ndarray
+            PV surplus after storage charging [W]
+        :param wt_surplus: np.ndarray
+            wind surplus after storage charging [W]
+        :return: None
+        """
+        start = self.cursor + 1
+        k = cursor + 1
+        if k <= start:
+            return
+        df = operator.df
+        arrays = {'time': pd.DatetimeIndex(df.index[start:k]).to_numpy().astype('datetime64[ns]').astype(np.int64),
+                  'pv_surplus': np.asarray(pv_surplus[start:k], dtype=float),
+                  'wt_surplus': np.asarray(wt_surplus[start:k], dtype=float)}
+        for i, col in enumerate(df.columns):
+            arrays[f'c{i}'] = pd.to_numeric(df[col].iloc[start:k], errors='coerce').to_numpy(dtype=float)
+        for i, es in enumerate(operator.env.storage):
+            for j, col in enumerate(self.storage_columns):
+                arrays[f's{i}_{j}'] = es.df[col].iloc[start:k].to_numpy(dtype=float)
+        arrays['meta'] = np.array(json.dumps({'start': start,
+                                              'columns': list(df.columns),
+                                              'storage': [es.name for es in operator.env.storage]}))
+        segment = os.path.abspath(f'{os.path.splitext(path)[0]}.{start}-{cursor}.npz')
+        np.savez_compressed(segment, **arrays)
+
+        self.cursor = cursor
+        self.segments.append(segment)
+        self.storage = [es.name for es in operator.env.storage]
+        tmp = f'{path}.tmp.npz'
+        np.savez(tmp, meta=np.array(json.dumps({'cursor': int(self.cursor),
+                                                'segments': self.segments,
+                                                'storage': self.storage})))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Read checkpoint index
+        :param path: str
+            index file path (.npz)
+        :return: DispatchCheckpoint
+        """
+        with np.load(path) as data:
+            keys = json.loads(str(data['meta']))
+
+        return cls(cursor=keys['cursor'],
+                   segments=keys['segments'],
+                   storage=keys['storage'])
+
+    def restore(self, operator, pv_surplus: np.ndarray, wt_surplus: np.ndarray):
+        """
+        Write checkpoint state to Operator and energy storages
+        :param operator: operation.Operator
+        :param pv_surplus: np.ndarray
+            PV surplus array of the dispatch (filled up to cursor)
+        :param wt_surplus: np.ndarray
+            wind surplus array of the dispatch (filled up to cursor)
+        :return: int
+            first time step to dispatch
+        """
+        missing = [es.name for es in operator.env.storage if es.name not in self.storage]
+        if missing:
+            raise ValueError(f'Energy storages {missing} not contained in checkpoint.')
+        df = operator.df
+        time = pd.DatetimeIndex(df.index).to_numpy().astype('datetime64[ns]').astype(np.int64)
+        for segment in self.segments:
+            with np.load(segment) as data:
+                keys = json.loads(str(data['meta']))
+                start = keys['start']
+                k = start + len(data['time'])
+                if k > len(time) or not np.array_equal(time[start:k], data['time']):
+                    raise ValueError('Checkpoint does not match the simulation time of the environment.')
+                for i, col in enumerate(keys['columns']):
+                    if col not in df.columns:
+                        df[col] = np.nan
+                    elif not pd.api.types.is_float_dtype(df[col]):
+                        df[col] = df[col].astype(float)
+                    df.iloc[start:k, df.columns.get_loc(col)] = data[f'c{i}']
+                for i, name in enumerate(keys['storage']):
+                    es = next((es for es in operator.env.storage if es.name == name), None)
+                    if es is None:
+                        continue
+                    for j, col in enumerate(self.storage_columns):
+                        es.df.iloc[start:k, es.df.columns.get_loc(col)] = data[f's{i}_{j}']
+                pv_surplus[start:k] = data['pv_surplus']
+                wt_surplus[start:k] = data['wt_surplus']
+
+        return self.cursor + 1
@@ -0,0 +1,172 @@
+import numpy as np
+
+
+class StorageFleet:
+    """
+    Energy storages (components.storage.Storage) aggregated to one equivalent storage
+    The fleet is dispatched in one operation per time step within its power / energy envelope (sum of the
+    charge and discharge limits of all units), the flows are then split between the units by the allocation
+    policy. Storage levels are arrays (units) or (units x runs).
+    """
+
+    policies = ('priority', 'pro_rata', 'aging')
+
+    def __init__(self,
+                 storage: list,
+                 dt: float,
+                 policy: str = 'priority'):
+        """
+        :param storage: list
+            energy storages
+        :param dt: float
+            time step [h]
+        :param policy: str
+            allocation policy between the units
+                priority: units are used in list order
+                pro_rata: flows are split according to free capacity (charge) / available energy (discharge),
+                          the units keep similar states of charge
+                aging: flows are split according to the energy throughput to end of life (capacity x cycle life),
+                       all units reach their cycle life at the same time
+        """
+        if policy not in self.policies:
+            raise ValueError(f'Unknown allocation policy {policy}. Choose from {self.policies}.')
+        self.storage = storage
+        self.dt = dt
+        self.policy = policy
+        self.p = np.array([es.p_n for es in storage], dtype=float)
+        self.c = np.array([es.c for es in storage], dtype=float)
+        self.q_min = np.array([es.soc_min * es.c for es in storage], dtype=float)
+        self.q_max = np.array([es.soc_max * es.c for es in storage], dtype=float)
+        self.n_charge = np.array([es.n_charge for es in storage], dtype=float)
+        self.n_discharge = np.array([es.n_discharge for es in storage], dtype=float)
+        self.wear = np.array([self.lifetime_weight(es) for es in storage], dtype=float)
+
+    def __len__(self):
+        return len(self.storage)
+
+    @staticmethod
+    def lifetime_weight(es):
+        """
+        :param es: components.storage.Storage
+        :return: float
+            throughput weight of the aging policy
+        """
+        return es.c * getattr(es, 'cycle_life', 1)
+
+    @staticmethod
+    def column(values: np.ndarray, q: np.ndarray):
+        """
+        :param values: np.ndarray
+            unit parameters
+        :param q: np.ndarray
+            storage levels
+        :return: np.ndarray
+            parameters broadcastable to the storage levels
+        """
+        return values.reshape((-1,) + (1,) * (q.ndim - 1))
+
+    ''' Envelope '''
+
+    def charge_limits(self, q: np.ndarray):
+        """
+        :param q: np.ndarray
+            storage levels [Wh]
+        :return: np.ndarray
+            maximum charging power per unit [W]
+        """
+        col = lambda values: self.column(values, q)
+        return np.minimum(col(self.p), np.maximum(col(self.q_max) - q, 0) / (col(self.n_charge) * self.dt))
+
+    def discharge_limits(self, q: np.ndarray):
+        """
+        :param q: np.ndarray
+            storage levels [Wh]
+        :return: np.ndarray
+            maximum discharging power per unit [W]
+        """
+        col = lambda values: self.column(values, q)
+        return np.minimum(col(self.p), np.maximum(q - col(self.q_min), 0) / (col(self.n_discharge) * self.dt))
+
+    def envelope(self, q: np.ndarray):
+        """
+        :param q: np.ndarray
+            storage levels [Wh]
+        :return: tuple
+            maximum charging power [W], maximum discharging power [W] of the fleet
+        """
+        return self.charge_limits(q).sum(axis=0), self.discharge_limits(q).sum(axis=0)
+
+    ''' Allocation '''
+
+    def allocate(self, power: np.ndarray, limits: np.ndarray, weights: np.ndarray):
+        """
+        Split fleet power between the units
+        :param power: np.ndarray
+            fleet power [W]
+        :param limits: np.ndarray
+            maximum power per unit [W]
+        :param weights: np.ndarray
+            split weights per unit (pro_rata, aging)
+        :return: np.ndarray
+            power per unit [W]
+        """
+        power = np.minimum(np.maximum(power, 0), limits.sum(axis=0))
+        if self.policy == 'priority':
+            cum = np.cumsum(limits, axis=0)
+            return np.clip(power - (cum - limits), 0, limits)
+        # Weighted split, shares above the unit limits are passed on to the other units
+        weights = np.broadcast_to(weights, limits.shape)
+        shares = np.zeros_like(limits)
+        remaining = power
+        for _ in range(len(self)):
+            open_weights = np.where(shares < limits, weights, 0)
+            total = open_weights.sum(axis=0)
+            if not np.any((remaining > 1e-9) & (total > 0)):
+                break
+            added = np.minimum(shares + remaining * open_weights / np.where(total > 0, total, 1), limits)
+            remaining = remaining - (added - shares).sum(axis=0)
+            shares = added
+
+        return shares
+
+    def charge(self, q: np.ndarray, power: np.ndarray):
+        """
+        Charge fleet (storage levels are updated in place)
+        :param q: np.ndarray
+            storage levels [Wh]
+        :param power: np.ndarray
+            available charging power [W]
+        :return: np.ndarray
+            charging power per unit [W]
+        """
+        col = lambda values: self.column(values, q)
+        limits = self.charge_limits(q)
+        if self.policy == 'pro_rata':
+            weights = np.maximum(col(self.q_max) - q, 0)
+        else:
+            weights = col(self.wear)
+        shares = self.allocate(power=power, limits=limits, weights=weights)
+        q += shares * col(self.n_charge) * self.dt
+
+        return shares
+
+    def discharge(self, q: np.ndarray, power: np.ndarray):
+        """
+        Discharge fleet (storage levels are updated in place)
+        :param q: np.ndarray
+            storage levels [Wh]
+        :param power: np.ndarray
+            requested discharging power [W]
+        :return: np.ndarray
+            discharging power per unit [W]
+        """
+        col = lambda values: self.column(values, q)
+        limits = self.discharge_limits(q)
+        if self.policy == 'pro_rata':
+            weights = np.maximum(q - col(self.q_min), 0)
+        else:
+            weights = col(self.wear)
+        shares = self.allocate(power=power, limits=limits, weights=weights)
+        q -= shares * col(self.n_discharge) * self.dt
+
+        return shares
@@ -0,0 +1,286 @@
+import numpy as np
+# MiGUEL modules
+from dispatch.base import DispatchStrategy, register_strategy
+from dispatch.hydrogen import HydrogenSystem
+
+
+def storage_dispatch(state,
+                     pv_surplus: np.ndarray,
+                     wt_surplus: np.ndarray,
+                     p_res: np.ndarray,
+                     discharge_allowed: np.ndarray):
+    """
+    Charge energy storages from RE surplus (PV first) and discharge them to cover the residual load.
+    The storages are dispatched as one fleet (state.fleet) with the energy model of components.storage.Storage,
+    flows are split between the units by the fleet allocation policy. Only time steps with surplus or
+    residual load are processed, the storage level in between is carried forward.
+    Component DataFrames are only updated if state.update_components is set.
+    :param state: dispatch.base.DispatchState
+    :param pv_surplus: np.ndarray
+        PV surplus [W] (runs x time steps)
+    :param wt_surplus: np.ndarray
+        wind surplus [W] (runs x time steps)
+    :param p_res: np.ndarray
+        residual load [W] (runs x time steps)
+    :param discharge_allowed: np.ndarray
+        storage discharge allowed in time step
+    :return: tuple
+        columns, PV surplus [W], wind surplus [W], residual load [W]
+    """
+    runs, n = p_res.shape
+    nb = len(state.storage)
+    columns = {}
+    if nb == 0:
+        columns['PV_to_storage [W]'] = np.zeros_like(p_res)
+        columns['WT_to_storage[W]'] = np.zeros_like(p_res)
+        return columns, pv_surplus, wt_surplus, p_res
+    fleet = state.fleet
+    surplus = pv_surplus + wt_surplus
+    request = np.where(discharge_allowed, p_res, 0)
+    charge = np.zeros((nb, runs, n))
+    discharge = np.zeros((nb, runs, n))
+    level = np.full((nb, runs, n), np.nan)
+    q = np.tile(state.es_soc * state.es_c, (runs, 1)).T
+    level[:, :, 0] = q
+    # Storage is idle in the first time step (initial state, see Storage.charge/discharge)
+    active = np.flatnonzero(((surplus > 0) | (request > 0)).any(axis=0))
+    for t in active[active + state.start > 0]:
+        charge[:, :, t] = fleet.charge(q=q, power=surplus[:, t])
+        discharge[:, :, t] = fleet.discharge(q=q, power=request[:, t])
+        level[:, :, t] = q
+    # Carry storage level forward between processed time steps
+    filled = np.where(np.isnan(level), 0, np.arange(n))
+    level = np.take_along_axis(level, np.maximum.accumulate(filled, axis=2), axis=2)
+
+    total_charge = charge.sum(axis=0)
+    pv_to_storage = np.minimum(pv_surplus, total_charge)
+    columns['PV_to_storage [W]'] = pv_to_storage
+    columns['WT_to_storage[W]'] = total_charge - pv_to_storage
+    for j, es in enumerate(state.storage):
+        columns[f'{es.name} [W]'] = charge[j] - discharge[j]
+        columns[f'{es.name} soc'] = level[j] / es.c
+        if state.update_components:
+            es.df['P [W]'] = charge[j, 0] - discharge[j, 0]
+            es.df['Q [Wh]'] = level[j, 0]
+            es.df['SOC'] = level[j, 0] / es.c
+
+    return (columns,
+            pv_surplus - pv_to_storage,
+            wt_surplus - (total_charge - pv_to_storage),
+            np.clip(p_res - discharge.sum(axis=0), 0, None))
+
+
+def hydrogen_dispatch(state,
+                      pv_surplus: np.ndarray,
+                      wt_surplus: np.ndarray,
+                      p_res: np.ndarray):
+    """
+    Run event-driven hydrogen subsystem for every run
+    Component DataFrames are only updated if state.update_components is set.
+    :param state: dispatch.base.DispatchState
+    :param pv_surplus: np.ndarray
+        PV surplus [W] (runs x time steps)
+    :param wt_surplus: np.ndarray
+        wind surplus [W] (runs x time steps)
+    :param p_res: np.ndarray
+        residual load [W] (runs x time steps)
+    :return: tuple
+        columns, residual load [W], HydrogenSystem (last run)
+    """
+    env = state.env
+    if len(env.H2Storage) == 0:
+        return {}, p_res, None
+    runs = p_res.shape[0]
+    columns = {}
+    fc_power = np.zeros_like(p_res)
+    h2_system = None
+    for r in range(runs):
+        h2_system = HydrogenSystem(env=env, policy=state.h2_policy)
+        h2_system.run(pv_surplus=pv_surplus[r],
+                      wt_surplus=wt_surplus[r],
+                      residual=p_res[r],
+                      update=state.update_components,
+                      level0=state.hs_level)
+        for col, values in h2_system.result_columns().items():
+            columns.setdefault(col, np.zeros_like(p_res))[r] = values
+        fc_power[r] = h2_system.results['fc_power'].sum(axis=0)
+
+    return columns, np.clip(p_res - fc_power, 0, None), h2_system
+
+
+def grid_supply(state, p_res: np.ndarray):
+    """
+    Cover residual load from grid where available
+    :param state: dispatch.base.DispatchState
+    :param p_res: np.ndarray
+        residual load [W] (runs x time steps)
+    :return: tuple
+        columns, residual load [W]
+    """
+    if state.grid is None:
+        return {}, p_res
+    grid = np.where(state.grid_available, p_res, 0)
+
+    return {f'{state.grid} [W]': grid}, p_res - grid
+
+
+def diesel_dispatch(state, p_res: np.ndarray):
+    """
+    Cover residual load from diesel generators (last priority, generators in list order)
+    Component DataFrames are only updated if state.update_components is set.
+    :param state: dispatch.base.DispatchState
+    :param p_res: np.ndarray
+        residual load [W] (runs x time steps)
+    :return: tuple
+        columns, residual load [W]
+    """
+    columns = {}
+    for dg in getattr(state.env, 'diesel_generator', []):
+        carry = state.dg_carry.get(dg.name)
+        supply, power, fuel = dg.dispatch(p_res=p_res, update=state.update_components, carry=carry)
+        # Runtime state for the next chunk (dispatch.streaming.StreamingDispatch)
+        state.dg_carry[dg.name] = dg.runtime_carry(np.nan_to_num(p_res) > 0, carry=carry)
+        columns[f'{dg.name} [W]'] = power
+        columns[f'{dg.name} Fuel [l]'] = fuel
+        p_res = p_res - supply
+
+    return columns, p_res
+
+
+def squeeze_columns(state, columns: dict):
+    """
+    Remove run axis for single (1D) state arrays
+    :param state: dispatch.base.DispatchState
+    :param columns: dict
+    :return: dict
+    """
+    if state.load.ndim > 1:
+        return columns
+
+    return {col: np.asarray(values)[0] for col, values in columns.items()}
+
+
+@register_strategy
+class GreedyCurrent(DispatchStrategy):
+    """
+    Time step dispatch of operation.Operator (reference implementation)
+    Priorities: RE self supply, storage charging, electrolyser, storage discharge, fuel cell, grid,
+    diesel generator.
+    """
+
+    name = 'greedy-current'
+    vectorizable = False
+    checkpoints = True
+
+    def run(self, operator):
+        """
+        :param operator: operation.Operator
+        :return: dict
+            empty, results are written to Operator.df directly
+        """
+        operator.greedy_dispatch()
+
+        return {}
+
+
+@register_strategy
+class VectorizedGreedy(DispatchStrategy):
+    """
+    Greedy dispatch on state arrays with the priorities of greedy-current
+        1) RE self supply
+        2) Charge storage from RE
+        3) Operate electrolyser from RE surplus
+        4) Cover residual load from storage (not while grid is available in unstable grids),
+           grid and fuel cell
+        5) Cover remaining residual load from diesel generators
+    Only time steps with surplus or residual load are processed, several runs (e.g. stochastic
+    realizations) are dispatched together. The storage stage is cached in the state (storage_stage),
+    changes of the hydrogen subsystem reuse it.
+    """
+
+    name = 'vectorized-greedy'
+    vectorizable = True
+
+    def __init__(self):
+        self.h2_system = None
+
+    def dispatch(self, state):
+        """
+        :param state: dispatch.base.DispatchState
+        :return: dict
+            Operator.df column: flow array
+        """
+        load = np.atleast_2d(state.load)
+        columns, pv_remain, wt_remain, p_res = state.self_supply()
+        if state.storage_stage is None or state.storage_stage[3].shape != load.shape:
+            # Unstable grid: storage only discharged during blackouts
+            discharge_allowed = np.broadcast_to(~(state.blackout & state.grid_available), load.shape)
+            state.storage_stage = storage_dispatch(state=state,
+                                                   pv_surplus=pv_remain,
+                                                   wt_surplus=wt_remain,
+                                                   p_res=p_res,
+                                                   discharge_allowed=discharge_allowed)
+        es_columns, pv_remain, wt_remain, p_res = state.storage_stage
+        columns.update(es_columns)
+        grid_columns, p_res = grid_supply(state, p_res)
+        columns.update(grid_columns)
+        h2_columns, p_res, self.h2_system = hydrogen_dispatch(state=state,
+                                                              pv_surplus=pv_remain,
+                                                              wt_surplus=wt_remain,
+                                                              p_res=p_res)
+        columns.update(h2_columns)
+        dg_columns, p_res = diesel_dispatch(state, p_res)
+        columns.update(dg_columns)
+        columns['P_Res [W]'] = p_res
+
+        return squeeze_columns(state, columns)
+
+
+@register_strategy
+class LoadFollowingFC(DispatchStrategy):
+    """
+    Load following fuel cell dispatch
+        1) RE self supply
+        2) Electrolyser from RE surplus, fuel cell follows the residual load
+        3) Energy storage buffers the remaining surplus and residual load
+        4) Cover residual load from grid
+        5) Cover remaining residual load from diesel generators
+    The hydrogen chain runs ahead of the energy storage, so both stages are processed independently.
+    """
+
+    name = 'load-following-FC'
+    vectorizable = True
+
+    def __init__(self):
+        self.h2_system = None
+
+    def dispatch(self, state):
+        """
+        :param state: dispatch.base.DispatchState
+        :return: dict
+            Operator.df column: flow array
+        """
+        load = np.atleast_2d(state.load)
+        columns, pv_remain, wt_remain, p_res = state.self_supply()
+        h2_columns, p_res_fc, self.h2_system = hydrogen_dispatch(state=state,
+                                                                 pv_surplus=pv_remain,
+                                                                 wt_surplus=wt_remain,
+                                                                 p_res=p_res)
+        columns.update(h2_columns)
+        if 'from_PV_to_electrolyser [W]' in h2_columns:
+            pv_remain = pv_remain - h2_columns['from_PV_to_electrolyser [W]']
+            wt_remain = wt_remain - h2_columns['from_WT_to_electrolyser [W]']
+        discharge_allowed = np.broadcast_to(~(state.blackout & state.grid_available), load.shape)
+        es_columns, pv_remain, wt_remain, p_res = storage_dispatch(state=state,
+                                                                   pv_surplus=pv_remain,
+                                                                   wt_surplus=wt_remain,
+                                                                   p_res=p_res_fc,
+                                                                   discharge_allowed=discharge_allowed)
+        columns.update(es_columns)
+        grid_columns, p_res = grid_supply(state, p_res)
+        columns.update(grid_columns)
+        dg_columns, p_res = diesel_dispatch(state, p_res)
+        columns.update(dg_columns)
+        columns['P_Res [W]'] = p_res
+
+        return squeeze_columns(state, columns)
@@ -0,0 +1,253 @@
+import numpy as np
+import pandas as pd
+
+LHV_H2 = 33.33 * 1000  # Wh/kg
+
+
+class HydrogenSystem:
+    """
+    Event-driven model of the hydrogen chain (Electrolyser -> H2Storage -> FuelCell)
+    Only time steps with RE surplus or residual load (events) are processed. The storage
+    level between events is constant and is reconstructed with cumulative sums of the
+    hydrogen in- and outflows, so runtime scales with the number of events.
+    """
+
+    policies = ('priority', 'pro_rata')
+
+    def __init__(self,
+                 env,
+                 electrolyser: list = None,
+                 h2_storage: list = None,
+                 fuel_cell: list = None,
+                 policy: str = 'priority'):
+        """
+        :param env: environment.Environment
+            system environment
+        :param electrolyser: list
+            electrolysers, defaults to env.electrolyser
+        :param h2_storage: list
+            hydrogen storages, defaults to env.H2Storage
+        :param fuel_cell: list
+            fuel cells, defaults to env.fuel_cell
+        :param policy: str
+            allocation policy between several units of the same type
+                priority: units are used in list order
+                pro_rata: flows are split according to nominal power / free capacity
+        """
+        if policy not in self.policies:
+            raise ValueError(f'Unknown allocation policy {policy}. Choose from {self.policies}.')
+        self.env = env
+        self.electrolyser = env.electrolyser if electrolyser is None else electrolyser
+        self.h2_storage = env.H2Storage if h2_storage is None else h2_storage
+        self.fuel_cell = env.fuel_cell if fuel_cell is None else fuel_cell
+        self.policy = policy
+        self.events = np.array([], dtype=int)
+        self.results = {}
+
+    @staticmethod
+    def allocate(demand: float, limits: np.ndarray, policy: str):
+        """
+        Split demand between units
+        :param demand: float
+            total demand
+        :param limits: np.ndarray
+            maximum share per unit
+        :param policy: str
+            allocation policy
+        :return: np.ndarray
+            share per unit
+        """
+        limits = np.maximum(limits, 0)
+        total = limits.sum()
+        if demand <= 0 or total <= 0:
+            return np.zeros(len(limits))
+        if demand >= total:
+            return limits.astype(float)
+        if policy == 'pro_rata':
+            return limits * demand / total
+        # priority: fill units in list order
+        cum = np.cumsum(limits)
+        return np.clip(demand - (cum - limits), 0, limits)
+
+    def run(self,
+            pv_surplus: np.ndarray,
+            wt_surplus: np.ndarray,
+            residual: np.ndarray,
+            update: bool = True,
+            level0: np.ndarray = None):
+        """
+        Run hydrogen subsystem
+        :param pv_surplus: np.ndarray
+            PV power available for the electrolysers [W]
+        :param wt_surplus: np.ndarray
+            wind power available for the electrolysers [W]
+        :param residual: np.ndarray
+            residual load to be covered by the fuel cells [W]
+        :param update: bool
+            write results to the component DataFrames
+        :param level0: np.ndarray
+            initial hydrogen storage levels [kg], defaults to the current levels of the storages
+        :return: dict
+            result arrays
+        """
+        pv_surplus = np.nan_to_num(np.asarray(pv_surplus, dtype=float))
+        wt_surplus = np.nan_to_num(np.asarray(wt_surplus, dtype=float))
+        residual = np.nan_to_num(np.asarray(residual, dtype=float))
+        n = len(residual)
+        n_el = len(self.electrolyser)
+        n_hs = len(self.h2_storage)
+        n_fc = len(self.fuel_cell)
+
+        el_power = np.zeros((n_el, n))
+        el_p_rel = np.zeros((n_el, n))
+        el_eff = np.zeros((n_el, n))
+        el_h2 = np.zeros((n_el, n))
+        el_pv = np.zeros(n)
+        el_wt = np.zeros(n)
+        hs_in = np.zeros((n_hs, n))
+        hs_out = np.zeros((n_hs, n))
+        fc_power = np.zeros((n_fc, n))
+        fc_h2 = np.zeros((n_fc, n))
+
+        t_step = self.env.i_step / 60
+        capacity = np.array([hs.capacity for hs in self.h2_storage], dtype=float)
+        level_min = np.array([hs.soc_min * hs.capacity for hs in self.h2_storage], dtype=float)
+        if level0 is None:
+            level0 = np.array([hs.current_level for hs in self.h2_storage], dtype=float)
+        level0 = np.asarray(level0, dtype=float)
+        level = level0.copy()
+        el_p_n = np.array([el.p_n for el in self.electrolyser], dtype=float)
+        fc_p_n = np.array([fc.max_power for fc in self.fuel_cell], dtype=float)
+
+        # Events: time steps with nonzero hydrogen flows possible
+        surplus = pv_surplus + wt_surplus
+        charge_possible = (surplus > 0) if (n_el > 0 and n_hs > 0) else np.zeros(n, dtype=bool)
+        discharge_possible = (residual > 0) if (n_fc > 0 and n_hs > 0) else np.zeros(n, dtype=bool)
+        self.events = np.flatnonzero(charge_possible | discharge_possible)
+
+        for t in self.events:
+            # Electrolysers (only if hydrogen storages are not full)
+            if charge_possible[t] and np.any(level < capacity):
+                shares = self.allocate(demand=surplus[t], limits=el_p_n, policy=self.policy)
+                h2_produced = 0.0
+                free = float(np.sum(capacity - level))
+                for k, el in enumerate(self.electrolyser):
+                    power, p_rel, eff, h2 = el.calc_operating_point(power=shares[k])
+                    # Power limited to the hydrogen the storages can take (part load efficiency)
+                    for _ in range(3):
+                        if h2 <= free or power <= 0 or eff <= 0:
+                            break
+                        power, p_rel, eff, h2 = el.calc_operating_point(power=free * LHV_H2 / (eff * t_step))
+                    free = max(free - h2, 0.0)
+                    el_power[k, t] = power
+                    el_p_rel[k, t] = p_rel
+                    el_eff[k, t] = eff
+                    el_h2[k, t] = h2
+                    h2_produced += h2
+                used = el_power[:, t].sum()
+                el_pv[t] = min(pv_surplus[t], used)
+                el_wt[t] = used - el_pv[t]
+                inflow = self.allocate(demand=h2_produced, limits=capacity - level, policy=self.policy)
+                hs_in[:, t] = inflow
+                level += inflow
+            # Fuel cells
+            if discharge_possible[t]:
+                available = np.maximum(level - level_min, 0)
+                if available.sum() <= 0:
+                    continue
+                requests = self.allocate(demand=residual[t], limits=fc_p_n, policy=self.policy)
+                for k, fc in enumerate(self.fuel_cell):
+                    power, h2 = fc.calc_operating_point(power=requests[k],
+                                                        h2_available=available.sum())
+                    if h2 <= 0:
+                        continue
+                    outflow = self.allocate(demand=h2, limits=available, policy=self.policy)
+                    hs_out[:, t] += outflow
+                    level -= outflow
+                    available -= outflow
+                    fc_power[k, t] = power
+                    fc_h2[k, t] = h2
+
+        # Storage level between events from cumulative sums of the flows
+        hs_level = level0[:, None] + np.cumsum(hs_in - hs_out, axis=1)
+
+        self.results = {'el_power': el_power,
+                        'el_p_rel': el_p_rel,
+                        'el_efficiency': el_eff,
+                        'el_h2': el_h2,
+                        'pv_to_el': el_pv,
+                        'wt_to_el': el_wt,
+                        'hs_inflow': hs_in,
+                        'hs_outflow': hs_out,
+                        'hs_level': hs_level,
+                        'fc_power': fc_power,
+                        'fc_h2': fc_h2}
+        if update:
+            self.update_components()
+
+        return self.results
+
+    def update_components(self):
+        """
+        Write result arrays to the component DataFrames and set final component states
+        :return: None
+        """
+        res = self.results
+        t_step = self.env.i_step / 60
+        for k, el in enumerate(self.electrolyser):
+            el.df_electrolyser['P[W]'] = res['el_power'][k]
+            el.df_electrolyser['P[%]'] = res['el_p_rel'][k]
+            el.df_electrolyser['Efficiency'] = np.round(res['el_efficiency'][k], 2)
+            el.df_electrolyser['H2_Production [kg]'] = res['el_h2'][k]
+        for k, hs in enumerate(self.h2_storage):
+            hs.hstorage_df['H2 Inflow [kg]'] = res['hs_inflow'][k]
+            hs.hstorage_df['H2 Outflow [kg]'] = res['hs_outflow'][k]
+            hs.hstorage_df['Storage Level [kg]'] = res['hs_level'][k]
+            hs.hstorage_df['SOC [%]'] = res['hs_level'][k] / hs.capacity * 100
+            hs.hstorage_df['Q[Wh]'] = res['hs_level'][k] * LHV_H2
+            if res['hs_level'].shape[1] > 0:
+                hs.current_level = float(res['hs_level'][k, -1])
+        for k, fc in enumerate(self.fuel_cell):
+            fc.df_fc['Power Output [W]'] = res['fc_power'][k]
+            fc.df_fc['H2 Consumed [kg]'] = res['fc_h2'][k]
+            fc.operating_hours += np.count_nonzero(res['fc_power'][k]) * t_step
+
+    def result_columns(self):
+        """
+        Convert result arrays to Operator.df columns
+        :return: dict
+            column name: np.ndarray
+        """
+        res = self.results
+        t_step = self.env.i_step / 60
+        columns = {'from_PV_to_electrolyser [W]': res['pv_to_el'],
+                   'from_WT_to_electrolyser [W]': res['wt_to_el']}
+        for k, el in enumerate(self.electrolyser):
+            columns[f'{el.name}_Input_Power [W]'] = res['el_power'][k]
+            columns[f'{el.name} [W]'] = res['el_power'][k]
+            columns[f'{el.name} [%]'] = res['el_p_rel'][k]
+            columns[f'{el.name}_Hydrogen [kg]'] = res['el_h2'][k]
+            columns[f'{el.name} Efficiency [%]'] = np.where(res['el_power'][k] > 0, res['el_efficiency'][k] * 100, 0)
+        for k, hs in enumerate(self.h2_storage):
+            columns[f'{hs.name} [W]'] = (res['hs_inflow'][k] - res['hs_outflow'][k]) * LHV_H2 / t_step
+            columns[f'{hs.name} SOC[%]'] = res['hs_level'][k] / hs.capacity * 100
+            columns[f'{hs.name} level [kg]'] = res['hs_level'][k]
+        if len(self.h2_storage) > 0:
+            total_capacity = sum(hs.capacity for hs in self.h2_storage)
+            columns['H2-SOC [%]'] = res['hs_level'].sum(axis=0) / total_capacity * 100
+        for k, fc in enumerate(self.fuel_cell):
+            columns[f'{fc.name} [W]'] = res['fc_power'][k]
+
+        return columns
+
+    def summary(self):
+        """
+        Summarize hydrogen flows
+        :return: pd.Series
+        """
+        res = self.results
+        return pd.Series({'Events': len(self.events),
+                          'H2 produced [kg]': res['el_h2'].sum(),
+                          'H2 stored [kg]': res['hs_inflow'].sum(),
+                          'H2 consumed [kg]': res['fc_h2'].sum(),
+                          'FC energy [kWh]': res['fc_power'].sum() * self.env.i_step / 60 / 1000})
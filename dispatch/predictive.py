@@ -0,0 +1,375 @@
+import datetime as dt
+import numpy as np
+# MiGUEL modules
+from components.pv import PV
+from dispatch.base import DispatchStrategy, register_strategy
+from dispatch.hydrogen import HydrogenSystem
+
+LHV_H2 = 33.33  # kWh/kg
+
+
+@register_strategy
+class RollingHorizonDispatch(DispatchStrategy):
+    """
+    Predictive dispatch strategy
+    A linear program over a rolling window (default 48 h, re-solved every 24 h) schedules energy
+    storages, electrolysers, fuel cells and the grid with perfect foresight of load and RE production.
+    Only the first part of every window is committed, the final storage states are carried into the
+    next window. The LP is solved locally with HiGHS (scipy.optimize.linprog).
+
+    Simplifications compared to the component models:
+        - constant efficiencies (electrolyser and fuel cell at nominal power)
+        - no minimum load of the electrolyser (LP relaxation)
+        - hydrogen storages are aggregated to one pool, levels are split pro rata to capacity
+    """
+
+    name = 'predictive'
+    vectorizable = False
+
+    def __init__(self,
+                 horizon: dt.timedelta = dt.timedelta(hours=48),
+                 step: dt.timedelta = dt.timedelta(hours=24),
+                 voll: float = 10.0,
+                 terminal_value: float = None):
+        """
+        :param horizon: dt.timedelta
+            optimization window
+        :param step: dt.timedelta
+            committed part of each window (re-solve interval)
+        :param voll: float
+            value of lost load [US$/kWh]
+        :param terminal_value: float
+            value of energy stored at the end of a window [US$/kWh],
+            defaults to half the mean grid import price (grid connected) or half the value of lost load
+        """
+        if step > horizon:
+            raise ValueError('Re-solve step must not be longer than the horizon.')
+        self.horizon = horizon
+        self.step = step
+        self.voll = voll
+        self.terminal_value = terminal_value
+        # Constraint matrix cache: matrices are built once per window length and reused,
+        # HiGHS solves every window from scratch (no basis reuse)
+        self._constraint_matrices = {}
+        self.windows = 0
+
+    ''' Problem setup '''
+
+    def setup(self, operator):
+        """
+        Collect component parameters from the environment
+        :param operator: operation.Operator
+        :return: None
+        """
+        env = operator.env
+        self.env = env
+        self.dt = env.i_step / 60  # h
+        self.n_horizon = max(1, int(self.horizon / env.t_step))
+        self.n_step = max(1, int(self.step / env.t_step))
+        self.storage = env.storage
+        self.electrolyser = env.electrolyser if len(env.H2Storage) > 0 else []
+        self.fuel_cell = env.fuel_cell if len(env.H2Storage) > 0 else []
+        self.h2_storage = env.H2Storage
+        self.nb = len(self.storage)
+        self.ne = len(self.electrolyser)
+        self.nf = len(self.fuel_cell)
+        self.nh = 1 if len(self.h2_storage) > 0 else 0
+        # Variable offsets in one time step block
+        self.o_cb = 0
+        self.o_db = self.nb
+        self.o_eb = 2 * self.nb
+        self.o_el = 3 * self.nb
+        self.o_fc = self.o_el + self.ne
+        self.o_g = self.o_fc + self.nf
+        self.o_u = self.o_g + 1
+        self.o_x = self.o_u + 1
+        self.o_h = self.o_x + 1
+        self.nv = self.o_h + self.nh
+        # Technical parameters [kW, kWh, kg]
+        self.es_p = np.array([es.p_n / 1000 for es in self.storage], dtype=float)
+        self.es_min = np.array([es.soc_min * es.c / 1000 for es in self.storage], dtype=float)
+        self.es_max = np.array([es.soc_max * es.c / 1000 for es in self.storage], dtype=float)
+        self.es_n_charge = np.array([es.n_charge for es in self.storage], dtype=float)
+        self.es_n_discharge = np.array([es.n_discharge for es in self.storage], dtype=float)
+        self.el_p = np.array([el.p_n / 1000 for el in self.electrolyser], dtype=float)
+        self.el_eff = np.array([el.calc_efficiency(p_rel=100) for el in self.electrolyser], dtype=float)
+        self.fc_p = np.array([fc.max_power / 1000 for fc in self.fuel_cell], dtype=float)
+        self.fc_eff = np.array([fc.get_efficiency(p_rel=100) for fc in self.fuel_cell], dtype=float)
+        self.h2_capacity = sum(hs.capacity for hs in self.h2_storage)
+        self.h2_min = sum(hs.soc_min * hs.capacity for hs in self.h2_storage)
+        # Economic parameters [US$/kWh], time-of-use import prices of the grid tariff
+        if env.grid_connection:
+            self.grid_price = env.grid_tariff().import_prices(env.time)
+        else:
+            self.grid_price = np.zeros(len(env.time))
+        if self.terminal_value is None:
+            self.terminal_value = 0.5 * self.grid_price.mean() if env.grid_connection else 0.5 * self.voll
+        self.es_cost = np.array([es.c_var_n for es in self.storage], dtype=float) / 2 + 1e-5
+        self.el_cost = np.full(self.ne, 1e-5)
+        self.fc_cost = np.array([fc.c_var_n for fc in self.fuel_cell], dtype=float) + 2e-5
+
+    def build_matrix(self, n: int):
+        """
+        Build equality constraint matrix for a window with n time steps
+        :param n: int
+            window length [time steps]
+        :return: scipy.sparse.csr_matrix
+        """
+        if n in self._constraint_matrices:
+            return self._constraint_matrices[n]
+        rows, cols, vals = [], [], []
+        n_rows = 2 + self.nb + self.nh
+
+        def add(r, c, v):
+            rows.append(r)
+            cols.append(c)
+            vals.append(v)
+
+        for t in range(n):
+            r0 = t * n_rows
+            v0 = t * self.nv
+            # 1) RE surplus: charge + electrolyser + spill = surplus
+            for j in range(self.nb):
+                add(r0, v0 + self.o_cb + j, 1)
+            for k in range(self.ne):
+                add(r0, v0 + self.o_el + k, 1)
+            add(r0, v0 + self.o_x, 1)
+            # 2) Deficit: discharge + fuel cell + grid + unmet = deficit
+            for j in range(self.nb):
+                add(r0 + 1, v0 + self.o_db + j, 1)
+            for m in range(self.nf):
+                add(r0 + 1, v0 + self.o_fc + m, 1)
+            add(r0 + 1, v0 + self.o_g, 1)
+            add(r0 + 1, v0 + self.o_u, 1)
+            # 3) Storage balance
+            for j in range(self.nb):
+                r = r0 + 2 + j
+                add(r, v0 + self.o_eb + j, 1)
+                add(r, v0 + self.o_cb + j, -self.es_n_charge[j] * self.dt)
+                # Energy model of components.storage.Storage: discharging removes P * n_discharge * dt
+                add(r, v0 + self.o_db + j, self.es_n_discharge[j] * self.dt)
+                if t > 0:
+                    add(r, v0 - self.nv + self.o_eb + j, -1)
+            # 4) Hydrogen balance
+            if self.nh:
+                r = r0 + 2 + self.nb
+                add(r, v0 + self.o_h, 1)
+                for k in range(self.ne):
+                    add(r, v0 + self.o_el + k, -self.el_eff[k] * self.dt / LHV_H2)
+                for m in range(self.nf):
+                    add(r, v0 + self.o_fc + m, self.dt / (LHV_H2 * self.fc_eff[m]))
+                if t > 0:
+                    add(r, v0 - self.nv + self.o_h, -1)
+
+        import scipy.sparse as sp
+
+        matrix = sp.csr_matrix((vals, (rows, cols)), shape=(n * n_rows, n * self.nv))
+        self._constraint_matrices[n] = matrix
+
+        return matrix
+
+    def solve_window(self,
+                     surplus: np.ndarray,
+                     deficit: np.ndarray,
+                     grid_available: np.ndarray,
+                     grid_price: np.ndarray,
+                     es_level: np.ndarray,
+                     h2_level: float):
+        """
+        Solve LP for one window
+        :param surplus: np.ndarray
+            RE surplus [kW]
+        :param deficit: np.ndarray
+            residual load after RE self supply [kW]
+        :param grid_available: np.ndarray
+            grid available in time step
+        :param grid_price: np.ndarray
+            grid import price [US$/kWh]
+        :param es_level: np.ndarray
+            initial storage energy [kWh]
+        :param h2_level: float
+            initial hydrogen pool level [kg]
+        :return: np.ndarray
+            solution (time steps x variables)
+        """
+        n = len(surplus)
+        nv = self.nv
+        n_rows = 2 + self.nb + self.nh
+        a_eq = self.build_matrix(n)
+        # Right hand side
+        b_eq = np.zeros((n, n_rows))
+        b_eq[:, 0] = surplus
+        b_eq[:, 1] = deficit
+        b_eq[0, 2:2 + self.nb] = es_level
+        if self.nh:
+            b_eq[0, 2 + self.nb] = h2_level
+        # Bounds
+        lb = np.zeros((n, nv))
+        ub = np.zeros((n, nv))
+        ub[:, self.o_cb:self.o_cb + self.nb] = self.es_p
+        ub[:, self.o_db:self.o_db + self.nb] = self.es_p
+        lb[:, self.o_eb:self.o_eb + self.nb] = np.minimum(self.es_min, es_level)
+        ub[:, self.o_eb:self.o_eb + self.nb] = np.maximum(self.es_max, es_level)
+        ub[:, self.o_el:self.o_el + self.ne] = self.el_p
+        ub[:, self.o_fc:self.o_fc + self.nf] = self.fc_p
+        ub[:, self.o_g] = np.where(grid_available, deficit, 0)
+        ub[:, self.o_u] = deficit
+        ub[:, self.o_x] = surplus
+        if self.nh:
+            lb[:, self.o_h] = min(self.h2_min, h2_level)
+            ub[:, self.o_h] = max(self.h2_capacity, h2_level)
+        # Objective [US$]
+        c = np.zeros((n, nv))
+        c[:, self.o_cb:self.o_cb + self.nb] = self.es_cost * self.dt
+        c[:, self.o_db:self.o_db + self.nb] = self.es_cost * self.dt
+        c[:, self.o_el:self.o_el + self.ne] = self.el_cost * self.dt
+        c[:, self.o_fc:self.o_fc + self.nf] = self.fc_cost * self.dt
+        c[:, self.o_g] = grid_price * self.dt
+        c[:, self.o_u] = self.voll * self.dt
+        # Value of stored energy at the end of the window
+        c[-1, self.o_eb:self.o_eb + self.nb] -= self.terminal_value / self.es_n_discharge
+        if self.nh and self.nf > 0:
+            c[-1, self.o_h] -= self.terminal_value * LHV_H2 * self.fc_eff.max()
+
+        from scipy.optimize import linprog
+
+        result = linprog(c.ravel(),
+                         A_eq=a_eq,
+                         b_eq=b_eq.ravel(),
+                         bounds=np.column_stack([lb.ravel(), ub.ravel()]),
+                         method='highs')
+        if result.status != 0:
+            raise RuntimeError(f'Predictive dispatch: LP not solved ({result.message})')
+        self.windows += 1
+
+        return result.x.reshape(n, nv)
+
+    ''' Dispatch '''
+
+    def run(self, operator):
+        """
+        Run rolling horizon dispatch
+        :param operator: operation.Operator
+        :return: dict
+            Operator.df columns
+        """
+        self.setup(operator)
+        env = self.env
+        df = operator.df
+        n = len(df.index)
+        load = df['Load [W]'].to_numpy(dtype=float)
+        columns = {}
+        # Priority 1: RE self supply (identical to greedy dispatch)
+        p_res = load.copy()
+        pv_remain = np.zeros(n)
+        wt_remain = np.zeros(n)
+        for component in env.re_supply:
+            production = np.nan_to_num(component.df['P [W]'].to_numpy(dtype=float))
+            supply = np.clip(np.minimum(production, p_res), 0, None)
+            remain = np.clip(production - p_res, 0, None)
+            p_res = np.clip(p_res - supply, 0, None)
+            columns[f'{component.name} [W]'] = supply
+            columns[f'{component.name} remain [W]'] = remain
+            if isinstance(component, PV):
+                pv_remain += remain
+            else:
+                wt_remain += remain
+        columns['P_Remain_total [W]'] = pv_remain + wt_remain
+        surplus = (pv_remain + wt_remain) / 1000
+        deficit = p_res / 1000
+        if env.grid_connection:
+            if env.blackout:
+                grid_available = ~env.df['Blackout'].to_numpy(dtype=bool)
+            else:
+                grid_available = np.ones(n, dtype=bool)
+        else:
+            grid_available = np.zeros(n, dtype=bool)
+
+        # Rolling horizon
+        solution = np.zeros((n, self.nv))
+        es_level = np.array([es.soc * es.c / 1000 for es in self.storage], dtype=float)
+        h2_level = sum(hs.current_level for hs in self.h2_storage)
+        for start in range(0, n, self.n_step):
+            end = min(start + self.n_horizon, n)
+            x = self.solve_window(surplus=surplus[start:end],
+                                  deficit=deficit[start:end],
+                                  grid_available=grid_available[start:end],
+                                  grid_price=self.grid_price[start:end],
+                                  es_level=es_level,
+                                  h2_level=h2_level)
+            commit = min(self.n_step, n - start)
+            solution[start:start + commit] = x[:commit]
+            es_level = x[commit - 1, self.o_eb:self.o_eb + self.nb]
+            if self.nh:
+                h2_level = x[commit - 1, self.o_h]
+
+        columns.update(self.result_columns(operator=operator,
+                                           solution=solution,
+                                           pv_remain=pv_remain,
+                                           wt_remain=wt_remain))
+
+        return columns
+
+    def result_columns(self,
+                       operator,
+                       solution: np.ndarray,
+                       pv_remain: np.ndarray,
+                       wt_remain: np.ndarray):
+        """
+        Convert LP solution into Operator.df columns and component DataFrames
+        :param operator: operation.Operator
+        :param solution: np.ndarray
+            LP solution (time steps x variables) [kW, kWh, kg]
+        :param pv_remain: np.ndarray
+            PV surplus [W]
+        :param wt_remain: np.ndarray
+            wind surplus [W]
+        :return: dict
+        """
+        env = self.env
+        columns = {}
+        w = solution * 1000  # kW -> W, kWh -> Wh
+        charge = w[:, self.o_cb:self.o_cb + self.nb]
+        discharge = w[:, self.o_db:self.o_db + self.nb]
+        el_power = w[:, self.o_el:self.o_el + self.ne]
+        # Battery storage
+        for j, es in enumerate(self.storage):
+            power = charge[:, j] - discharge[:, j]
+            es.df['P [W]'] = power
+            es.df['Q [Wh]'] = w[:, self.o_eb + j]
+            es.df['SOC'] = w[:, self.o_eb + j] / es.c
+            columns[f'{es.name} [W]'] = power
+            columns[f'{es.name} soc'] = es.df['SOC'].to_numpy()
+        total_charge = charge.sum(axis=1)
+        pv_to_storage = np.minimum(pv_remain, total_charge)
+        columns['PV_to_storage [W]'] = pv_to_storage
+        columns['WT_to_storage[W]'] = total_charge - pv_to_storage
+        # Hydrogen subsystem
+        if self.nh:
+            total_el = el_power.sum(axis=1)
+            pv_to_el = np.minimum(pv_remain - pv_to_storage, total_el)
+            h2_in = (el_power * self.el_eff * self.dt / (LHV_H2 * 1000)).sum(axis=1)
+            fc_power = w[:, self.o_fc:self.o_fc + self.nf]
+            fc_h2 = fc_power * self.dt / (LHV_H2 * 1000 * self.fc_eff)
+            share = np.array([hs.capacity for hs in self.h2_storage], dtype=float) / self.h2_capacity
+            h2_system = HydrogenSystem(env=env)
+            h2_system.results = {'el_power': el_power.T,
+                                 'el_p_rel': (el_power / (self.el_p * 1000)).T * 100,
+                                 'el_efficiency': np.where(el_power > 0, self.el_eff, 0).T,
+                                 'el_h2': (el_power * self.el_eff * self.dt / (LHV_H2 * 1000)).T,
+                                 'pv_to_el': pv_to_el,
+                                 'wt_to_el': total_el - pv_to_el,
+                                 'hs_inflow': share[:, None] * h2_in,
+                                 'hs_outflow': share[:, None] * fc_h2.sum(axis=1),
+                                 'hs_level': share[:, None] * solution[:, self.o_h],
+                                 'fc_power': fc_power.T,
+                                 'fc_h2': fc_h2.T}
+            h2_system.update_components()
+            columns.update(h2_system.result_columns())
+            operator.h2_system = h2_system
+        # Grid and unmet load
+        if env.grid is not None:
+            columns[f'{env.grid.name} [W]'] = w[:, self.o_g]
+        columns['P_Res [W]'] = w[:, self.o_u]
+
+        return columns
@@ -0,0 +1,143 @@
+import os
+import numpy as np
+import pandas as pd
+# MiGUEL modules
+from dispatch.base import DispatchState, get_strategy
+
+
+class StreamingDispatch:
+    """
+    Chunked dispatch with bounded memory
+    The simulation time is dispatched in chunks of fixed size with a vectorizable strategy. Energy storage and
+    hydrogen storage levels and diesel generator runtimes are carried across chunk boundaries, the results of
+    every chunk are written straight to a columnar file (.parquet, requires pyarrow) or appended to a csv file.
+    Load and RE production are sliced per chunk, only one chunk of inputs and results is held in memory,
+    totals are accumulated while streaming.
+    """
+
+    def __init__(self,
+                 env,
+                 path: str,
+                 chunk_size: int = 24 * 7 * 4,
+                 strategy: str = 'vectorized-greedy',
+                 h2_policy: str = 'priority'):
+        """
+        :param env: environment.Environment
+            system environment
+        :param path: str
+            output file (.parquet or .csv)
+        :param chunk_size: int
+            time steps per chunk
+        :param strategy: str
+            vectorizable dispatch strategy
+        :param h2_policy: str
+            allocation policy of the hydrogen subsystem
+        """
+        self.env = env
+        self.path = path
+        self.chunk_size = chunk_size
+        self.strategy = get_strategy(strategy) if isinstance(strategy, str) else strategy
+        if not self.strategy.vectorizable:
+            raise ValueError(f'Dispatch strategy {self.strategy.name} is not vectorizable.')
+        self.h2_policy = h2_policy
+        self.columns = None
+        self.totals = None
+        self.chunks = 0
+        self._writer = None
+
+    ''' Output '''
+
+    def open(self):
+        """
+        Remove existing output file
+        :return: None
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._writer = None
+        self.columns = None
+
+    def write(self, df: pd.DataFrame):
+        """
+        Write chunk results
+        :param df: pd.DataFrame
+        :return: None
+        """
+        if self.path.endswith('.parquet'):
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError('Streaming to .parquet requires pyarrow, use a .csv output file instead.')
+            table = pa.Table.from_pandas(df, preserve_index=True)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path,
+                      mode='a',
+                      header=self.chunks == 0,
+                      sep=self.env.csv_sep,
+                      decimal=self.env.csv_decimal)
+
+    def close(self):
+        """
+        :return: None
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    ''' Dispatch '''
+
+    def run(self):
+        """
+        Run chunked dispatch
+        :return: pd.Series
+            energy totals per column [kWh]
+        """
+        env = self.env
+        dt_h = env.i_step / 60
+        n = len(env.time)
+        # Storage states are carried in local state, the environment keeps its initial states
+        es_soc = np.array([es.soc for es in env.storage], dtype=float)
+        hs_level = np.array([hs.current_level for hs in env.H2Storage], dtype=float)
+        dg_carry = {}
+        self.totals = None
+        self.chunks = 0
+        self.open()
+        try:
+            for start in range(0, n, self.chunk_size):
+                end = min(start + self.chunk_size, n)
+                # Load and RE production are sliced per chunk from the component DataFrames
+                load = env.calc_load(start=start, end=end)
+                state = DispatchState(env=env,
+                                      load=load,
+                                      re_production={re.name: re.df['P [W]'].iloc[start:end].to_numpy(dtype=float)
+                                                     for re in env.re_supply},
+                                      h2_policy=self.h2_policy,
+                                      start=start,
+                                      update_components=False)
+                state.es_soc = es_soc
+                state.hs_level = hs_level
+                state.dg_carry = dg_carry
+                columns = self.strategy.dispatch(state=state)
+                # Carry storage states to the next chunk
+                es_soc = np.array([columns[f'{es.name} soc'][-1] for es in env.storage], dtype=float)
+                h2_system = getattr(self.strategy, 'h2_system', None)
+                if h2_system is not None and h2_system.results['hs_level'].shape[1] > 0:
+                    hs_level = h2_system.results['hs_level'][:, -1].astype(float)
+                dg_carry = state.dg_carry
+                df = pd.DataFrame(columns, index=pd.DatetimeIndex(state.index, name='Time'), dtype=float)
+                df.insert(0, 'Load [W]', load)
+                if self.columns is None:
+                    self.columns = list(df.columns)
+                df = df.reindex(columns=self.columns)
+                totals = df.filter(like='[W]').sum() * dt_h / 1000
+                self.totals = totals if self.totals is None else self.totals + totals
+                self.write(df)
+                self.chunks += 1
+        finally:
+            self.close()
+
+        return self.totals
@@ -1,20 +1,22 @@
 import sys
 import os
 import datetime as dt
+import numpy as np
 import pandas as pd
-# pvlib is imported lazily inside get_weather_data() to avoid heavy binary deps
-import requests
+# pvlib, requests and geopy are imported lazily inside the methods using remote services
 from configparser import ConfigParser
-from geopy.geocoders import Nominatim
 # MiGUEL Modules
 from components.pv import PV
 from components.windturbine import WindTurbine
-from components.grid import Grid
+from components.grid import Grid, BlackoutSchedule, Tariff
 from components.storage import Storage
 from components.load import Load
+from components.flexible_load import FlexibleLoad
 from components.electrolyser import Electrolyser
 from components.H2_Storage import H2Storage
 from components.fuel_cell import FuelCell
+from components.dieselgenerator import DieselGenerator
+from profiles import DAYFIRST
 
 
 
@@ -37,7 +39,9 @@ class Environment:
                  feed_in: bool = False,
                  weather_data: str = None,
                  csv_sep: str = ',',
-                 csv_decimal: str = '.'):
+                 csv_decimal: str = '.',
+                 offline: bool = False,
+                 storage_policy: str = 'priority'):
         """
         :param location: dict
             Parameter to create location
@@ -59,9 +63,11 @@ class Environment:
              co2_price: float [US$/t]
              pv_feed_in_tariff: float [US$/kWh]
              wt_feed_in_tariff: float [US$/kWh]
+             diesel_price: float [US$/l]
              currency: str}
         :param ecology: dict
             Parameter for ecological calculations,
+            {co2_diesel: float [kg/kWh fuel energy]
              co2_grid: float}
         :param grid_connection: bool
             System grid connected
@@ -69,10 +75,16 @@ class Environment:
             feed-in possible
         :param blackout: bool
             Blackout occur
-        :param blackout_data: str
-            File path blackout data
+        :param blackout_data: str/BlackoutSchedule
+            File path blackout data (blackout intervals or time steps) or BlackoutSchedule
         :param weather_data: str
             File path weather data
+        :param offline: bool
+            No requests to remote services (elevation, geocoding, PVGIS weather data),
+            altitude is taken from location (default 0 m)
+        :param storage_policy: str
+            allocation policy of the energy storage fleet ('priority', 'pro_rata' or 'aging',
+            see dispatch.fleet.StorageFleet)
         """
         # Component Container
         self.fuel_cell = []
@@ -80,8 +92,11 @@ class Environment:
         self.electrolyser = []
         self.grid = None
         self.load = None
+        self.loads = []
+        self.flexible_loads = []
         self.pv = []
         self.wind_turbine = []
+        self.diesel_generator = []
         self.re_supply = []
         self.supply_components = []
         self.storage = []
@@ -104,9 +119,19 @@ class Environment:
         self.location = location
         self.longitude = self.location.get('longitude')
         self.latitude = self.location.get('latitude')
-        self.altitude = self.get_altitude()
+        self.offline = offline
+        if self.location.get('altitude') is not None:
+            self.altitude = self.location.get('altitude')
+        elif self.offline:
+            self.altitude = 0
+        else:
+            self.altitude = self.get_altitude()
         self.terrain = self.location.get('terrain')
-        self.address = self.find_location()
+        if self.offline:
+            hemisphere = 'south' if self.latitude < 0 else 'north'
+            self.address = None, None, None, None, None, hemisphere
+        else:
+            self.address = self.find_location()
         self.hemisphere = self.address[-1]
         self.seasons = self.find_season()
         # Economy
@@ -118,6 +143,7 @@ class Environment:
             self.wt_feed_in_tariff = 0.00  # US$/kWh
             self.electricity_price = 0.0  # US$/kWh
             self.avg_co2_price = 0  # US$//t
+            self.diesel_price = 1.2  # US$/l
         else:
             self.currency = economy.get('currency')
             self.d_rate = economy.get('d_rate')
@@ -126,10 +152,15 @@ class Environment:
             self.avg_co2_price = economy.get('co2_price')  # US$/t
             self.pv_feed_in_tariff = economy.get('pv_feed_in_tariff')  # US$//kWh
             self.wt_feed_in_tariff = economy.get('wt_feed_in_tariff')  # US$//kWh
+            self.diesel_price = economy.get('diesel_price', 1.2)  # US$/l
         if ecology is None:
             self.co2_grid = 0  # kg CO2/kWh
+            self.co2_diesel = 0.2665  # kg CO2/kWh (fuel)
         else:
             self.co2_grid = ecology.get('co2_grid')
+            self.co2_diesel = ecology.get('co2_diesel', 0.2665)  # kg CO2/kWh (fuel)
+        # Grid tariff (None: flat electricity price and feed-in tariffs)
+        self.tariff = None
         # Environment DataFrame
         columns = ['P_Res [W]', 'WT total power [W]']
         self.df = pd.DataFrame(columns=columns, index=self.time)
@@ -141,20 +172,14 @@ class Environment:
             # lightweight placeholder so the Environment can be created and
             # other components added. Detailed weather-dependent modelling
             # may still fail later, but this prevents import-time crashes.
-            try:
-                self.weather_data = self.get_weather_data()
-            except Exception as e:
-                print(f"[WARN] get_weather_data failed: {e} — using placeholder weather data")
-                # Create a minimal hourly dataframe matching the environment time range
+            if self.offline:
+                self.weather_data = self.create_placeholder_weather_data()
+            else:
                 try:
-                    idx = pd.date_range(start=self.time_series[0], periods=len(self.time_series), freq=self.t_step)
-                except Exception:
-                    # Fallback: one-hour index for safety
-                    idx = pd.date_range(start=dt.datetime.now(), periods=24, freq='1h')
-                cols = ['ghi', 'dni', 'dhi', 'IR(h)', 'wind_speed', 'temp_air']
-                df = pd.DataFrame(0, index=idx, columns=cols)
-                # Mirror pvlib return structure: (data, months_selected, inputs, metadata)
-                self.weather_data = (df, [], {}, {})
+                    self.weather_data = self.get_weather_data()
+                except Exception as e:
+                    print(f"[WARN] get_weather_data failed: {e} — using placeholder weather data")
+                    self.weather_data = self.create_placeholder_weather_data()
 
             # Try to create derived weather products; if these fail, replace with empty placeholders
             try:
@@ -178,17 +203,25 @@ class Environment:
             self.blackout = blackout
             if self.blackout:
                 self.blackout_data = blackout_data
-                blackout_df = pd.read_csv(self.blackout_data, sep=self.csv_sep)
-                self.df['Blackout'] = blackout_df['Blackout'].values
+                if isinstance(blackout_data, BlackoutSchedule):
+                    self.blackout_schedule = blackout_data
+                else:
+                    self.blackout_schedule = BlackoutSchedule.from_csv(path=self.blackout_data,
+                                                                       time=self.time,
+                                                                       sep=self.csv_sep)
+                self.set_blackout_schedule(schedule=self.blackout_schedule)
                 self.system = system[2]
             else:
                 self.blackout_data = None
+                self.blackout_schedule = BlackoutSchedule()
                 self.system = system[1]
         else:
             self.system = system[0]
             self.blackout = None
             self.blackout_data = None
+            self.blackout_schedule = None
         self.feed_in = feed_in
+        self.storage_policy = storage_policy
 
 
         # DataBase
@@ -218,6 +251,8 @@ class Environment:
         Find address based on coordinates
         :return: list
         """
+        from geopy.geocoders import Nominatim
+
         geolocator = Nominatim(user_agent='miguel_application_v1.0')
         location = geolocator.reverse(f'{self.latitude},{self.longitude}')
         if location is None:
@@ -242,6 +277,8 @@ class Environment:
         Get elevation from coordinates
         :return:
         """
+        import requests
+
         url = f'https://api.opentopodata.org/v1/aster30m?locations={self.latitude},{self.longitude}'
         result = requests.get(url)
 
@@ -323,6 +360,23 @@ class Environment:
 
         return data, months_selected, inputs, metadata
 
+    def create_placeholder_weather_data(self):
+        """
+        Weather data without irradiation and wind (no remote source available)
+        :return: tuple
+            data, months_selected, inputs, metadata (structure of get_weather_data)
+        """
+        # Create a minimal hourly dataframe matching the environment time range
+        try:
+            idx = pd.date_range(start=self.time_series[0], periods=len(self.time_series), freq=self.t_step)
+        except Exception:
+            # Fallback: one-hour index for safety
+            idx = pd.date_range(start=dt.datetime.now(), periods=24, freq='1h')
+        cols = ['ghi', 'dni', 'dhi', 'IR(h)', 'wind_speed', 'temp_air']
+        df = pd.DataFrame(0, index=idx, columns=cols)
+
+        return df, [], {}, {}
+
     def create_wt_weather_data(self):
         """
         Create weather dataframe
@@ -391,25 +445,135 @@ class Environment:
         self.df[f'{name}: Blackout'] = self.grid.df['Blackout']
         self.grid_connection = True
 
+    def set_blackout_schedule(self, schedule: BlackoutSchedule):
+        """
+        Set grid blackouts
+        :param schedule: BlackoutSchedule
+            blackout intervals
+        :return: None
+        """
+        self.blackout_schedule = schedule
+        mask = schedule.to_mask(time=self.time)
+        self.df['Blackout'] = mask
+        self.grid.df['Blackout'] = mask
+        self.df[f'{self.grid.name}: Blackout'] = mask
+
+    def set_tariff(self, tariff: Tariff = None):
+        """
+        Set grid tariff (time-of-use import prices, demand charge, export prices and cap)
+        :param tariff: Tariff
+            grid tariff, None for the flat electricity price and feed-in tariffs
+        :return: None
+        """
+        self.tariff = tariff
+
+    def grid_tariff(self):
+        """
+        :return: Tariff
+            grid tariff of the system
+        """
+        if getattr(self, 'tariff', None) is not None:
+            return self.tariff
+
+        return Tariff.flat(self)
+
     def add_load(self,
                  annual_consumption: float = None,
                  ref_profile: str = None,
-                 load_profile: str = None):
+                 load_profile: str = None,
+                 time_format: str = None,
+                 dayfirst: bool = DAYFIRST):
         """
         Add Load to environment
+        Several loads are added up to the residual load df['P_Res [W]'].
         :param: annual_consumption: float
             annual energy demand [kWh]
         :param: load_profile: str
             load profile path
+        :param time_format: str
+            strftime format of the load profile time stamps
+        :param dayfirst: bool
+            day first if the time stamp format is inferred
         :return: None
         """
-        name = 'Load_1'
-        self.load = Load(env=self,
-                         name=name,
-                         annual_consumption=annual_consumption,
-                         ref_profile=ref_profile,
-                         load_profile=load_profile)
-        self.df['P_Res [W]'] = self.load.df['P [W]']
+        name = f'Load_{len(self.loads) + 1}'
+        self.loads.append(Load(env=self,
+                               name=name,
+                               annual_consumption=annual_consumption,
+                               ref_profile=ref_profile,
+                               load_profile=load_profile,
+                               time_format=time_format,
+                               dayfirst=dayfirst))
+        if self.load is None:
+            self.load = self.loads[0]
+        self.df[f'{name}: P [W]'] = self.loads[-1].df['P [W]'].to_numpy(dtype=float)
+        self.update_load()
+
+    def add_flexible_load(self,
+                          p_n: float = None,
+                          energy: float = None,
+                          windows: list = None):
+        """
+        Add shiftable load to environment (scheduled into RE surplus during dispatch)
+        :param p_n: float
+            maximum power [W]
+        :param energy: float
+            energy demand per time window [Wh]
+        :param windows: list
+            daily time windows [(start, end)] as 'HH:MM'
+        :return: None
+        """
+        name = f'Flexible_Load_{len(self.flexible_loads) + 1}'
+        self.flexible_loads.append(FlexibleLoad(env=self,
+                                                name=name,
+                                                p_n=p_n,
+                                                energy=energy,
+                                                windows=windows))
+
+    def update_load(self):
+        """
+        Residual load from all loads
+        :return: None
+        """
+        if len(self.loads) == 0:
+            return
+        self.df['P_Res [W]'] = np.sum([load.df['P [W]'].to_numpy(dtype=float) for load in self.loads], axis=0)
+
+    def remove_loads(self):
+        """
+        Delete all fixed loads
+        :return: None
+        """
+        columns = [f'{load.name}: P [W]' for load in self.loads] + ['P_Res [W]']
+        self.df = self.df.drop(columns=[col for col in columns if col in self.df.columns])
+        self.load = None
+        self.loads = []
+
+    def schedule_flexible_loads(self, load: np.ndarray, start: int = None):
+        """
+        Schedule flexible loads into the RE surplus of the fixed load (in list order)
+        :param load: np.ndarray
+            fixed load [W]
+        :param start: int
+            position of the first time step of a part of the simulation time (chunked dispatch),
+            None for the whole simulation time
+        :return: dict
+            flexible load name: load [W]
+        """
+        flexible_loads = getattr(self, 'flexible_loads', [])
+        if len(flexible_loads) == 0:
+            return {}
+        part = slice(None) if start is None else slice(start, start + len(load))
+        production = np.sum([re.df['P [W]'].to_numpy(dtype=float)[part] for re in self.re_supply], axis=0) \
+            if len(self.re_supply) > 0 else np.zeros(len(load))
+        index = None if start is None else pd.DatetimeIndex(self.time[part])
+        surplus = np.nan_to_num(production) - load
+        schedule = {}
+        for flexible_load in flexible_loads:
+            schedule[flexible_load.name] = flexible_load.schedule(surplus=surplus, index=index)
+            surplus = surplus - schedule[flexible_load.name]
+
+        return schedule
 
     def add_pv(self,
                p_n: float = None,
@@ -488,6 +652,35 @@ class Environment:
         self.df['WT total power [W]'] += self.df[f'{name}: P [W]']
         # self.add_component_data(component=self.wind_turbine[-1], supply=True)
 
+    def add_diesel_generator(self,
+                             p_n: float = None,
+                             fuel_consumption: float = None,
+                             p_min: float = 0.3,
+                             min_runtime: float = 1,
+                             lifetime: int = 15,
+                             c_invest: float = None,
+                             c_op_main: float = None,
+                             c_var_n: float = 0.021):
+        """
+        Add Diesel Generator to environment
+        :return: None
+        """
+        name = f'DG_{len(self.diesel_generator) + 1}'
+        self.diesel_generator.append(DieselGenerator(env=self,
+                                                     name=name,
+                                                     p_n=p_n,
+                                                     fuel_consumption=fuel_consumption,
+                                                     p_min=p_min,
+                                                     min_runtime=min_runtime,
+                                                     lifetime=lifetime,
+                                                     c_invest=c_invest,
+                                                     c_op_main=c_op_main,
+                                                     c_var_n=c_var_n))
+        self.supply_components.append(self.diesel_generator[-1])
+        self.df[f'{name}: P [W]'] = self.diesel_generator[-1].df['P [W]']
+        self.add_component_data(component=self.diesel_generator[-1],
+                                supply=True)
+
 
 
     def add_storage(self,
@@ -499,9 +692,21 @@ class Environment:
                     lifetime: int = 10,
                     c_invest: float = None,
                     c_op_main: float = None,
-                    c_var_n: float = 0.021):
+                    c_var_n: float = 0.021,
+                    cycle_life: float = 5000,
+                    dod_ref: float = 0.8,
+                    k: float = 1.3,
+                    eol: float = 0.8):
         """
         Add Energy Storage to environment
+        :param cycle_life: float
+            cycles to end of life at depth of discharge dod_ref
+        :param dod_ref: float
+            reference depth of discharge of cycle_life
+        :param k: float
+            Woehler exponent of the cycle life
+        :param eol: float
+            remaining capacity at end of life
         :return: None
         """
         name = f'ES_{len(self.storage) + 1}'
@@ -515,7 +720,11 @@ class Environment:
                                     lifetime=lifetime,
                                     c_invest=c_invest,
                                     c_op_main=c_op_main,
-                                    c_var_n=c_var_n))
+                                    c_var_n=c_var_n,
+                                    cycle_life=cycle_life,
+                                    dod_ref=dod_ref,
+                                    k=k,
+                                    eol=eol))
         self.df[f'{name}: P [W]'] = self.storage[-1].df['P [W]']
         self.add_component_data(component=self.storage[-1],
                                 supply=False)
@@ -537,14 +746,47 @@ class Environment:
           self.storage_data = self.storage_data._append(component.technical_data,
                                                           ignore_index=True)
             
-    def calc_energy_consumption_parameters(self):
+    def calc_load(self, start: int = None, end: int = None):
+        """
+        Load of all fixed and flexible loads
+        :param start: int
+            first time step of a part of the simulation time (chunked dispatch)
+        :param end: int
+            end of the part (exclusive)
+        :return: np.ndarray
+            load [W]
+        """
+        if start is None and end is None:
+            load = np.nan_to_num(self.df['P_Res [W]'].to_numpy(dtype=float))
+            for flexible_load in self.schedule_flexible_loads(load=load).values():
+                load = load + flexible_load
+            return load
+        n = len(self.df.index)
+        start = 0 if start is None else start
+        end = n if end is None else min(end, n)
+        # Flexible loads are scheduled on whole daily windows: one day margin around the part
+        steps_per_day = int(round(24 * 60 / self.i_step))
+        time = pd.DatetimeIndex(self.time)
+        first = max(int(np.searchsorted(time, time[start].normalize())) - steps_per_day, 0)
+        last = min(end + 2 * steps_per_day, n)
+        load = np.nan_to_num(self.df['P_Res [W]'].iloc[first:last].to_numpy(dtype=float))
+        if len(getattr(self, 'flexible_loads', [])) > 0:
+            for flexible_load in self.schedule_flexible_loads(load=load, start=first).values():
+                load = load + flexible_load
+
+        return load[start - first:end - first]
+
+    def calc_energy_consumption_parameters(self, load: np.ndarray = None):
         """
         Calculate total energy consumption and peak load
+        :param load: np.ndarray
+            load [W] (e.g. including flexible loads), defaults to the residual load
         :return: list
             energy_consumption [kWh], peak_load [W]
         """
-        energy_consumption = self.df['P_Res [W]'].sum() * self.i_step / 60 / 1000
-        peak_load = self.df['P_Res [W]'].max()
+        load = self.df['P_Res [W]'].to_numpy(dtype=float) if load is None else np.asarray(load, dtype=float)
+        energy_consumption = np.nansum(load) * self.i_step / 60 / 1000
+        peak_load = np.nanmax(load)
 
         return energy_consumption, peak_load
 
@@ -566,13 +808,16 @@ class Environment:
                                   'blackout': str(self.blackout),
                                   'blackout_data': str(self.blackout_data),
                                   'feed_in': str(self.feed_in),
+                                  'storage_policy': str(self.storage_policy),
                                   'currency': str(self.currency),
                                   'lifetime': str(self.lifetime),
                                   'd_rate': str(self.d_rate),
                                   'electricity_price': str(self.electricity_price),
                                   'wt_feed_in_tariff': str(self.wt_feed_in_tariff),
                                   'pv_feed_in_tariff': str(self.pv_feed_in_tariff),
-                                  'co2_grid': str(self.co2_grid)}
+                                  'diesel_price': str(self.diesel_price),
+                                  'co2_grid': str(self.co2_grid),
+                                  'co2_diesel': str(self.co2_diesel)}
 
         path = f'{sys.path[1]}/export/config/'
         if not os.path.exists(path):
@@ -2,7 +2,6 @@ import math
 import sys
 import numpy as np
 import pandas as pd
-from lcoe.lcoe import lcoe as py_lcoe
 from environment import Environment
 from operation import Operator
 from components.grid import Grid
@@ -12,6 +11,7 @@ from components.storage import Storage
 from components.H2_Storage import H2Storage
 from components.electrolyser import Electrolyser
 from components.fuel_cell import FuelCell
+from components.dieselgenerator import DieselGenerator, LHV_DIESEL
 
 class Evaluation:
     """
@@ -20,7 +20,19 @@ class Evaluation:
 
     def __init__(self,
                  env: Environment = None,
-                 operator: Operator = None):
+                 operator: Operator = None,
+                 export: bool = True,
+                 path: str = None):
+        """
+        :param env: environment.Environment
+            system environment
+        :param operator: operation.Operator
+            dispatched system
+        :param export: bool
+            write evaluation_df to csv
+        :param path: str
+            csv file, defaults to export/system_evaluation.csv
+        """
         self.env = env
         self.op = operator
         # Evaluation df
@@ -42,6 +54,8 @@ class Evaluation:
         self.H2_energy_supply = {}
         self.grid_energy_supply = {}
         self.storage_energy_supply = {}
+        self.dg_energy_supply = {}
+        self.dg_fuel_consumption = {}
 
         for component in self.env.re_supply:
             self.calc_component_energy_supply(component=component)
@@ -64,13 +78,25 @@ class Evaluation:
         for hstr in self.env.H2Storage:
             self.calc_co2_emissions(component=hstr)
             self.calc_cost(component=hstr)
+        for dg in getattr(self.env, 'diesel_generator', []):
+            self.calc_dg_energy_supply(component=dg)
+            self.calc_co2_emissions(component=dg)
+            self.calc_cost(component=dg)
+        if self.env.grid is not None:
+            # Grid import priced with the grid tariff
+            self.calc_grid_energy_supply(component=self.env.grid)
+            self.calc_co2_emissions(component=self.env.grid)
+            self.calc_cost(component=self.env.grid)
 
         self.calc_lifetime_energy_supply()
         self.calc_system_values()
         self.calc_lcoe()
-        self.evaluation_df.to_csv(sys.path[1] + '/export/system_evaluation.csv',
-                                  sep=self.env.csv_sep,
-                                  decimal=self.env.csv_decimal)
+        if export:
+            if path is None:
+                path = sys.path[1] + '/export/system_evaluation.csv'
+            self.evaluation_df.to_csv(path,
+                                      sep=self.env.csv_sep,
+                                      decimal=self.env.csv_decimal)
 
     def run(self, export: bool = True):
         """
@@ -138,7 +164,8 @@ class Evaluation:
         :return: float
             energy_consumption [kWh]
         """
-        energy_consumption = self.env.df['P_Res [W]'].sum() * self.env.i_step / 60 / 1000
+        # Load including scheduled flexible loads
+        energy_consumption = self.op.df['Load [W]'].sum() * self.env.i_step / 60 / 1000
 
         self.evaluation_df.loc['System', 'Annual energy supply [kWh/a]'] = int(energy_consumption)
 
@@ -149,7 +176,10 @@ class Evaluation:
         Calculate grid cost to meet annual consumption
         :return: float
         """
-        cost = self.energy_consumption_annual * self.env.electricity_price  # US$
+        bill = self.env.grid_tariff().bill(grid_import=self.op.df['Load [W]'].to_numpy(dtype=float),
+                                           time=self.op.df.index,
+                                           i_step=self.env.i_step)
+        cost = bill['Energy cost'] + bill['Demand cost']  # US$
 
         return cost
 
@@ -177,7 +207,7 @@ class Evaluation:
         :return: float
             peak load [kW]
         """
-        peak_load = self.env.df['P_Res [W]'].max() / 1000
+        peak_load = self.op.df['Load [W]'].max() / 1000
 
         return peak_load
 
@@ -280,6 +310,31 @@ class Evaluation:
                 print(f"⚠️ Column {col} missing in Operator DataFrame.")
 
 
+    def calc_grid_energy_supply(self, component: Grid):
+        """
+        Calculate annual energy supply (import) of the grid
+        :param component: Grid
+        :return: None
+        """
+        col = f'{component.name} [W]'
+        energy = 0.0
+        if col in self.op.df.columns:
+            energy = np.nansum(np.clip(self.op.df[col].to_numpy(dtype=float), 0, None)) * self.env.i_step / 60 / 1000
+        self.grid_energy_supply[component.name] = energy
+        self.evaluation_df.loc[component.name, 'Annual energy supply [kWh/a]'] = int(energy)
+
+    def calc_dg_energy_supply(self, component: DieselGenerator):
+        """
+        Calculate annual energy supply and fuel consumption of diesel generator
+        :param component: DieselGenerator
+        :return: None
+        """
+        energy = self.op.df[f'{component.name} [W]'].sum() * self.env.i_step / 60 / 1000  # kWh
+        fuel = self.op.df[f'{component.name} Fuel [l]'].sum()  # l
+        self.dg_energy_supply[component.name] = energy
+        self.dg_fuel_consumption[component.name] = fuel
+        self.evaluation_df.loc[component.name, 'Annual energy supply [kWh/a]'] = int(energy)
+
     #================================================= CO2_Calculation ===================================================#
     #==================================================================================================================#
 
@@ -306,7 +361,7 @@ class Evaluation:
         :param component: object
         :return: None
         """
-        if isinstance(component, (Storage,FuelCell)):
+        if isinstance(component, (Storage, FuelCell, DieselGenerator)):
             co2_init = (component.co2_init+ component.replacement_co2)/1000
         elif isinstance(component, Grid):
             co2_init = 0
@@ -329,6 +384,9 @@ class Evaluation:
         if isinstance(component, Grid):
             co2_annual = self.evaluation_df.loc[
                              component.name, 'Annual energy supply [kWh/a]'] * self.env.co2_grid / 1000
+        elif isinstance(component, DieselGenerator):
+            # Fuel energy [kWh] x specific emissions [kg/kWh]
+            co2_annual = self.dg_fuel_consumption[component.name] * LHV_DIESEL * self.env.co2_diesel / 1000
         else:
             co2_annual = 0
         self.evaluation_df.loc[component.name, 'Annual CO2 emissions [t/a]'] = round(co2_annual, 3)
@@ -364,7 +422,7 @@ class Evaluation:
         """
         if isinstance(component, Grid):
             investment_cost = 0
-        elif isinstance(component, (Storage,FuelCell)):
+        elif isinstance(component, (Storage, FuelCell, DieselGenerator)):
             investment_cost = component.c_invest + component.replacement_cost
 
         else:
@@ -397,7 +455,8 @@ class Evaluation:
         co2_cost = co2 * self.env.avg_co2_price
 
         # Sicherstellen, dass Kostenparameter vorhanden sind
-        required_attrs = ['c_op_main', 'c_var_n']
+        # Grid: no operation and maintenance cost
+        required_attrs = ['c_var_n'] if isinstance(component, Grid) else ['c_op_main', 'c_var_n']
         for attr in required_attrs:
             if not hasattr(component, attr):
                 return np.nan
@@ -409,9 +468,18 @@ class Evaluation:
             annual_cost = component.c_op_main + co2_cost + additional_variable_cost
 
         elif isinstance(component, Grid):
-            electricity_cost = annual_output * self.env.electricity_price
+            # Time-of-use energy cost and demand charge of the grid import
+            bill = self.env.grid_tariff().bill(grid_import=self.op.df[f'{component.name} [W]'].to_numpy(dtype=float),
+                                               time=self.op.df.index,
+                                               i_step=self.env.i_step)
+            electricity_cost = bill['Energy cost'] + bill['Demand cost']
             annual_cost = electricity_cost + co2_cost + additional_variable_cost
 
+        elif isinstance(component, DieselGenerator):
+            fuel_price = self.env.diesel_price if component.fuel_price is None else component.fuel_price
+            fuel_cost = self.dg_fuel_consumption[component.name] * fuel_price
+            annual_cost = component.c_op_main + co2_cost + fuel_cost + additional_variable_cost
+
         else:  # PV, Wind
             annual_revenues = 0
             if self.env.grid_connection and self.env.feed_in:
@@ -477,6 +545,8 @@ class Evaluation:
         :return: float
             LCOE
         """
+        from lcoe.lcoe import lcoe as py_lcoe
+
         df = self.evaluation_df
         rows = [x for x in df.index if "charge" not in x]
         for row in rows:
@@ -7,16 +7,23 @@ Module including GUI functions
 __version__ = '0.1'
 __author__ = 'pdb-94'
 
-import sys
+import hashlib
 import datetime as dt
+from collections import OrderedDict
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from gui.gui_table import Table
 from components.storage import Storage
 
+# Reused chart figures (name: Figure) and rendered charts ((name, data hash): QImage)
+_figures = {}
+_charts = OrderedDict()
+CHART_CACHE_SIZE = 16
+
 
 def convert_datetime(start: str, end: str, step: str):
     """
@@ -277,59 +284,151 @@ def collect_component_data(component):
     return component_data
 
 
-def update_listview(tab: QWidget, df: pd.DataFrame):
+def update_listview(tab: QWidget, df: pd.DataFrame, columns: list = None):
     """
-
+    Show DataFrame in the listview of the tab (rows are loaded while scrolling)
+    :param tab: QWidget
+    :param df: pd.DataFrame
+    :param columns: list
+        displayed columns, defaults to all columns
     :return: None
     """
-    tab.table = Table(data=df)
+    tab.table = Table(data=df, columns=columns)
     tab.overview.setModel(tab.table)
 
 
+def create_image_pixmap(image: QImage, widget, w, h):
+    """
+    Show rendered chart in widget
+    :param image: QImage
+    :param widget: QLabel
+    :param w: int
+    :param h: int
+    :return: None
+    """
+    pixmap = QPixmap.fromImage(image)
+    widget.setPixmap(pixmap.scaled(w,
+                                   h,
+                                   Qt.KeepAspectRatio,
+                                   Qt.SmoothTransformation))
+
+
+def chart_figure(name: str):
+    """
+    Figure of a chart, reused for every rendering (not registered in pyplot, no figures pile up)
+    :param name: str
+        chart name
+    :return: matplotlib.figure.Figure
+    """
+    if name not in _figures:
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        _figures[name] = fig
+    fig = _figures[name]
+    fig.clear()
+
+    return fig
+
+
+def render_figure(fig: Figure):
+    """
+    Render figure in memory (Agg buffer -> QImage)
+    :param fig: matplotlib.figure.Figure
+    :return: QImage
+    """
+    canvas = fig.canvas
+    canvas.draw()
+    width, height = canvas.get_width_height()
+    image = QImage(bytes(canvas.buffer_rgba()), width, height, QImage.Format_RGBA8888)
+
+    return image.copy()
+
+
+def chart_key(name: str, *data):
+    """
+    Cache key of a chart
+    :param name: str
+        chart name
+    :param data: pd.Series/pd.DataFrame
+        plotted data (e.g. monthly weather data of the location)
+    :return: tuple
+    """
+    sha = hashlib.sha1()
+    for values in data:
+        sha.update(pd.util.hash_pandas_object(values, index=True).to_numpy().tobytes())
+        sha.update(repr(getattr(values, 'columns', getattr(values, 'name', None))).encode())
+
+    return name, sha.hexdigest()
+
+
+def cached_chart(key: tuple, plot):
+    """
+    Rendered chart from cache or render and cache it
+    :param key: tuple
+        chart_key
+    :param plot: callable
+        draws the chart into the given figure
+    :return: QImage
+    """
+    if key in _charts:
+        _charts.move_to_end(key)
+        return _charts[key]
+    fig = chart_figure(name=key[0])
+    plot(fig)
+    image = render_figure(fig)
+    _charts[key] = image
+    while len(_charts) > CHART_CACHE_SIZE:
+        _charts.popitem(last=False)
+
+    return image
+
+
 def create_wind_plot(name: str, data_1: pd.Series, data_2: pd.Series):
     """
     Create monthly wind data plot
     :param name: str
-        Image name
+        chart name
     :param data_1: pd.Series
         Wind speed data array
     :param data_2: pd.Series
         Wind direction data array
-    :return:
+    :return: QImage
     """
-    fig = plt.figure()
-    ax = fig.add_subplot(111)
-    ax.set_xlabel('Month')
-    fig.legend(['wind speed', 'wind direction'])
-    ax2 = ax.twinx()
-    data_1.plot(kind='bar', color='lightgreen', ax=ax, width=0.2, position=1, label='Wind speed')
-    data_2.plot(kind='bar', color='steelblue', ax=ax2, width=0.2, position=0, label='Wind direction')
-    ax.set_ylabel(ylabel='wind speed [m/s]')
-    ax2.set_ylabel(ylabel='wind direction [°]')
-    ax.legend(loc='upper left')
-    ax2.legend(loc='upper right')
-    fig.tight_layout()
-    plt.savefig(f'{sys.path[1]}/gui/images/{name}.png')
+    def plot(fig):
+        ax = fig.add_subplot(111)
+        ax.set_xlabel('Month')
+        fig.legend(['wind speed', 'wind direction'])
+        ax2 = ax.twinx()
+        data_1.plot(kind='bar', color='lightgreen', ax=ax, width=0.2, position=1, label='Wind speed')
+        data_2.plot(kind='bar', color='steelblue', ax=ax2, width=0.2, position=0, label='Wind direction')
+        ax.set_ylabel(ylabel='wind speed [m/s]')
+        ax2.set_ylabel(ylabel='wind direction [°]')
+        ax.legend(loc='upper left')
+        ax2.legend(loc='upper right')
+        fig.tight_layout()
+
+    return cached_chart(key=chart_key(name, data_1, data_2), plot=plot)
 
 
 def create_solar_plot(name: str, data: pd.DataFrame):
     """
     Create monthly solar data plot
     :param name: str
-        image name
+        chart name
     :param data: pd:DataFrame
         Data source
-    :return: None
-    """
-    fig = plt.figure()
-    ax = fig.add_subplot(111)
-    ax.set_xlabel('Month')
-    data['ghi'].plot(kind='bar', color='yellow', ax=ax, width=0.2, position=1,
-                     label='Global horizontal irradiation')
-    data['dhi'].plot(kind='bar', color='gold', ax=ax, width=0.2, position=0, label='Direct horizontal irradiation')
-    data['dni'].plot(kind='bar', color='darkorange', ax=ax, width=0.2, position=2,
-                     label='Direct normal irradiation')
-    ax.set_ylabel(ylabel='Solar irradiation [W/m²]')
-    plt.legend(loc='upper left')
-    fig.tight_layout()
-    plt.savefig(f'{sys.path[1]}/gui/images/{name}.png')
+    :return: QImage
+    """
+    def plot(fig):
+        ax = fig.add_subplot(111)
+        ax.set_xlabel('Month')
+        data['ghi'].plot(kind='bar', color='yellow', ax=ax, width=0.2, position=1,
+                         label='Global horizontal irradiation')
+        data['dhi'].plot(kind='bar', color='gold', ax=ax, width=0.2, position=0, label='Direct horizontal irradiation')
+        data['dni'].plot(kind='bar', color='darkorange', ax=ax, width=0.2, position=2,
+                         label='Direct normal irradiation')
+        ax.set_ylabel(ylabel='Solar irradiation [W/m²]')
+        ax.legend(loc='upper left')
+        fig.tight_layout()
+
+    return cached_chart(key=chart_key(name, data), plot=plot)
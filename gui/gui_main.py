@@ -1,13 +1,12 @@
 import sys
 import pandas as pd
-import threading
 from global_land_mask import globe
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from environment import Environment
-from operation import Operator
-from Evaluation.evaluation import Evaluation
+from jobs import JobManager
+from project import Project
 from report.report import Report
 from components.pv import PV
 from components.windturbine import WindTurbine
@@ -39,6 +38,11 @@ class TabWidget(QWidget):
         self.operator = None
         self.evaluation = None
         self.report = None
+        # Simulation service (worker process), polled from the Qt event loop
+        self.jobs = JobManager(cache_path=f'{self.root}/export/cache')
+        self.job_timer = QTimer(self)
+        self.job_timer.timeout.connect(self.poll_jobs)
+        self.progress_dialog = None
         # Style sheet
         self.setStyleSheet("""QWidget {font: Calibri}""")
 
@@ -87,6 +91,7 @@ class TabWidget(QWidget):
         self.return_btn.clicked.connect(self.previous_tab)
         self.save_btn.clicked.connect(self.save)
         self.delete_btn.clicked.connect(self.delete)
+        self.tabs.widget(0).import_btn.clicked.connect(self.open_project)
 
         # Set up Layout
         self.layout = QGridLayout()
@@ -204,9 +209,8 @@ class TabWidget(QWidget):
         tab = tabs(index)
         if index == 3:
             if self.env.load is not None:
-                # Delete load, remove column from df, clear plot
-                self.env.load = None
-                self.env.df = self.env.df.drop(columns=['P_Res [W]'])
+                # Delete loads, remove columns from df, clear plot
+                self.env.remove_loads()
                 tab.clear_plot()
         if index == 4:
             component = self.env.pv
@@ -347,19 +351,8 @@ class TabWidget(QWidget):
                                          tab=self.tabs.widget(8))
         elif index == 8:
             # Tab dispatch
-            # TODO: Threading with message
             if self.env.load is not None:
-                pop_up = self.pop_up_dialog(title='Information: Dispatch in progress',
-                                            message='This window will close automatically once dispatch is finished.',
-                                            box_type='information',
-                                            dialog=False)
-                operator_thread = threading.Thread(target=self.create_operator)
-                operator_thread.start()
-                operator_thread.join()
-                pop_up.close()
-                gui_func.enable_widget(widget=[self.tabs.widget(9)], enable=True)
-                self.evaluate_system(tab=self.tabs.widget(9))
-                self.tabs.setCurrentIndex(9)
+                self.create_operator()
             else:
                 print('Add load to energy system.')
                 pop_up = self.pop_up_dialog(title='Warning: Dispatch not possible',
@@ -367,6 +360,7 @@ class TabWidget(QWidget):
                                             box_type='warning')
         elif index == 9:
             # Tab evaluation
+            self.save_project()
             self.create_report()
             # pop_up = self.pop_up_dialog(title='Information: Creating report',
             #                             message='This window will close automatically once report is finished.',
@@ -511,6 +505,8 @@ class TabWidget(QWidget):
         # Add load profile to Environment
         try:
             if isinstance(self.env, Environment):
+                # The load tab holds one load profile
+                self.env.remove_loads()
                 self.env.add_load(annual_consumption=annual_consumption,
                                   ref_profile=ref_profile,
                                   load_profile=load_profile_path)
@@ -671,19 +667,78 @@ class TabWidget(QWidget):
 
     def create_operator(self):
         """
-        Create Operator and run Dispatch
+        Submit dispatch and evaluation to the simulation service (non-blocking)
         :return: None
         """
-        self.operator = Operator(env=self.env)
+        self.progress_dialog = QProgressDialog('Dispatch in progress', 'Cancel', 0, 100, self)
+        self.progress_dialog.setWindowTitle('Information: Dispatch in progress')
+        self.progress_dialog.setMinimumDuration(0)
+        self.progress_dialog.setValue(0)
+        job = self.jobs.submit(env=self.env,
+                               on_progress=self.job_progress,
+                               on_finished=self.job_finished,
+                               on_failed=self.job_failed)
+        self.progress_dialog.canceled.connect(lambda: self.jobs.cancel(job.id))
+        self.job_timer.start(100)
+
+    def poll_jobs(self):
+        """
+        Collect simulation progress and results
+        :return: None
+        """
+        if not self.jobs.poll():
+            self.job_timer.stop()
+
+    def job_progress(self, job):
+        """
+        :param job: jobs.SimulationJob
+        :return: None
+        """
+        if self.progress_dialog is None:
+            return
+        if job.stage == 'evaluation':
+            self.progress_dialog.setLabelText('System evaluation in progress')
+        self.progress_dialog.setValue(int(job.progress * 100))
+
+    def job_finished(self, job):
+        """
+        Show evaluation of finished simulation job
+        :param job: jobs.SimulationJob
+        :return: None
+        """
+        self.close_progress_dialog()
+        self.operator = job.operator
+        self.evaluation = job.evaluation
+        gui_func.enable_widget(widget=[self.tabs.widget(9)], enable=True)
+        self.evaluate_system(tab=self.tabs.widget(9))
+        self.tabs.setCurrentIndex(9)
+
+    def job_failed(self, job):
+        """
+        :param job: jobs.SimulationJob
+        :return: None
+        """
+        self.close_progress_dialog()
+        print(job.error)
+        self.pop_up_dialog(title='Warning: Dispatch failed',
+                           message=job.error.strip().splitlines()[-1],
+                           box_type='warning')
+
+    def close_progress_dialog(self):
+        """
+        :return: None
+        """
+        if self.progress_dialog is not None:
+            self.progress_dialog.canceled.disconnect()
+            self.progress_dialog.close()
+            self.progress_dialog = None
 
     def evaluate_system(self, tab: Qt.Widget):
         """
-        Evaluate system and update listview in tab System evaluation
+        Update listview in tab System evaluation
         :param tab: QWidget
         :return: None
         """
-        self.evaluation = Evaluation(env=self.env,
-                                     operator=self.operator)
         tab.evaluation_df = self.evaluation.evaluation_df
         components = self.evaluation.evaluation_df.index.tolist()
         tab.evaluation_df.insert(0, column='Component', value=components)
@@ -696,11 +751,49 @@ class TabWidget(QWidget):
         :return: None
         """
         print('Creating report. This may take couple minutes.')
-        self.report = Report(env=self.env,
+        # Dispatched environment of the worker process
+        self.report = Report(env=self.operator.env,
                              operator=self.operator,
                              evaluation=self.evaluation)
         print('Report finished.')
 
+    def save_project(self):
+        """
+        Export system and dispatch results as project file
+        :return: None
+        """
+        path = Project(env=self.env,
+                       operator=self.operator,
+                       evaluation=self.evaluation).save(path=f'{self.root}/export/{self.env.name}')
+        print(f'Project saved: {path}')
+
+    def open_project(self):
+        """
+        Restore system and dispatch results from project file (no weather data request and simulation)
+        :return: None
+        """
+        path = self.tabs.widget(0).upload.text()
+        if not path.endswith(Project.suffix):
+            return
+        try:
+            project = Project.load(path=path)
+        except Exception as error:
+            self.pop_up_dialog(title='Warning: Invalid project file',
+                               message=str(error),
+                               box_type='warning')
+            return
+        self.env = project.env
+        self.operator = project.operator
+        self.evaluation = project.evaluation
+        gui_func.enable_widget(widget=[self.tabs.widget(i) for i in range(2, 9)], enable=True)
+        self.plot_monthly_weather_data()
+        if self.evaluation is not None:
+            gui_func.enable_widget(widget=[self.tabs.widget(9)], enable=True)
+            self.evaluate_system(tab=self.tabs.widget(9))
+            self.tabs.setCurrentIndex(9)
+        else:
+            self.tabs.setCurrentIndex(8)
+
     def pvlib_database(self):
         """
         Retrieve pvlib database
@@ -754,20 +847,29 @@ class TabWidget(QWidget):
         :return: None
         """
         wind_data = self.env.monthly_weather_data[['wind_speed', 'wind_direction']]
-        gui_func.create_wind_plot(name='wind_data',
-                                  data_1=wind_data['wind_speed'],
-                                  data_2=wind_data['wind_direction'])
-        gui_func.create_pixmap(path=f'{self.root}/gui/images/wind_data.png',
-                               widget=self.tabs.widget(2).wind_plot,
-                               w=int(self.screen_width / 3),
-                               h=int(self.screen_height / 3))
+        image = gui_func.create_wind_plot(name='wind_data',
+                                          data_1=wind_data['wind_speed'],
+                                          data_2=wind_data['wind_direction'])
+        gui_func.create_image_pixmap(image=image,
+                                     widget=self.tabs.widget(2).wind_plot,
+                                     w=int(self.screen_width / 3),
+                                     h=int(self.screen_height / 3))
         solar_data = self.env.monthly_weather_data[['ghi', 'dhi', 'dni']]
-        gui_func.create_solar_plot(name='solar_data',
-                                   data=solar_data)
-        gui_func.create_pixmap(path=f'{self.root}/gui/images/solar_data.png',
-                               widget=self.tabs.widget(2).solar_plot,
-                               w=int(self.screen_width / 3),
-                               h=int(self.screen_height / 3))
+        image = gui_func.create_solar_plot(name='solar_data',
+                                           data=solar_data)
+        gui_func.create_image_pixmap(image=image,
+                                     widget=self.tabs.widget(2).solar_plot,
+                                     w=int(self.screen_width / 3),
+                                     h=int(self.screen_height / 3))
+
+    def closeEvent(self, event):
+        """
+        Stop simulation service
+        :param event: QCloseEvent
+        :return: None
+        """
+        self.jobs.shutdown()
+        super().closeEvent(event)
 
     def pop_up_dialog(self,
                       title: str = None,
@@ -14,11 +14,15 @@ import matplotlib.pyplot as plt
 
 matplotlib.use('Qt5Agg')
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg, NavigationToolbar2QT as NavigationToolbar
+# MiGUEL modules
+from plotting import plot_decimated
 
 
 class Plot(FigureCanvasQTAgg):
     """
     Class containing plot
+    Time series are drawn as min/max envelope of the visible range (plotting.DecimatedLine), zoom and pan
+    with the NavigationToolbar refine the envelope.
     """
     def __init__(self,
                  df: pd.Series = None,
@@ -33,6 +37,7 @@ class Plot(FigureCanvasQTAgg):
         self.setParent(parent)
         self.df = df
         self.time_series = time_series
+        self.lines = []
         if self.time_series is not None:
-            self.ax.plot(self.df)
+            self.lines = plot_decimated(ax=self.ax, data=self.df)
             self.ax.set(ylabel='Power [W]')
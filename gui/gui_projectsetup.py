@@ -95,8 +95,8 @@ class ProjectSetup(QWidget):
         :return:
         """
         response = QFileDialog.getOpenFileName(parent=self,
-                                               caption='Select wind turbine profile',
-                                               filter='Config file (*.ini)',
+                                               caption='Select configuration',
+                                               filter='MiGUEL project (*.miguel);;Config file (*.ini)',
                                                directory=sys.path[1])
         config = response[0]
         self.upload.setText(config)
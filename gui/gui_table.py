@@ -1,24 +1,96 @@
-from PyQt5.QtCore import QAbstractTableModel, Qt
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
 
 
 class Table(QAbstractTableModel):
-    def __init__(self, data):
+    """
+    Table model of a DataFrame
+    Cells are read from the column arrays of the DataFrame (no copy) and formatted on paint with a formatter
+    per column. Rows are loaded in pages (fetchMore) while the view scrolls, columns can be projected.
+    """
+
+    def __init__(self,
+                 data: pd.DataFrame,
+                 columns: list = None,
+                 page_size: int = 500,
+                 decimals: int = 2):
+        """
+        :param data: pd.DataFrame
+        :param columns: list
+            displayed columns, defaults to all columns
+        :param page_size: int
+            rows loaded per fetchMore
+        :param decimals: int
+            decimal places of float values
+        """
         QAbstractTableModel.__init__(self)
         self._data = data
+        self.columns = list(data.columns) if columns is None else [col for col in columns if col in data.columns]
+        self.page_size = page_size
+        self.decimals = decimals
+        self.arrays = [data[col].to_numpy() for col in self.columns]
+        self.formatters = [self.formatter(array) for array in self.arrays]
+        self.row_index = data.index
+        self.rows = data.shape[0]
+        self.loaded = min(self.rows, page_size)
+
+    def formatter(self, array: np.ndarray):
+        """
+        :param array: np.ndarray
+            column values
+        :return: callable
+            value -> str
+        """
+        decimals = self.decimals
+        if np.issubdtype(array.dtype, np.floating):
+            return lambda value: '' if np.isnan(value) else f'{value:.{decimals}f}'
+        if np.issubdtype(array.dtype, np.integer) or np.issubdtype(array.dtype, np.bool_):
+            return str
+        if np.issubdtype(array.dtype, np.datetime64):
+            return lambda value: str(pd.Timestamp(value))
+
+        return lambda value: '' if value is None or (isinstance(value, float) and np.isnan(value)) else str(value)
+
+    ''' Paging '''
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self.loaded < self.rows
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.page_size, self.rows - self.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    ''' Model '''
 
     def rowCount(self, parent=None):
-        return self._data.shape[0]
+        if parent is not None and parent.isValid():
+            return 0
+        return self.loaded
 
     def columnCount(self, parent=None):
-        return self._data.shape[1]
+        if parent is not None and parent.isValid():
+            return 0
+        return len(self.columns)
 
     def data(self, index, role=Qt.DisplayRole):
         if index.isValid():
             if role == Qt.DisplayRole:
-                return str(self._data.iloc[index.row(), index.column()])
+                col = index.column()
+                return self.formatters[col](self.arrays[col][index.row()])
         return None
 
     def headerData(self, col, orientation, role):
         if orientation == Qt.Horizontal and role == Qt.DisplayRole:
-            return self._data.columns[col]
+            return str(self.columns[col])
+        if orientation == Qt.Vertical and role == Qt.DisplayRole and isinstance(self.row_index, pd.DatetimeIndex):
+            return str(self.row_index[col])
         return None
@@ -0,0 +1,313 @@
+import pickle
+import queue
+import itertools
+import traceback
+import multiprocessing as mp
+from collections import deque
+# MiGUEL modules
+from pipeline import SimulationPipeline
+from cache import ResultCache
+
+
+def simulation_worker(tasks, messages, cache_path: str = None, cache_size: float = 1024):
+    """
+    Worker process: run simulation jobs from the task queue
+    The SimulationPipeline is kept between jobs, unchanged stages are reused.
+    :param tasks: multiprocessing.Queue
+        (job id, pickled environment, strategy, h2_policy, evaluate), None stops the worker
+    :param messages: multiprocessing.Queue
+        (message, job id, value) to the JobManager
+    :param cache_path: str
+        directory of the persistent result cache, None disables the cache
+    :param cache_size: float
+        maximum cache size [MB]
+    :return: None
+    """
+    pipeline = None
+    cache = ResultCache(path=cache_path, max_size=cache_size) if cache_path is not None else None
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        job_id, data, strategy, h2_policy, evaluate = task
+
+        def progress(fraction: float, job_id=job_id):
+            messages.put(('progress', job_id, fraction))
+
+        try:
+            env = pickle.loads(data)
+            if pipeline is None:
+                pipeline = SimulationPipeline(env=env,
+                                              cache=cache)
+            else:
+                pipeline.rebind(env=env)
+            pipeline.strategy = strategy
+            pipeline.h2_policy = h2_policy
+            pipeline.progress = progress
+            messages.put(('stage', job_id, 'dispatch'))
+            operator = pipeline.dispatch()
+            evaluation = None
+            if evaluate:
+                messages.put(('stage', job_id, 'evaluation'))
+                evaluation = pipeline.evaluate()
+            # Callbacks can not be pickled
+            operator.progress = None
+            messages.put(('finished', job_id, pickle.dumps((operator, evaluation))))
+        except Exception:
+            messages.put(('failed', job_id, traceback.format_exc()))
+
+
+class SimulationJob:
+    """
+    Simulation job of the JobManager
+    """
+
+    def __init__(self,
+                 job_id: int,
+                 env,
+                 strategy: str,
+                 h2_policy: str,
+                 evaluate: bool,
+                 on_progress=None,
+                 on_finished=None,
+                 on_failed=None):
+        """
+        :param job_id: int
+        :param env: environment.Environment
+        :param strategy: str
+            dispatch strategy
+        :param h2_policy: str
+            allocation policy of the hydrogen subsystem
+        :param evaluate: bool
+            run evaluation after dispatch
+        :param on_progress: callable
+            called with the job on progress updates
+        :param on_finished: callable
+            called with the job after evaluation (or dispatch)
+        :param on_failed: callable
+            called with the job if the simulation failed
+        """
+        self.id = job_id
+        self.env = env
+        self.strategy = strategy
+        self.h2_policy = h2_policy
+        self.evaluate = evaluate
+        self.on_progress = on_progress
+        self.on_finished = on_finished
+        self.on_failed = on_failed
+        # 'queued', 'running', 'finished', 'failed' or 'cancelled'
+        self.status = 'queued'
+        self.stage = None
+        self.progress = 0.0
+        self.operator = None
+        self.evaluation = None
+        self.error = None
+
+    @property
+    def done(self):
+        """
+        :return: bool
+        """
+        return self.status in ('finished', 'failed', 'cancelled')
+
+
+class JobManager:
+    """
+    Non-blocking simulation service for the GUIs
+    Environment -> Operator -> Evaluation runs in a worker process. Jobs are queued and sent to the worker
+    one after another. poll() has to be called periodically from the GUI event loop (QTimer, tk.after):
+    it collects progress and results and calls the job callbacks in the GUI thread.
+    """
+
+    def __init__(self,
+                 cache_path: str = None,
+                 cache_size: float = 1024):
+        """
+        :param cache_path: str
+            directory of the persistent result cache (identical systems are not simulated again)
+        :param cache_size: float
+            maximum cache size [MB]
+        """
+        self.cache_path = cache_path
+        self.cache_size = cache_size
+        self.context = mp.get_context('spawn')
+        self.jobs = {}
+        self.pending = deque()
+        self.current = None
+        self.process = None
+        self.tasks = None
+        self.messages = None
+        self._ids = itertools.count(1)
+
+    ''' Worker process '''
+
+    def start(self):
+        """
+        Start worker process
+        :return: None
+        """
+        self.tasks = self.context.Queue()
+        self.messages = self.context.Queue()
+        self.process = self.context.Process(target=simulation_worker,
+                                            args=(self.tasks, self.messages, self.cache_path, self.cache_size),
+                                            daemon=True)
+        self.process.start()
+
+    def stop(self):
+        """
+        Terminate worker process (running job is cancelled)
+        :return: None
+        """
+        if self.process is not None:
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process.join()
+        self.process = None
+
+    def shutdown(self):
+        """
+        Cancel all jobs and stop worker process
+        :return: None
+        """
+        for job in list(self.pending):
+            self.cancel(job.id)
+        if self.current is not None:
+            self.cancel(self.current.id)
+        if self.process is not None:
+            self.tasks.put(None)
+            self.process.join(timeout=5)
+            self.stop()
+
+    ''' Jobs '''
+
+    def submit(self,
+               env,
+               strategy: str = 'vectorized-greedy',
+               h2_policy: str = 'priority',
+               evaluate: bool = True,
+               on_progress=None,
+               on_finished=None,
+               on_failed=None):
+        """
+        Queue simulation job
+        The environment is copied, later changes do not affect the job.
+        :param env: environment.Environment
+        :param strategy: str
+            dispatch strategy
+        :param h2_policy: str
+            allocation policy of the hydrogen subsystem
+        :param evaluate: bool
+            run evaluation after dispatch
+        :param on_progress: callable
+        :param on_finished: callable
+        :param on_failed: callable
+        :return: SimulationJob
+        """
+        job = SimulationJob(job_id=next(self._ids),
+                            env=pickle.dumps(env),
+                            strategy=strategy,
+                            h2_policy=h2_policy,
+                            evaluate=evaluate,
+                            on_progress=on_progress,
+                            on_finished=on_finished,
+                            on_failed=on_failed)
+        self.jobs[job.id] = job
+        self.pending.append(job)
+        self.next_job()
+
+        return job
+
+    def cancel(self, job_id: int):
+        """
+        Cancel queued or running job
+        A running job is cancelled by terminating the worker process, cached stages are lost.
+        :param job_id: int
+        :return: None
+        """
+        job = self.jobs[job_id]
+        if job.done:
+            return
+        if job.status == 'queued':
+            self.pending.remove(job)
+        else:
+            self.stop()
+            self.current = None
+        job.status = 'cancelled'
+        self.next_job()
+
+    def next_job(self):
+        """
+        Send next queued job to the worker process if idle
+        :return: None
+        """
+        if self.current is not None or len(self.pending) == 0:
+            return
+        if self.process is None or not self.process.is_alive():
+            self.start()
+        job = self.pending.popleft()
+        job.status = 'running'
+        self.current = job
+        self.tasks.put((job.id, job.env, job.strategy, job.h2_policy, job.evaluate))
+
+    @property
+    def busy(self):
+        """
+        :return: bool
+            jobs running or queued
+        """
+        return self.current is not None or len(self.pending) > 0
+
+    def poll(self):
+        """
+        Process worker messages and call job callbacks
+        :return: bool
+            jobs running or queued
+        """
+        while self.messages is not None:
+            try:
+                message, job_id, value = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            job = self.jobs.get(job_id)
+            if job is None or job is not self.current:
+                # Message of a cancelled job
+                continue
+            if message == 'progress':
+                job.progress = value
+                if job.on_progress is not None:
+                    job.on_progress(job)
+            elif message == 'stage':
+                job.stage = value
+                if job.on_progress is not None:
+                    job.on_progress(job)
+            elif message == 'finished':
+                job.operator, job.evaluation = pickle.loads(value)
+                job.progress = 1.0
+                self.finish(job, status='finished')
+            elif message == 'failed':
+                job.error = value
+                self.finish(job, status='failed')
+        if self.current is not None and not self.process.is_alive():
+            job = self.current
+            job.error = f'Worker process exited with code {self.process.exitcode}'
+            self.process = None
+            self.finish(job, status='failed')
+
+        return self.busy
+
+    def finish(self,
+               job: SimulationJob,
+               status: str):
+        """
+        :param job: SimulationJob
+        :param status: str
+            'finished' or 'failed'
+        :return: None
+        """
+        job.status = status
+        job.env = None
+        self.current = None
+        callback = job.on_finished if status == 'finished' else job.on_failed
+        if callback is not None:
+            callback(job)
+        self.next_job()
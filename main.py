@@ -3,6 +3,7 @@ import datetime as dt
 import pandas as pd
 from pathlib import Path
 from environment import Environment
+from profiles import read_profile
 from operation import Operator
 from evaluation import Evaluation
 import os
@@ -52,11 +53,9 @@ def demonstration(grid_connection=False, n_modul=None):
 
 
 
-    # 1. read csv file/import data
-    df = pd.read_csv("Caiambe-Data.csv", sep=";", decimal=",", index_col=0)
+    # 1. read csv file/import data (time stamps parsed and validated, binary copy for later runs)
+    df = read_profile(path="Caiambe-Data.csv", sep=";", decimal=",", dayfirst=True)
 
-    # 2. Index change in datetime
-    df.index = pd.to_datetime(df.index, dayfirst=True)
     df = df.iloc[:200]  # short to 200 hours for testing
 
   
@@ -7,14 +7,12 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, scrolledtext
 from datetime import datetime, timedelta
 import pandas as pd
-import threading
 import os
 import sys
 
 # Import MiGUEL modules
 from environment import Environment
-from operation import Operator
-from evaluation import Evaluation
+from jobs import JobManager
 
 
 class MiGUELApp:
@@ -27,6 +25,9 @@ class MiGUELApp:
         
         # State variables
         self.env = None
+        # Simulation service (worker process), polled from the Tk event loop
+        self.jobs = JobManager(cache_path=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'export', 'cache'))
+        self.poll_id = None
         self.operator = None
         self.evaluation = None
         self.components_added = []
@@ -413,6 +414,11 @@ class MiGUELApp:
                                      command=self.run_simulation,
                                      style='Accent.TButton')
         self.sim_button.pack(side='left', padx=5)
+
+        self.cancel_button = ttk.Button(button_frame, text="■ Cancel",
+                                        command=self.cancel_simulation,
+                                        state='disabled')
+        self.cancel_button.pack(side='left', padx=5)
         
         ttk.Button(button_frame, text="📋 Update Overview", 
                   command=self.update_system_overview).pack(side='left', padx=5)
@@ -421,7 +427,7 @@ class MiGUELApp:
         self.progress_var = tk.StringVar(value="Not started")
         ttk.Label(main_frame, textvariable=self.progress_var).pack()
         
-        self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
+        self.progress = ttk.Progressbar(main_frame, mode='determinate', maximum=100)
         self.progress.pack(fill='x', pady=5)
         
     def create_results_tab(self):
@@ -739,39 +745,78 @@ class MiGUELApp:
             messagebox.showwarning("Warning", "Please add a load profile first")
             return
             
-        # Run in thread to not freeze UI
-        def simulation_thread():
-            try:
-                self.progress_var.set("Running dispatch...")
-                self.progress.start()
-                self.sim_button.config(state='disabled')
-                
-                # Run operator
-                self.operator = Operator(env=self.env)
-                
-                self.progress_var.set("Calculating evaluation metrics...")
-                
-                # Run evaluation
-                self.evaluation = Evaluation(env=self.env, operator=self.operator)
-                
-                self.progress.stop()
-                self.progress_var.set("Simulation completed!")
-                self.sim_button.config(state='normal')
-                
-                # Show results
-                self.display_results()
-                
-                # Switch to results tab
-                self.notebook.select(6)
-                
-            except Exception as e:
-                self.progress.stop()
-                self.progress_var.set("Simulation failed")
-                self.sim_button.config(state='normal')
-                messagebox.showerror("Error", f"Simulation failed:\n{str(e)}")
-                
-        threading.Thread(target=simulation_thread, daemon=True).start()
-        
+        # Economic parameters can be changed without recreating the system
+        self.env.d_rate = float(self.discount_rate.get())
+        if self.grid_connected.get():
+            self.env.electricity_price = float(self.electricity_price.get())
+
+        # Run in worker process to not freeze UI (stages with unchanged inputs are reused)
+        self.jobs.submit(env=self.env,
+                         on_progress=self.simulation_progress,
+                         on_finished=self.simulation_finished,
+                         on_failed=self.simulation_failed)
+        self.cancel_button.config(state='normal')
+        self.update_job_status()
+        if self.poll_id is None:
+            self.poll_jobs()
+
+    def poll_jobs(self):
+        """Collect simulation progress and results"""
+        if self.jobs.poll():
+            self.poll_id = self.root.after(100, self.poll_jobs)
+        else:
+            self.poll_id = None
+            self.cancel_button.config(state='disabled')
+
+    def update_job_status(self, text=None):
+        """Show running job and number of queued jobs"""
+        job = self.jobs.current
+        if text is None:
+            text = "Running dispatch..." if job is None or job.stage != 'evaluation' \
+                else "Calculating evaluation metrics..."
+        if len(self.jobs.pending) > 0:
+            text += f" ({len(self.jobs.pending)} queued)"
+        self.progress_var.set(text)
+
+    def simulation_progress(self, job):
+        """Update progress bar"""
+        self.progress['value'] = job.progress * 100
+        self.update_job_status()
+
+    def simulation_finished(self, job):
+        """Show results of finished simulation job"""
+        self.operator = job.operator
+        self.evaluation = job.evaluation
+        self.progress['value'] = 100
+        self.update_job_status("Simulation completed!")
+
+        # Show results
+        self.display_results()
+
+        # Switch to results tab
+        self.notebook.select(6)
+
+    def simulation_failed(self, job):
+        """Report failed simulation job"""
+        self.progress['value'] = 0
+        self.update_job_status("Simulation failed")
+        messagebox.showerror("Error", f"Simulation failed:\n{job.error.strip().splitlines()[-1]}")
+
+    def cancel_simulation(self):
+        """Cancel running and queued simulation jobs"""
+        for job in list(self.jobs.pending):
+            self.jobs.cancel(job.id)
+        if self.jobs.current is not None:
+            self.jobs.cancel(self.jobs.current.id)
+        self.progress['value'] = 0
+        self.progress_var.set("Simulation cancelled")
+        self.cancel_button.config(state='disabled')
+
+    def on_close(self):
+        """Stop simulation service and close window"""
+        self.jobs.shutdown()
+        self.root.destroy()
+
     def display_results(self):
         """Display simulation results"""
         if not self.evaluation:
@@ -860,6 +905,7 @@ def main():
     style.configure('Accent.TButton', font=('Calibri', 10, 'bold'))
     
     app = MiGUELApp(root)
+    root.protocol('WM_DELETE_WINDOW', app.on_close)
     root.mainloop()
 
 
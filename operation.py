@@ -9,12 +9,12 @@ from components.pv import PV
 from components.windturbine import WindTurbine
 from components.storage import Storage
 from components.grid import Grid
-from components.electrolyser import Electrolyser
-from components.fuel_cell import FuelCell
-from components.H2_Storage import H2Storage
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from analysis.unmet_load import UnmetLoad
+from dispatch.base import DispatchState, get_strategy
+from dispatch.checkpoint import DispatchCheckpoint
+from dispatch.fleet import StorageFleet
+from dispatch.hydrogen import HydrogenSystem
+# matplotlib and plotly are imported lazily inside the plot methods to keep import time short
 
 class Operator:
     """
@@ -22,93 +22,281 @@ class Operator:
     """
 
     def __init__(self,
-                 env: Environment):
+                 env: Environment,
+                 h2_policy: str = 'priority',
+                 strategy='greedy-current',
+                 re_stage: tuple = None,
+                 storage_stage: tuple = None,
+                 checkpoint: str = None,
+                 checkpoint_interval: int = 1000,
+                 resume: str = None,
+                 progress=None,
+                 export: bool = True):
         """
         :param env: env.Environment
             system environment
+        :param h2_policy: str
+            allocation policy for several electrolysers, H2 storages and fuel cells
+            ('priority' or 'pro_rata')
+        :param strategy: str/dispatch.base.DispatchStrategy
+            registered strategy name (see dispatch.available_strategies()) or strategy object,
+            None runs the greedy time step dispatch
+        :param re_stage: tuple
+            cached RE self supply stage (dispatch.base.DispatchState.self_supply) of vectorizable strategies
+        :param storage_stage: tuple
+            cached energy storage stage (dispatch.base.DispatchState.storage_stage) of vectorizable strategies
+        :param checkpoint: str
+            file path (.npz) for periodic checkpoints of the time step dispatch (strategies with checkpoints)
+        :param checkpoint_interval: int
+            time steps between checkpoints
+        :param resume: str
+            checkpoint file to resume from (or to branch from with changed components)
+        :param progress: callable
+            called with the fraction of dispatched time steps (e.g. jobs.JobManager)
+        :param export: bool
+            write results to the export directory (operator.csv, weather data, core dispatch data)
         """
         self.env = env
-        self.energy_data = self.env.calc_energy_consumption_parameters()
-        self.energy_consumption = self.energy_data[0]
-        self.peak_load = self.energy_data[1]
+        self.h2_policy = h2_policy
+        if strategy is None:
+            strategy = 'greedy-current'
+        if isinstance(strategy, str):
+            strategy = get_strategy(strategy)
+        self.strategy = strategy
+        self.re_stage = re_stage
+        self.storage_stage = storage_stage
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        self.dispatch_checkpoint = None
+        self.progress = progress
+        self.export = export
+        self.h2_system = None
+        self.fleet = None
         self.system_covered = None
         self.system = {0: 'Off Grid System', 1: 'Stable Grid connection', 2: 'Unstable Grid connection'}
-        self.power_sink = pd.DataFrame(columns=['Time', 'P [W]'])
-        self.power_sink = self.power_sink.set_index('Time')
+        self.unmet_load = None
         self.power_sink_max = None
         self.df = self.build_df()
+        # Load including scheduled flexible loads
+        self.energy_data = self.env.calc_energy_consumption_parameters(load=self.df['Load [W]'].to_numpy())
+        self.energy_consumption = self.energy_data[0]
+        self.peak_load = self.energy_data[1]
         self.dispatch_finished = False
         self.dispatch()
-        self.export_data()
+        if self.export:
+            self.export_data()
+
+    @classmethod
+    def from_results(cls,
+                     env: Environment,
+                     df: pd.DataFrame,
+                     h2_policy: str = 'priority',
+                     strategy='greedy-current'):
+        """
+        Create Operator from stored dispatch results without running the dispatch (see cache.ResultCache)
+        :param env: env.Environment
+            system environment with dispatched component states
+        :param df: pd.DataFrame
+            Operator results
+        :param h2_policy: str
+        :param strategy: str/dispatch.base.DispatchStrategy
+        :return: Operator
+        """
+        operator = cls.__new__(cls)
+        operator.env = env
+        operator.h2_policy = h2_policy
+        operator.strategy = get_strategy(strategy) if isinstance(strategy, str) else strategy
+        operator.re_stage = None
+        operator.storage_stage = None
+        operator.checkpoint = None
+        operator.checkpoint_interval = None
+        operator.resume = None
+        operator.dispatch_checkpoint = None
+        operator.progress = None
+        operator.export = False
+        operator.h2_system = None
+        operator.fleet = None
+        operator.energy_data = env.calc_energy_consumption_parameters(load=df['Load [W]'].to_numpy())
+        operator.energy_consumption = operator.energy_data[0]
+        operator.peak_load = operator.energy_data[1]
+        operator.system = {0: 'Off Grid System', 1: 'Stable Grid connection', 2: 'Unstable Grid connection'}
+        operator.df = df
+        operator.unmet_load = operator.check_dispatch()
+        operator.power_sink_max = operator.unmet_load.max_power
+        operator.system_covered = operator.unmet_load.covered
+        operator.dispatch_finished = True
+
+        return operator
 
     ''' Basic Functions'''
 
+    def output_schema(self):
+        """
+        Declared Operator.df result columns
+        System columns and the columns contributed by each component (component.output_schema)
+        :return: dict
+            column: initial value
+        """
+        env = self.env
+        schema = {'Load [W]': 0.0,
+                  'P_Res [W]': 0.0,
+                  'PV_Production [W]': 0.0}
+        for flexible_load in getattr(env, 'flexible_loads', []):
+            schema.update(flexible_load.output_schema())
+        if env.grid_connection and env.blackout:
+            schema['Blackout'] = 0.0
+        schema['P_Remain_total [W]'] = 0.0
+        if len(env.storage) > 0:
+            schema['PV_to_storage [W]'] = 0.0
+            schema['WT_to_storage[W]'] = 0.0
+        if len(env.H2Storage) > 0:
+            schema['from_PV_to_electrolyser [W]'] = 0.0
+            schema['from_WT_to_electrolyser [W]'] = 0.0
+            schema['H2-SOC [%]'] = np.nan
+        components = env.re_supply + env.storage + env.electrolyser + env.H2Storage + env.fuel_cell
+        components += getattr(env, 'diesel_generator', [])
+        if env.grid is not None:
+            components.append(env.grid)
+        for component in components:
+            schema.update(component.output_schema())
+
+        return schema
+
     def build_df(self):
         """
-        Assign columns to pd.DataFrame
+        Preallocate result DataFrame from the output schema
+        All columns are float arrays, the dispatch only writes into existing columns.
         :return: pd.DataFrame
             DataFrame with component columns
         """
-        df = pd.DataFrame(columns=['Load [W]', 'P_Res [W]','PV_Production [W]'],
-                          index=self.env.time)
-        df['Load [W]'] = self.env.df['P_Res [W]'].round(2)
-        df['P_Res [W]'] = self.env.df['P_Res [W]'].round(2)
-        df['PV_Production [W]'] = self.env.df['PV total power [W]']
+        env = self.env
+        schema = self.output_schema()
+        n = len(env.time)
+        df = pd.DataFrame({col: np.full(n, value, dtype=float) for col, value in schema.items()},
+                          index=env.time)
+        # Inputs
+        df['Load [W]'] = env.df['P_Res [W]'].round(2).to_numpy(dtype=float)
+        # Flexible loads are scheduled into the RE surplus of the fixed load
+        for name, load in env.schedule_flexible_loads(load=df['Load [W]'].to_numpy()).items():
+            df[f'{name} [W]'] = load
+            df['Load [W]'] += load
+        df['P_Res [W]'] = df['Load [W]']
+        df['PV_Production [W]'] = env.df['PV total power [W]'].to_numpy(dtype=float)
+        if 'Blackout' in df.columns:
+            df['Blackout'] = env.df['Blackout'].to_numpy(dtype=float)
+        for re in env.re_supply:
+            df[f'{re.name} production [W]'] = re.df['P [W]'].to_numpy(dtype=float)
+        self.echo_h2_results(df=df)
+
+        return df
+
+    def echo_h2_results(self, df: pd.DataFrame):
+        """
+        Copy hydrogen component results (electrolyser, H2 storage, fuel cell DataFrames) to the result DataFrame
+        :param df: pd.DataFrame
+            result DataFrame
+        :return: None
+        """
+        env = self.env
+        for el in env.electrolyser:
+            df[f'{el.name} power [W]'] = el.df_electrolyser['P[W]'].to_numpy(dtype=float)
+        for hstr in env.H2Storage:
+            df[f'{hstr.name}: H2 Outflow [kg]'] = hstr.hstorage_df['H2 Outflow [kg]'].to_numpy(dtype=float)
+            df[f'{hstr.name}: H2 Inflow [kg]'] = hstr.hstorage_df['H2 Inflow [kg]'].to_numpy(dtype=float)
+            df[f'{hstr.name} _Storage Level [kg]'] = hstr.hstorage_df['Storage Level [kg]'].to_numpy(dtype=float)
+        for fc in env.fuel_cell:
+            df[f'{fc.name} Power[W]'] = fc.df_fc['Power Output [W]'].to_numpy(dtype=float)
+
+    ''' Simulation '''
+
+    def dispatch(self):
+        """
+        Run dispatch strategy and post-process results
+        :return: None
+        """
+        env = self.env
+        if (self.checkpoint is not None or self.resume is not None) \
+                and not getattr(self.strategy, 'checkpoints', False):
+            raise ValueError(f'Dispatch strategy {self.strategy.name} does not support checkpoint/resume.')
+        if getattr(self.strategy, 'vectorizable', False):
+            # Fast path: strategy works on component state arrays
+            state = DispatchState.from_operator(self)
+            columns = self.strategy.dispatch(state=state)
+            self.re_stage = state.re_stage
+            self.storage_stage = state.storage_stage
+        else:
+            columns = self.strategy.run(operator=self)
+        for col, values in columns.items():
+            self.df[col] = values
+        if not getattr(self.strategy, 'vectorizable', False):
+            # Last priority: diesel generator (vectorized strategies include the diesel stage)
+            self.diesel_dispatch()
+        if self.h2_system is None:
+            self.h2_system = getattr(self.strategy, 'h2_system', None)
+        # Component results of this dispatch (build_df copied the state before the dispatch)
+        self.echo_h2_results(df=self.df)
+        if self.progress is not None:
+            self.progress(1.0)
 
-        if self.env.grid_connection:
-            if self.env.blackout:
-                df['Blackout'] = self.env.df['Blackout']
         for pv in self.env.pv:
-            pv_col = f'{pv.name} [W]'
-            df[pv_col] = 0
-            df[f'{pv.name} production [W]'] = pv.df['P [W]']
-        for wt in self.env.wind_turbine:
-            wt_col = f'{wt.name} [W]'
-            df[wt_col] = 0
-            df[f'{wt.name} production [W]'] = wt.df['P [W]']
+            col = pv.name + ' [W]'
+            self.df[col] = np.where(self.df[col] < 0, 0, self.df[col])
         for es in self.env.storage:
-            es_col = f'{es.name} [W]'
-            df[es_col] = 0
-            df[f'{es.name}_capacity [Wh]'] = np.nan
-        for el in self.env.electrolyser:
-            el_col = f'{el.name} [W]'
-            df[el_col] = 0
-            df[f'{el.name} power [W]'] = el.df_electrolyser['P[W]']
-        for hstr in self.env.H2Storage:
-            hstr_col = f'{hstr.name} [W]'
-            df[hstr_col] = 0
-            df[f'{hstr.name}: H2 Outflow [kg]'] = hstr.hstorage_df['H2 Outflow [kg]']
-            df[f'{hstr.name}: H2 Inflow [kg]'] = hstr.hstorage_df['H2 Inflow [kg]']
-            df[f'{hstr.name} _Storage Level [kg]'] = hstr.hstorage_df['Storage Level [kg]']
-        for fc in self.env.fuel_cell:
-            fc_col = f'{fc.name} [W]'
-            df[fc_col] = 0
-            df[f'{fc.name} Power[W]'] = fc.df_fc['Power Output [W]']
-
-        if self.env.grid is not None:  # sicherstellen dass das Grid nur dann in DF AAUFGENOMMEN WIRD;Wenn ein Netz existiert
-            grid_col = f'{self.env.grid.name} [W]'
-            df[grid_col] = 0
+            # Calendar and cycle aging of the SOC after every time step (component DataFrame)
+            es.calc_aging(soc=pd.to_numeric(es.df['SOC'], errors='coerce').to_numpy(dtype=float))
 
+        if self.env.feed_in:
+            for component in env.re_supply:
+                self.feed_in(component=component)
+        self.unmet_load = self.check_dispatch()
+        self.power_sink_max = self.unmet_load.max_power
+        self.system_covered = self.unmet_load.covered
+        self.dispatch_finished = True
 
-        return df
+        if self.export:
+            self.export_core_data()
 
-    ''' Simulation '''
+        #self.plot_daily_system_behavior(day='2022-06-01')
+        #self.plot_daily_system_behavior_interactive(day='2022-07-01')
 
-    def dispatch(self):
+    def greedy_dispatch(self):
         """
         dispatch:
         Basic priorities
             1) RE self-consumption
             2) Charge storage from RE
+            3) Operate electrolyser from RE surplus
+            4) Cover residual load from storage, fuel cell and grid
+            5) Cover remaining residual load from diesel generator (see dispatch)
+        The hydrogen subsystem is event-driven and runs after the time step iteration.
         :return: None
         """
         env = self.env
         print(f"DEBUG: Dispatch started")
-        processed_times = set()
-
+        pv_surplus = np.zeros(len(self.df.index))
+        wt_surplus = np.zeros(len(self.df.index))
+        unstable = env.grid_connection is True and env.blackout is not False
+        if unstable:
+            blackout = env.df['Blackout'].to_numpy(dtype=bool)
+        self.fleet = StorageFleet(storage=env.storage,
+                                  dt=env.i_step / 60,
+                                  policy=getattr(env, 'storage_policy', 'priority'))
+        start = 0
+        self.dispatch_checkpoint = DispatchCheckpoint.from_operator(operator=self)
+        if self.resume is not None:
+            # Continued checkpoints keep the segments of the resumed checkpoint
+            self.dispatch_checkpoint = DispatchCheckpoint.load(self.resume)
+            start = self.dispatch_checkpoint.restore(operator=self,
+                                                     pv_surplus=pv_surplus,
+                                                     wt_surplus=wt_surplus)
+            print(f'Dispatch resumed at {self.df.index[min(start, len(self.df.index) - 1)]}')
+
+        n = len(self.df.index)
+        report_interval = max(n // 100, 1)
         # Time step iteration
-        for i,clock in enumerate(self.df.index):
-            prev_clock = self.df.index[i - 1] if i > 0 else clock
+        for i in range(start, n):
+            clock = self.df.index[i]
             # Priority 1: RE self supply
             for component in env.re_supply:
 
@@ -122,97 +310,70 @@ class Operator:
             self.df.at[clock, 'P_Remain_total [W]'] = total_remain
 
             # Priority 2: Charge Storage from RE
-            for es in env.storage:
-
-                pv_remain, wt_remain = self.re_charge(clock, es, pv_power=pv_remain, wt_power=wt_remain)
-
-            # Priority 3: Betrieb Electrolyser
-            h2_produced = 0
-            for h2_storage in env.H2Storage:
-                # Check if storage is full (SOC [%] from previous timestep)
-                h2_full = h2_storage.hstorage_df.at[prev_clock, 'SOC [%]'] >= 100
-
-                if h2_full:
-                    # Kein Betrieb, aber Werte im Elektrolyseur-DataFrame setzen
-                    for el in env.electrolyser:
-                        self.df.at[clock, f'{el.name} [W]'] = 0
-                        self.df.at[clock, f'{el.name} [%]'] = 0
-                        self.df.at[clock, f'{el.name}_Hydrogen [kg]'] = 0
-
-                else:
-                    # Nur wenn Speicher nicht voll ist → Elektrolyseur betreiben
-                    for el in env.electrolyser:
-                        pv_remain, wt_remain = self.electrolyser_operate(clock=clock,
-                                                                         el=el,pv_power= pv_remain,
-                                                                         wt_power=wt_remain)
-
-                        h2_produced += el.df_electrolyser.at[clock, 'H2_Production [kg]']
-
-                # Store produced hydrogen in H2 storage
-                #for  h2_storage in env.H2Storage:
-                self.H2_charge(clock=clock, hstr=h2_storage, inflow=h2_produced, el=el)
-
-            for fc in env.fuel_cell:
-                if self.df.at[clock,'P_Res [W]'] == 0.0:
-                   self.df.at[clock, f'{fc.name} [W]'] = 0
+            pv_remain, wt_remain = self.fleet_charge(clock=clock, pv_power=pv_remain, wt_power=wt_remain)
+            # RE surplus for the hydrogen subsystem (Priority 3)
+            pv_surplus[i] = pv_remain
+            wt_surplus[i] = wt_remain
 
             if env.grid_connection is True:
                 # system with grid connection
                 if env.blackout is False:
                     # stable grid connection
                     self.stable_grid(clock=clock)
-                else:
-                    # Unstable grid connection
+                elif blackout[i]:
+                    # Unstable grid connection: only blackouts are dispatched per time step
                     self.unstable_grid(clock=clock)
             else:
                 # Off grid system
                 self.off_grid(clock=clock)
 
-        for pv in self.env.pv:
-            col = pv.name + ' [W]'
-            self.df[col] = np.where(self.df[col] < 0, 0, self.df[col])
-
-        if self.env.feed_in:
-            for component in env.re_supply:
-                self.feed_in(component=component)
-        power_sink = self.check_dispatch()
-        self.power_sink = pd.concat([self.power_sink, power_sink])
-        if len(self.power_sink) == 0:
-            self.power_sink_max = 0
-            self.system_covered = True
-        else:
-            self.power_sink_max = float(self.power_sink.max().iloc[0])
-            self.system_covered = False
-        self.dispatch_finished = True
-
-        cols = []
-        for pv in self.env.pv:
-            cols.append(f'{pv.name}')
-
-        self.export_core_data()
-
-        #self.plot_daily_system_behavior(day='2022-06-01')
-        #self.plot_daily_system_behavior_interactive(day='2022-07-01')
-
+            if self.checkpoint is not None and (i + 1) % self.checkpoint_interval == 0:
+                self.save_checkpoint(path=self.checkpoint,
+                                     cursor=i,
+                                     pv_surplus=pv_surplus,
+                                     wt_surplus=wt_surplus)
+            if self.progress is not None and (i + 1) % report_interval == 0:
+                self.progress((i + 1) / n)
+
+        if env.grid_connection is True:
+            # Grid covers the residual load (outside of blackouts)
+            self.grid_supply(grid_available=~blackout if unstable else np.ones(n, dtype=bool))
+
+        # Priority 3: Electrolyser, Priority 4: Fuel cell (event-driven)
+        self.hydrogen_dispatch(pv_surplus=pv_surplus,
+                               wt_surplus=wt_surplus)
+
+    def save_checkpoint(self,
+                        path: str,
+                        cursor: int,
+                        pv_surplus: np.ndarray,
+                        wt_surplus: np.ndarray):
+        """
+        Save state of the time step dispatch (time steps since the previous checkpoint)
+        :param path: str
+            file path (.npz)
+        :param cursor: int
+            index of the last dispatched time step
+        :param pv_surplus: np.ndarray
+            PV surplus after storage charging [W]
+        :param wt_surplus: np.ndarray
+            wind surplus after storage charging [W]
+        :return: None
+        """
+        self.dispatch_checkpoint.save(operator=self,
+                                      path=path,
+                                      cursor=cursor,
+                                      pv_surplus=pv_surplus,
+                                      wt_surplus=wt_surplus)
 
     def check_dispatch(self):
         """
         Check if all load is covered with current system components
-        :return: None
+        :return: analysis.unmet_load.UnmetLoad
+            unmet load intervals and aggregates
         """
-        power_sink = {}  # speichert die nicht gedeckte Leistung
-        for clock in self.df.index:
-            if self.df.at[clock, 'P_Res [W]'] > 0:
-                power_sink[clock] = self.df.at[clock, 'P_Res [W]']
-
-        power_sink_df = pd.DataFrame(power_sink.items(),
-                                     columns=['Time', 'P [W]'])
-
-        power_sink_df = power_sink_df.set_index('Time')
-        power_sink_df = power_sink_df.round(2)
-
-
-        return power_sink_df  # die Werte werden in einer DF gegeben mit nicht gedeckte leistung
+        return UnmetLoad(p_res=self.df['P_Res [W]'],
+                         t_step=self.env.i_step / 60)
 
     def stable_grid(self,
                     clock: dt.datetime):
@@ -220,130 +381,150 @@ class Operator:
         Dispatch strategy from stable grid connection
             Stable grid connection:
                 3) Cover residual load from Storage
-                4) Cover residual Load from Fuelcell
-                5) Cover residual load from Grid
+                4) Cover residual load from Grid (see grid_supply)
         :param clock: dt.datetime
             time stamp
         :return: None
         """
-        env = self.env
-        for es in env.storage:
-            if self.df.at[clock, 'P_Res [W]'] > 0:
-                power = self.df.at[clock, 'P_Res [W]']
-
-                discharge_power = es.discharge(clock=clock,
-                                               power=power)
-                self.df.at[clock, f'{es.name} [W]'] += float(discharge_power)
-                self.df.at[clock, 'P_Res [W]'] += float(discharge_power)
-        # Priority 4: Cover load from grid
-        if self.env.grid_connection:
-            self.grid_profile(clock=clock)
+        self.fleet_discharge(clock=clock)
 
     def unstable_grid(self,
                       clock: dt.datetime):
         """
-        Dispatch strategy for unstable grid connection
+        Dispatch strategy for unstable grid connection during blackouts
             No Blackout:
-                3) Cover residual load from Grid
+                3) Cover residual load from Grid (see grid_supply)
             Blackout:
                 4.1) Cover load from Storage
-                4.2) Cover load from Diesel Generator
+                4.2) Cover load from Fuel cell (see hydrogen_dispatch)
         :param clock: dt.datetime
             time stamp
         :return: None
         """
-        env = self.env
-        if not env.df.at[clock, 'Blackout']:
-            self.grid_profile(clock=clock)
-        else:
-            for es in env.storage:
-                if self.df.at[clock, 'P_Res [W]'] > 0:
-                    power = self.df.at[clock, 'P_Res [W]']
-                    discharge_power = es.discharge(clock=clock,
-                                                   power=power)
-                    self.df.at[clock, f'{es.name} [W]'] += discharge_power
-                    self.df.at[clock, 'P_Res [W]'] += discharge_power
-            for fc in env.fuel_cell:
-                self.re_fc_operate(clock=clock,
-                                fc= fc)
+        self.fleet_discharge(clock=clock)
 
     def off_grid(self,
                  clock: dt.datetime):
         """
         Dispatch strategy for Off-grid systems
-
+            3) Cover residual load from Storage
+            4) Cover residual load from Fuelcell (see hydrogen_dispatch)
 
         :param clock: dt.datetime
             time stamp
         :return: None
         """
-        env = self.env
-        p_res = self.df.at[clock, 'P_Res [W]']
-        t_step = self.env.i_step
+        self.fleet_discharge(clock=clock)
+        # Remaining residual load is covered by the FuelCell in hydrogen_dispatch
 
-        # Check Energy storage parameters
-        storage_power = {}
-        storage_capacity = {}
+        # Sicherheitsprüfung gegen negative Werte
+        if self.df.at[clock, 'P_Res [W]'] < 0:
+            self.df.at[clock, 'P_Res [W]'] = 0
 
-        # discharge storage
-        for es in env.storage:
-            storage_power[es.name] = es.p_n
-            storage_capacity[es.name] = (es.df.at[clock, 'Q [Wh]'] - es.soc_min * es.c) * t_step/ 60
+    def storage_levels(self, clock: dt.datetime, previous: bool = False):
+        """
+        :param clock: dt.datetime
+            time stamp
+        :param previous: bool
+            levels at the end of the previous time step (before charging)
+        :return: np.ndarray
+            energy storage levels [Wh]
+        """
+        if previous:
+            clock = clock - self.env.t_step
 
-        #power_sum = sum(storage_power.values())
-        #capacity_sum = sum(storage_capacity.values())
-        if p_res == 0:
-            return
-    # If residual load remains after storage discharge, use FuelCell
-        if p_res >0:
-            #if es.df.at[clock , 'SOC'] > es.soc_min:
-                # Discharge storage
-            for es in env.storage:
-                power = self.df.at[clock, 'P_Res [W]']
-                discharge_power = es.discharge(clock=clock, power=power)
-                self.df.at[clock, f'{es.name} [W]'] += discharge_power
-                #self.df.at[clock, 'P_Res [W]'] += discharge_power
-                p_res += discharge_power
-        # Wenn nach Speicherentladung noch Restlast besteht, FuelCell nutzen
-        if p_res > 0:
-            for fc in env.fuel_cell:
-                for hstr in env.H2Storage:
-                    fc_power = self.re_fc_operate(clock=clock,
-                                                power=p_res,
-                                                hstr=hstr,
-                                                fc=fc)
-                    self.df.at[clock, f'{fc.name} [W]'] = fc_power
-                    p_res -= fc_power
-        else:
-            for fc in env.fuel_cell:
-                self.df.at[clock, f'{fc.name} [W]'] = 0
+        return np.array([es.df.at[clock, 'Q [Wh]'] for es in self.env.storage], dtype=float)
 
-        self.df.at[clock, 'P_Res [W]'] = p_res
+    def fleet_charge(self,
+                     clock: dt.datetime,
+                     pv_power: float,
+                     wt_power: float):
+        """
+        Charge energy storage fleet from RE surplus (PV first), the charging power is split between the
+        storages by the fleet allocation policy
+        :param clock: dt.datetime
+            time stamp
+        :param pv_power: float
+            PV surplus [W]
+        :param wt_power: float
+            wind surplus [W]
+        :return: tuple
+            remaining PV surplus [W], remaining wind surplus [W]
+        """
+        if len(self.env.storage) == 0:
+            return pv_power, wt_power
+        if clock == self.df.index[0]:
+            shares = np.zeros(len(self.env.storage))
+        else:
+            shares = self.fleet.charge(q=self.storage_levels(clock, previous=True), power=pv_power + wt_power)
+        for es, share in zip(self.env.storage, shares):
+            pv_share = min(pv_power, share)
+            wt_share = max(share - pv_share, 0.0)
+            pv_left, wt_left = self.re_charge(clock, es, pv_power=pv_share, wt_power=wt_share)
+            pv_power -= pv_share - pv_left
+            wt_power -= wt_share - wt_left
 
-        # Sicherheitsprüfung gegen negative Werte
-        if self.df.at[clock, 'P_Res [W]'] < 0:
-            self.df.at[clock, 'P_Res [W]'] = 0
+        return pv_power, wt_power
 
+    def fleet_discharge(self,
+                        clock: dt.datetime):
+        """
+        Cover residual load from the energy storage fleet, the discharging power is split between the
+        storages by the fleet allocation policy
+        :param clock: dt.datetime
+            time stamp
+        :return: None
+        """
+        p_res = self.df.at[clock, 'P_Res [W]']
+        if len(self.env.storage) == 0 or p_res <= 0:
+            return
+        shares = self.fleet.discharge(q=self.storage_levels(clock), power=p_res)
+        for es, share in zip(self.env.storage, shares):
+            if share <= 0:
+                continue
+            discharge_power = float(es.discharge(clock=clock, power=share))
+            self.df.at[clock, f'{es.name} [W]'] += discharge_power
+            self.df.at[clock, 'P_Res [W]'] += discharge_power
 
     def feed_in(self,
                 component: PV or WindTurbine):
         """
         Calculate RE feed-in power and revenues
+        Feed-in above the export cap of the grid tariff is curtailed (all RE components pro rata).
         :param component: PV/WindTurbine
         :return: None
         """
         if self.env.grid_connection is False:
             pass
         else:
-            self.df[f'{component.name} Feed in [W]'] = self.df[f'{component.name} remain [W]']
-            if isinstance(component, PV):
-                self.df[f'{component.name} Feed in [{self.env.currency}]'] \
-                    = self.df[
-                          f'{component.name} Feed in [W]'] * self.env.i_step / 60 / 1000 * self.env.pv_feed_in_tariff
-            elif isinstance(component, WindTurbine):
-                self.df[f'{component.name} Feed in [{self.env.currency}]'] \
-                    = self.df[
-                          f'{component.name} Feed in [W]'] * self.env.i_step / 60 / 1000 * self.env.wt_feed_in_tariff
+            tariff = self.env.grid_tariff()
+            remain = sum(self.df[f'{re.name} remain [W]'].to_numpy(dtype=float) for re in self.env.re_supply)
+            self.df[f'{component.name} Feed in [W]'] \
+                = self.df[f'{component.name} remain [W]'].to_numpy(dtype=float) * tariff.export_share(remain)
+            source = 'PV' if isinstance(component, PV) else 'WT'
+            self.df[f'{component.name} Feed in [{self.env.currency}]'] \
+                = self.df[f'{component.name} Feed in [W]'] * self.env.i_step / 60 / 1000 * tariff.export_rate(source)
+
+    def grid_flows(self):
+        """
+        Grid import and export of the dispatch (e.g. for tariff studies with components.grid.Tariff.compare)
+        :return: tuple
+            grid import [W], export power [W] by source {'PV': np.ndarray, 'WT': np.ndarray}
+        """
+        env = self.env
+        n = len(self.df.index)
+        if env.grid is None or f'{env.grid.name} [W]' not in self.df.columns:
+            grid_import = np.zeros(n)
+        else:
+            grid_import = np.nan_to_num(self.df[f'{env.grid.name} [W]'].to_numpy(dtype=float))
+        grid_export = {}
+        if env.grid_connection and env.feed_in:
+            for re in env.re_supply:
+                source = 'PV' if isinstance(re, PV) else 'WT'
+                remain = np.nan_to_num(self.df[f'{re.name} remain [W]'].to_numpy(dtype=float))
+                grid_export[source] = grid_export.get(source, np.zeros(n)) + remain
+
+        return grid_import, grid_export
 
     def re_self_supply(self,
                        clock: dt.datetime,
@@ -416,45 +597,35 @@ class Operator:
             es.df.at[clock, 'SOC'] = es.soc
             es.df.at[clock, 'Q [Wh]'] = es.soc * es.c
 
-        t_step = self.env.i_step
-        max_power = es.p_n
-
-    # === Step 1: Try charging from PV ===
-        power_pv_input = min(pv_power, max_power)
-        power_used_pv = es.charge(clock=clock, power=power_pv_input)
-
+        # Storage is charged once with the total surplus (a second Storage.charge call would overwrite
+        # the time step), the charging power is attributed to PV first
+        power_used = float(es.charge(clock=clock, power=min(pv_power + wt_power, es.p_n)))
+        power_used_pv = min(pv_power, power_used)
+        power_used_wt = max(power_used - power_used_pv, 0.0)
         pv_power -= power_used_pv
-        remaining_power = max_power - power_used_pv
-
-    # === Step 2: If storage can still accept, feed wind ===
-        power_used_wt = 0
-        if remaining_power > 0 and wt_power > 0:
-            power_wt_input = min(wt_power, remaining_power)
-            power_used_wt = es.charge(clock=clock, power=power_wt_input)
-            wt_power -= power_used_wt
+        wt_power -= power_used_wt
 
         # === Tracking in DataFrame ===
-        self.df.at[clock, 'PV_to_storage [W]'] = power_used_pv
-        self.df.at[clock, 'WT_to_storage[W]'] = power_used_wt
+        self.df.at[clock, 'PV_to_storage [W]'] += power_used_pv
+        self.df.at[clock, 'WT_to_storage[W]'] += power_used_wt
         self.df.at[clock, f'{es.name} [W]'] = power_used_pv + power_used_wt
         self.df.at[clock, f'{es.name} soc'] = es.df.at[clock, 'SOC']
 
         return pv_power, wt_power
 
 
-    def grid_profile(self,
-                     clock: dt.datetime):
+    def grid_supply(self,
+                    grid_available: np.ndarray):
         """
-        Cover load from power grid
-        :param clock: dt.datetime
-            time stamp
+        Cover residual load from power grid in all time steps with grid available
+        :param grid_available: np.ndarray
+            grid available in time step
         :return: None
         """
-        df = self.df
-        print("Calling grid profile")
-        grid = self.env.grid.name
-        df.at[clock, f'{grid} [W]'] = self.df.at[clock, 'P_Res [W]']
-        df.at[clock, 'P_Res [W]'] = 0
+        grid = f'{self.env.grid.name} [W]'
+        p_res = self.df['P_Res [W]'].to_numpy(dtype=float)
+        self.df[grid] = np.where(grid_available, p_res, self.df[grid].to_numpy(dtype=float))
+        self.df['P_Res [W]'] = np.where(grid_available, 0, p_res)
 
     def export_data(self):
         """
@@ -470,126 +641,42 @@ class Operator:
         self.env.wt_weather_data.to_csv(f'{root}/export/wt_weather_data.csv', sep=sep, decimal=decimal)
         self.env.monthly_weather_data.to_csv(f'{root}/export/monthly_weather_data.csv', sep=sep, decimal=decimal)
 
-    def electrolyser_operate(self, clock: dt.datetime,
-                             el: Electrolyser,
-                             pv_power, wt_power):
-
+    def hydrogen_dispatch(self,
+                          pv_surplus: np.ndarray,
+                          wt_surplus: np.ndarray):
         """
-        :param clock:
-        :param el:
-        :param power:
-        :return:
+        Run event-driven hydrogen subsystem on RE surplus and residual load after storage dispatch
+        :param pv_surplus: np.ndarray
+            PV power remaining after storage charging [W]
+        :param wt_surplus: np.ndarray
+            wind power remaining after storage charging [W]
+        :return: None
         """
-        power_needed = el.p_n
-
-        # === 1. Zuerst PV nutzen ===
-        power_from_pv = min(pv_power, power_needed)
-        power_needed -= power_from_pv
-
-        # === 2. Dann Wind nutzen (falls nötig) ===
-        power_from_wt = min(wt_power, power_needed)
-        power_needed -= power_from_wt
-
-        # === 3. Gesamteingangsleistung setzen ===
-        total_power = power_from_pv + power_from_wt
-        el.run(clock=clock, power=total_power)
-
-        # === 4. Tracking im Operator-DataFrame ===
-        self.df.at[clock, 'from_PV_to_electrolyser [W]'] = power_from_pv
-        self.df.at[clock, 'from_WT_to_electrolyser [W]'] = power_from_wt
-        self.df.at[clock, f'{el.name}_Input_Power [W]'] = total_power
-        self.df.at[clock, f'{el.name} [W]'] = el.df_electrolyser.at[clock, 'P[W]']
-        self.df.at[clock, f'{el.name} [%]'] = el.df_electrolyser.at[clock, 'P[%]']
-        self.df.at[clock, f'{el.name}_Hydrogen [kg]'] = el.df_electrolyser.at[clock, 'H2_Production [kg]']
-        self.df.at[clock, f'{el.name} Efficiency [%]']= el.df_electrolyser.at[clock, 'Efficiency'] *100
-
-        return pv_power, wt_power
-
-    def H2_charge(self, clock: dt.datetime, hstr: H2Storage, inflow: float, el= Electrolyser):
-
         env = self.env
-
-        index = env.H2Storage.index(hstr)
-        #self.df.at[clock, f'{hstr.name} level [kg]'] = 0.0
-
-        if clock == self.df.index[0]:
-
-            if index == 0:
-                # Set values for first time step
-                hstr.hstorage_df.at[clock, 'Storage Level [kg]'] = 0.5 * hstr.capacity
-                hstr.hstorage_df.at[clock, 'SOC'] = 0.5    # Der Speicher startet mit der Hälfte der Kapazität
-                #hstr.hstorage_df.at[clock, 'Q [Wh]'] =
-
-        hstr.charge(clock=clock, inflow=inflow, el=el)
-
-        self.df.at[clock, f'{hstr.name} [W]'] = hstr.hstorage_df.at[clock, 'Q[Wh]']
-        self.df.at[clock, f'{hstr.name} SOC[%]'] = hstr.hstorage_df.at[clock, 'SOC']
-        self.df.at[clock, f'{hstr.name} level [kg]'] = hstr.hstorage_df.at[clock,'Storage Level [kg]']
-
-        return
-
-    def re_fc_operate(self,
-                      clock: dt.datetime,
-                      fc:FuelCell,
-                      hstr: H2Storage,
-                      power: float):
-
-        t_step = self.env.i_step/60
-        print(f"Timestep:{t_step}")
-        fc_power = min(power, fc.max_power)
-
-        # [kg] Berechnung der notwendigen Wasserstoffsmenge
-        fc_efficiency = fc.get_efficiency(p_rel=(fc_power / fc.max_power) * 100)
-        print(f"efficiency in re_fc_operate {fc_efficiency}")
-        required_Hydrogen = fc_power / (33.33*1000 * fc_efficiency)
-
-        # verfügbare Wasserstoff abrufen
-        available_h2 = hstr.hstorage_df.at[clock, 'Storage Level [kg]']-(hstr.soc_min*hstr.capacity)
-        #used_Hydrogen = min(required_Hydrogen, available_h2)
-
-        if required_Hydrogen < available_h2:
-            used_Hydrogen=required_Hydrogen
-        else:
-            # ITERATIV berechne reduzierte Leistung passend zu verfügbarem H₂
-            used_Hydrogen = available_h2
-            for _ in range(10):  # max 10 iterations
-                fc_power = (used_Hydrogen * 33.33 * 1000 * fc_efficiency)/t_step
-                p_rel = (fc_power / fc.max_power) * 100
-                eff_new = fc.get_efficiency(p_rel)
-                if abs(fc_efficiency - eff_new) < 1e-4:
-                    break
-                fc_efficiency = eff_new
-            else:
-                print(f"[WARN] FC @ {clock}: Iteration did not converge. η ≈ {fc_efficiency:.4f}")
-        # Calculate actual delivered power and hydrogen consumption
-        # Protect against non-positive hydrogen availability
-        if used_Hydrogen <= 0 or fc_efficiency <= 0:
-            power_generated = 0.0
-            hydrogen_consumed = 0.0
-            fc_power = 0.0
-        else:
-            power_generated, hydrogen_consumed = fc.fc_operate(clock=clock,
-                                                               hydrogen_used=used_Hydrogen,
-                                                               eff=fc_efficiency,
-                                                               power_output=fc_power)
-
-        # Update DataFrame and H2 storage
-        self.df.at[clock, f'{fc.name} [W]'] = power_generated   # Umrechnung in Watt
-        try:
-            self.df.at[clock, 'P_Res [W]'] -= power_generated
-        except Exception:
-            pass
-
-        # Aktualisieren des H2-Speichers nach Nutzung
-        try:
-            hstr.discharge(clock=clock, outflow=hydrogen_consumed)
-            self.df.at[clock, f'{hstr.name} level [kg]'] = hstr.hstorage_df.at[clock, 'Storage Level [kg]']
-            self.df.at[clock, 'H2-SOC [%]'] = hstr.hstorage_df.at[clock, 'SOC [%]']
-        except Exception:
-            # If discharge/update fails, continue without raising to keep simulation progressing
-            pass
-
-        return power_generated
+        if len(env.H2Storage) == 0:
+            return
+        self.h2_system = HydrogenSystem(env=env,
+                                        policy=self.h2_policy)
+        self.h2_system.run(pv_surplus=pv_surplus,
+                           wt_surplus=wt_surplus,
+                           residual=self.df['P_Res [W]'].to_numpy(dtype=float))
+        for col, values in self.h2_system.result_columns().items():
+            self.df[col] = values
+        fc_power = self.h2_system.results['fc_power'].sum(axis=0)
+        self.df['P_Res [W]'] = np.maximum(self.df['P_Res [W]'].to_numpy(dtype=float) - fc_power, 0)
+
+    def diesel_dispatch(self):
+        """
+        Cover remaining residual load from diesel generators (whole time series)
+        :return: None
+        """
+        p_res = self.df['P_Res [W]'].to_numpy(dtype=float)
+        for dg in getattr(self.env, 'diesel_generator', []):
+            supply, power, fuel = dg.dispatch(p_res=p_res)
+            self.df[f'{dg.name} [W]'] = power
+            self.df[f'{dg.name} Fuel [l]'] = fuel
+            p_res = p_res - supply
+        self.df['P_Res [W]'] = p_res
 
     def export_core_data(self):
         export_dir = Path(f'{sys.path[1]}/export')
@@ -620,19 +707,31 @@ class Operator:
         print(f"✅ Core data export completed: {core_file}")
 
 
+    def daily_plot_data(self, start_date: pd.Timestamp, end_date: pd.Timestamp):
+        """
+        Plot columns of the time range
+        :param start_date: pd.Timestamp
+        :param end_date: pd.Timestamp
+        :return: pd.DataFrame
+        """
+        columns = ['Load [W]', 'PV_Production [W]', 'ES_1 [W]', 'Electrolyser_1 [W]', 'H2_Storage level [kg]',
+                   'FuelCell_2 [W]']
+
+        return self.df.loc[start_date:end_date, [col for col in columns if col in self.df.columns]]
+
     def plot_daily_system_behavior(self, day=None):
-        df = self.df.copy()
+        import matplotlib.pyplot as plt
 
         # Falls kein spezifischer Tag angegeben wurde, den ersten Tag verwenden
         if day is None:
-            start_date = df.index.min().normalize()
+            start_date = self.df.index.min().normalize()
         else:
             start_date = pd.to_datetime(day).normalize()
 
         end_date = start_date + pd.Timedelta(days=1)
 
-        # Tagesdaten herausfiltern
-        df_day = df.loc[start_date:end_date]
+        # Tagesdaten herausfiltern (nur Tag und benötigte Spalten, kein Kopieren des gesamten DataFrames)
+        df_day = self.daily_plot_data(start_date=start_date, end_date=end_date)
 
         # Plot erstellen
         plt.figure(figsize=(16, 8))
@@ -658,16 +757,15 @@ class Operator:
 
 
     def plot_daily_system_behavior_interactive(self, day=None):
-
-        df = self.df.copy()
+        import plotly.graph_objects as go
 
         if day is None:
-            start_date = df.index.min().normalize()
+            start_date = self.df.index.min().normalize()
         else:
             start_date = pd.to_datetime(day).normalize()
 
         end_date = start_date + pd.Timedelta(days=1)
-        df_day = df.loc[start_date:end_date]
+        df_day = self.daily_plot_data(start_date=start_date, end_date=end_date)
 
         fig = go.Figure()
 
@@ -696,22 +794,3 @@ class Operator:
         )
 
         fig.show()
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
@@ -0,0 +1,340 @@
+import hashlib
+import numpy as np
+# MiGUEL modules
+from environment import Environment
+from operation import Operator
+from evaluation import Evaluation
+
+
+class SimulationPipeline:
+    """
+    Incremental Environment -> Operator -> Evaluation chain
+    Every stage has a fingerprint of its inputs. Only stages with changed inputs are rerun:
+        re_supply: load and RE production (cached RE self supply of vectorizable strategies)
+        storage: energy storage, grid and blackout parameters (cached storage stage of vectorized-greedy)
+        dispatch: hydrogen parameters, dispatch strategy
+        evaluation: economic and ecological parameters
+    Editing a storage reuses the RE self supply stage, editing the hydrogen subsystem reuses the storage stage,
+    editing only economic parameters skips the dispatch.
+    """
+
+    stages = ('re_supply', 'storage', 'dispatch', 'evaluation')
+    # Component attributes changed during dispatch
+    state_attributes = ('current_level', 'operating_hours', 'q_remain')
+    dispatch_attributes = ('p_n', 'c', 'soc', 'soc_min', 'soc_max', 'n_charge', 'n_discharge', 'p_min',
+                           'capacity', 'max_power', 'fuel_consumption', 'min_runtime')
+    economic_attributes = ('d_rate', 'lifetime', 'electricity_price', 'avg_co2_price', 'co2_grid',
+                           'pv_feed_in_tariff', 'wt_feed_in_tariff', 'currency', 'diesel_price', 'co2_diesel',
+                           'tariff')
+
+    def __init__(self,
+                 env: Environment,
+                 strategy: str = 'vectorized-greedy',
+                 h2_policy: str = 'priority',
+                 progress=None,
+                 cache=None,
+                 export: bool = True):
+        """
+        :param env: environment.Environment
+            system environment
+        :param strategy: str
+            dispatch strategy
+        :param h2_policy: str
+            allocation policy of the hydrogen subsystem
+        :param progress: callable
+            dispatch progress callback (see operation.Operator)
+        :param cache: cache.ResultCache
+            persistent result store, a hit skips dispatch and evaluation
+        :param export: bool
+            Operator and Evaluation export of results to the export directory
+        """
+        self.env = env
+        self.strategy = strategy
+        self.h2_policy = h2_policy
+        self.progress = progress
+        self.cache = cache
+        self.export = export
+        self.operator = None
+        self.evaluation = None
+        self.re_stage = None
+        self.storage_stage = None
+        self.fingerprints = dict.fromkeys(self.stages)
+        self.last_run = []
+        # Initial hydrogen storage levels (changed by dispatch)
+        self.initial_levels = {}
+
+    ''' Fingerprints '''
+
+    @staticmethod
+    def hash_values(*values):
+        """
+        :param values: scalars, tuples and arrays
+        :return: str
+        """
+        sha = hashlib.sha1()
+        for value in values:
+            if isinstance(value, np.ndarray):
+                sha.update(np.ascontiguousarray(value).tobytes())
+            else:
+                sha.update(repr(value).encode())
+
+        return sha.hexdigest()
+
+    def parameters(self, component, dispatch: bool):
+        """
+        Scalar component parameters
+        :param component: component object
+        :param dispatch: bool
+            only parameters relevant for the dispatch
+        :return: tuple
+        """
+        items = []
+        for key, value in sorted(vars(component).items()):
+            if key in self.state_attributes or not isinstance(value, (int, float, str, bool, type(None))):
+                continue
+            if dispatch and key not in self.dispatch_attributes:
+                continue
+            items.append((key, value))
+
+        return type(component).__name__, getattr(component, 'name', None), tuple(items)
+
+    def components(self, env: Environment = None):
+        """
+        :param env: environment.Environment
+            environment (default: pipeline environment)
+        :return: list
+            all system components
+        """
+        env = self.env if env is None else env
+        components = env.re_supply + env.storage + env.electrolyser + env.H2Storage + env.fuel_cell
+        components += getattr(env, 'diesel_generator', [])
+        if env.grid is not None:
+            components.append(env.grid)
+
+        return components
+
+    def storage_policy(self):
+        """
+        :return: tuple
+            storage fleet allocation policy and the cycle lives weighting the aging policy
+        """
+        policy = getattr(self.env, 'storage_policy', 'priority')
+        if policy != 'aging':
+            return policy, None
+
+        return policy, [getattr(es, 'cycle_life', None) for es in self.env.storage]
+
+    def price_signal(self):
+        """
+        :return: str
+            grid tariff of strategies optimizing the grid cost (predictive), None for the other strategies
+        """
+        if self.strategy != 'predictive' or not self.env.grid_connection:
+            return None
+
+        return repr(self.env.grid_tariff())
+
+    def fingerprint(self, stage: str):
+        """
+        Fingerprint of the inputs of a stage (including upstream stages)
+        :param stage: str
+        :return: str
+        """
+        env = self.env
+        if stage == 're_supply':
+            production = [env.df['P_Res [W]'].to_numpy(dtype=float)]
+            production += [re.df['P [W]'].to_numpy(dtype=float) for re in env.re_supply]
+            flexible_loads = [(fl.name, fl.p_n, fl.energy, fl.windows) for fl in getattr(env, 'flexible_loads', [])]
+            return self.hash_values(str(env.t_start), env.i_step, [re.name for re in env.re_supply], flexible_loads,
+                                    *production)
+        blackout = env.df['Blackout'].to_numpy(dtype=bool) if env.grid_connection and env.blackout else None
+        if stage == 'storage':
+            storage = env.storage + ([env.grid] if env.grid is not None else [])
+            return self.hash_values(self.fingerprint('re_supply'),
+                                    self.strategy, env.grid_connection, env.blackout, blackout,
+                                    self.storage_policy(),
+                                    [self.parameters(c, dispatch=True) for c in storage])
+        if stage == 'dispatch':
+            return self.hash_values(self.fingerprint('re_supply'),
+                                    self.strategy, self.h2_policy,
+                                    env.grid_connection, env.blackout, env.feed_in, blackout,
+                                    self.storage_policy(), self.price_signal(),
+                                    [self.parameters(c, dispatch=True) for c in self.components()],
+                                    [self.initial_levels.get(id(hs)) for hs in env.H2Storage])
+        economy = [getattr(env, key, None) for key in self.economic_attributes]
+        return self.hash_values(self.fingerprint('dispatch'), economy,
+                                [self.parameters(c, dispatch=False) for c in self.components()])
+
+    def invalidate(self, stage: str = 're_supply'):
+        """
+        Force rerun from stage
+        :param stage: str
+        :return: None
+        """
+        for name in self.stages[self.stages.index(stage):]:
+            self.fingerprints[name] = None
+
+    def rebind(self, env: Environment):
+        """
+        Attach pipeline to a copy of the environment (e.g. received by a worker process)
+        If the dispatch inputs are unchanged, the dispatched environment is kept and the economic
+        parameters of the copy are transferred to it.
+        :param env: environment.Environment
+        :return: None
+        """
+        current = self.env
+        initial_levels = self.initial_levels
+        self.env = env
+        self.initial_levels = {id(hs): hs.current_level for hs in env.H2Storage}
+        if self.operator is None or self.fingerprint('dispatch') != self.fingerprints['dispatch']:
+            return
+        # Dispatch reused
+        for key in self.economic_attributes:
+            setattr(current, key, getattr(env, key, None))
+        for component, target in zip(self.components(env), self.components(current)):
+            for key, value in self.parameters(component, dispatch=False)[2]:
+                setattr(target, key, value)
+        self.env = current
+        self.initial_levels = initial_levels
+
+    ''' Result cache '''
+
+    def load_cached(self):
+        """
+        Restore Operator and Evaluation from the result cache
+        :return: bool
+            cache hit
+        """
+        if self.cache is None:
+            return False
+        for hs in self.env.H2Storage:
+            self.initial_levels.setdefault(id(hs), hs.current_level)
+        key = self.cache.key(pipeline=self)
+        entry = self.cache.get(key)
+        if entry is None:
+            return False
+        self.reset_component_states()
+        dispatch_key = self.fingerprint('dispatch')
+        evaluation_key = self.fingerprint('evaluation')
+        self.operator, self.evaluation = self.cache.restore(entry=entry,
+                                                            env=self.env,
+                                                            operator_class=Operator,
+                                                            evaluation_class=Evaluation,
+                                                            components=self.components(),
+                                                            h2_policy=self.h2_policy,
+                                                            strategy=self.strategy)
+        # RE self supply and storage stages are not stored
+        self.re_stage = None
+        self.storage_stage = None
+        self.fingerprints['re_supply'] = None
+        self.fingerprints['storage'] = None
+        self.fingerprints['dispatch'] = dispatch_key
+        self.fingerprints['evaluation'] = evaluation_key
+        self.last_run.append('cache')
+
+        return True
+
+    ''' Stages '''
+
+    def reset_component_states(self):
+        """
+        Restore component states changed by a previous dispatch
+        :return: None
+        """
+        for hs in self.env.H2Storage:
+            self.initial_levels.setdefault(id(hs), hs.current_level)
+            hs.current_level = self.initial_levels[id(hs)]
+        for fc in self.env.fuel_cell:
+            fc.operating_hours = 0.0
+        for dg in getattr(self.env, 'diesel_generator', []):
+            dg.operating_hours = 0.0
+
+    def dispatch(self):
+        """
+        Run dispatch if inputs changed
+        :return: operation.Operator
+        """
+        for hs in self.env.H2Storage:
+            self.initial_levels.setdefault(id(hs), hs.current_level)
+        re_key = self.fingerprint('re_supply')
+        storage_key = self.fingerprint('storage')
+        dispatch_key = self.fingerprint('dispatch')
+        if self.operator is not None and dispatch_key == self.fingerprints['dispatch']:
+            return self.operator
+        if self.load_cached():
+            return self.operator
+        if re_key != self.fingerprints['re_supply']:
+            self.re_stage = None
+            self.last_run.append('re_supply')
+        if storage_key != self.fingerprints['storage']:
+            self.storage_stage = None
+            self.last_run.append('storage')
+        self.reset_component_states()
+        self.operator = Operator(env=self.env,
+                                 h2_policy=self.h2_policy,
+                                 strategy=self.strategy,
+                                 re_stage=self.re_stage,
+                                 storage_stage=self.storage_stage,
+                                 progress=self.progress,
+                                 export=self.export)
+        self.re_stage = self.operator.re_stage
+        self.storage_stage = self.operator.storage_stage
+        self.fingerprints['re_supply'] = re_key
+        self.fingerprints['storage'] = storage_key
+        self.fingerprints['dispatch'] = dispatch_key
+        self.fingerprints['evaluation'] = None
+        self.last_run.append('dispatch')
+
+        return self.operator
+
+    def refresh_economics(self):
+        """
+        Update economic values derived from environment parameters without dispatch
+        :return: None
+        """
+        env = self.env
+        for component in self.components():
+            if hasattr(component, 'calc_replacements'):
+                component.replacement_parameters = component.calc_replacements()
+                component.replacement_cost = sum(component.replacement_parameters[0].values())
+                component.replacement_co2 = sum(component.replacement_parameters[1].values())
+        if env.feed_in:
+            for component in env.re_supply:
+                self.operator.feed_in(component=component)
+
+    def evaluate(self):
+        """
+        Run evaluation (and dispatch) if inputs changed
+        :return: evaluation.Evaluation
+        """
+        self.dispatch()
+        key = self.fingerprint('evaluation')
+        if self.evaluation is not None and key == self.fingerprints['evaluation']:
+            return self.evaluation
+        if self.load_cached():
+            return self.evaluation
+        cache_key = self.cache.key(pipeline=self) if self.cache is not None else None
+        self.refresh_economics()
+        self.evaluation = Evaluation(env=self.env,
+                                     operator=self.operator,
+                                     export=self.export)
+        self.fingerprints['evaluation'] = key
+        self.last_run.append('evaluation')
+        if self.cache is not None:
+            self.cache.put(key=cache_key,
+                           operator=self.operator,
+                           evaluation=self.evaluation,
+                           components=self.components())
+
+        return self.evaluation
+
+    def run(self):
+        """
+        Run all outdated stages
+        :return: tuple
+            operation.Operator, evaluation.Evaluation
+        """
+        self.last_run = []
+        evaluation = self.evaluate()
+
+        return self.operator, evaluation
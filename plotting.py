@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+
+def minmax_envelope(y: np.ndarray, n_bins: int):
+    """
+    Decimate values to the minimum and maximum of n_bins consecutive bins (peaks are kept)
+    :param y: np.ndarray
+        values
+    :param n_bins: int
+        number of bins (e.g. visible pixel width)
+    :return: np.ndarray
+        positions of the kept values in y (ascending)
+    """
+    n = len(y)
+    if n <= 2 * n_bins:
+        return np.arange(n)
+    size = -(-n // n_bins)
+    n_bins = -(-n // size)
+    padded = np.full(n_bins * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(n_bins, size)
+    valid = ~np.isnan(padded).all(axis=1)
+    offset = np.arange(n_bins)[valid] * size
+    lower = np.nanargmin(padded[valid], axis=1) + offset
+    upper = np.nanargmax(padded[valid], axis=1) + offset
+
+    return np.unique(np.concatenate([lower, upper]))
+
+
+class DecimatedLine:
+    """
+    Line of a time series on a matplotlib Axes showing a min/max envelope of the visible range
+    Only about two points per pixel of the Axes width are drawn. The envelope is rebuilt if the x limits change
+    (zoom / pan with the NavigationToolbar). The data is not copied: x positions are the int64 view of the
+    DatetimeIndex, values the array of the Series.
+    """
+
+    def __init__(self,
+                 ax,
+                 series: pd.Series,
+                 **kwargs):
+        """
+        :param ax: matplotlib.axes.Axes
+        :param series: pd.Series
+            time series (DatetimeIndex or numeric index)
+        :param kwargs:
+            matplotlib.lines.Line2D parameters (label, color, ...)
+        """
+        self.ax = ax
+        index = series.index
+        self.dates = isinstance(index, pd.DatetimeIndex)
+        if self.dates and index.tz is not None:
+            # Local time on the axis
+            index = index.tz_localize(None)
+        # Time stamps as int64 [ns]
+        self.x = index.as_unit('ns').asi8 if self.dates else np.asarray(index, dtype=float)
+        self.y = series.to_numpy(dtype=float)
+        self.line, = ax.plot(self.to_axis(self.x[:0]), self.y[:0], **kwargs)
+        if len(self.x) > 0:
+            self.update(view=slice(0, len(self.x)))
+            ax.set_xlim(self.to_axis(self.x[[0, -1]]))
+            ax.relim()
+            ax.autoscale_view(scalex=False)
+        self.callback = ax.callbacks.connect('xlim_changed', lambda ax: self.update())
+
+    def to_axis(self, x: np.ndarray):
+        """
+        :param x: np.ndarray
+            positions
+        :return: np.ndarray
+            x values of the Axes
+        """
+        if not self.dates:
+            return x
+
+        return x.astype('datetime64[ns]')
+
+    def from_axis(self, value: float):
+        """
+        :param value: float
+            matplotlib x value
+        :return: int/float
+            position
+        """
+        if not self.dates:
+            return value
+        import matplotlib.dates as mdates
+
+        return pd.Timestamp(mdates.num2date(value)).tz_localize(None).value
+
+    def visible(self):
+        """
+        :return: slice
+            positions in the x limits of the Axes (including one neighbour on each side)
+        """
+        low, high = self.ax.get_xlim()
+        start = np.searchsorted(self.x, self.from_axis(low), side='left')
+        stop = np.searchsorted(self.x, self.from_axis(high), side='right')
+
+        return slice(max(start - 1, 0), min(stop + 1, len(self.x)))
+
+    def update(self, view: slice = None):
+        """
+        Rebuild envelope of the visible range
+        :param view: slice
+            positions to show, defaults to the x limits of the Axes
+        :return: None
+        """
+        if len(self.x) == 0:
+            return
+        view = self.visible() if view is None else view
+        x = self.x[view]
+        y = self.y[view]
+        width = max(int(self.ax.bbox.width), 1)
+        keep = minmax_envelope(y, n_bins=width)
+        self.line.set_data(self.to_axis(x[keep]), y[keep])
+        self.ax.figure.canvas.draw_idle()
+
+    def remove(self):
+        """
+        :return: None
+        """
+        self.ax.callbacks.disconnect(self.callback)
+        self.line.remove()
+
+
+def plot_decimated(ax, data, labels: dict = None, **kwargs):
+    """
+    Plot Series or DataFrame columns as DecimatedLines
+    :param ax: matplotlib.axes.Axes
+    :param data: pd.Series/pd.DataFrame
+    :param labels: dict
+        column: legend label
+    :param kwargs:
+        matplotlib.lines.Line2D parameters
+    :return: list
+        DecimatedLine objects (keep a reference for zoom updates)
+    """
+    if isinstance(data, pd.Series):
+        data = {data.name: data}
+    labels = {} if labels is None else labels
+
+    return [DecimatedLine(ax=ax, series=data[col], label=labels.get(col, col), **kwargs) for col in data.keys()]
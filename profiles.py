@@ -0,0 +1,157 @@
+import os
+import re
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# Binary copies of imported profiles (outside of the source tree, MIGUEL_PROFILE_CACHE sets the directory)
+PROFILE_CACHE = os.environ.get('MIGUEL_PROFILE_CACHE', os.path.join(tempfile.gettempdir(), 'miguel', 'profiles'))
+# Default for inferred time stamp formats of all profile imports (load, PV, wind): plain inference
+DAYFIRST = False
+# ISO 8601 time stamps (year first) are never parsed day first
+ISO_DATE = re.compile(r'^\s*\d{4}-\d{1,2}-\d{1,2}')
+
+
+def read_csv(path: str, sep: str = ',', decimal: str = '.', time_format: str = None):
+    """
+    Read csv file with time stamps in the first column
+    The multithreaded pyarrow reader is used if installed (time stamps with time_format are parsed while
+    reading), otherwise the pandas C parser.
+    :param path: str
+    :param sep: str
+    :param decimal: str
+    :param time_format: str
+        strftime format of the time stamps
+    :return: pd.DataFrame
+        time stamps (str or datetime) as index
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import csv
+    except ImportError:
+        return pd.read_csv(path, sep=sep, decimal=decimal, index_col=0, header=0, dtype={0: str})
+    with open(path, 'r', encoding='utf-8-sig') as file:
+        time_column = file.readline().rstrip('\r\n').split(sep)[0].strip('"')
+    if time_format is not None:
+        convert_options = csv.ConvertOptions(decimal_point=decimal,
+                                             column_types={time_column: pa.timestamp('ns')},
+                                             timestamp_parsers=[time_format])
+    else:
+        convert_options = csv.ConvertOptions(decimal_point=decimal,
+                                             column_types={time_column: pa.string()})
+    table = csv.read_csv(path,
+                         parse_options=csv.ParseOptions(delimiter=sep),
+                         convert_options=convert_options)
+    df = table.to_pandas()
+
+    return df.set_index(df.columns[0])
+
+
+def parse_time(values, time_format: str = None, dayfirst: bool = DAYFIRST):
+    """
+    :param values: pd.Index
+        time stamps (str)
+    :param time_format: str
+        strftime format (e.g. '%d.%m.%Y %H:%M'), None infers the format from the first time stamp
+    :param dayfirst: bool
+        day first in inferred format (ignored for ISO time stamps)
+    :return: pd.DatetimeIndex
+    """
+    if isinstance(values, pd.DatetimeIndex):
+        return values
+    if time_format is not None:
+        return pd.DatetimeIndex(pd.to_datetime(values, format=time_format))
+    if dayfirst and len(values) > 0 and ISO_DATE.match(str(values[0])):
+        dayfirst = False
+
+    return pd.DatetimeIndex(pd.to_datetime(values, dayfirst=dayfirst))
+
+
+def check_time_steps(index: pd.DatetimeIndex, step: pd.Timedelta = None):
+    """
+    Validate time stamps in one pass: ascending, no duplicates, constant time step
+    :param index: pd.DatetimeIndex
+    :param step: pd.Timedelta
+        expected time step, defaults to the first time step of the index
+    :return: pd.Timedelta
+        time step
+    """
+    if len(index) < 2:
+        return step
+    diff = np.diff(index.as_unit('ns').asi8)
+    step_ns = diff[0] if step is None else pd.Timedelta(step).value
+    invalid = np.flatnonzero(diff != step_ns)
+    if len(invalid) > 0:
+        position = invalid[0]
+        kind = 'not ascending or duplicate' if diff[position] <= 0 else 'irregular'
+        raise ValueError(f'Profile time step {kind} at {index[position + 1]} '
+                         f'({len(invalid)} deviations from {pd.Timedelta(step_ns, unit="ns")}).')
+
+    return pd.Timedelta(step_ns, unit='ns')
+
+
+def cache_file(path: str, cache_dir: str = None, **options):
+    """
+    Binary cache file of a profile (changes of the csv file or the import options create a new file)
+    :param path: str
+    :param cache_dir: str
+        cache directory, defaults to PROFILE_CACHE
+    :param options:
+        import options
+    :return: str
+    """
+    stat = os.stat(path)
+    key = repr((os.path.abspath(path), stat.st_size, stat.st_mtime_ns, sorted(options.items())))
+
+    return os.path.join(cache_dir or PROFILE_CACHE, f'{hashlib.sha1(key.encode()).hexdigest()}.pkl')
+
+
+def read_profile(path: str,
+                 sep: str = ',',
+                 decimal: str = '.',
+                 time_format: str = None,
+                 dayfirst: bool = DAYFIRST,
+                 step: pd.Timedelta = None,
+                 cache: bool = True,
+                 cache_dir: str = None):
+    """
+    Import time series profile (load, PV or wind power) from csv
+    The first column contains the time stamps, the first row the column names. The imported profile is stored
+    in a binary copy, later imports of the unchanged file read the copy.
+    :param path: str
+        csv file
+    :param sep: str
+    :param decimal: str
+    :param time_format: str
+        strftime format of the time stamps (fast parsing of large files)
+    :param dayfirst: bool
+        day first if the format is inferred
+    :param step: pd.Timedelta
+        expected time step
+    :param cache: bool
+        use binary copy
+    :param cache_dir: str
+        directory of the binary copies, defaults to PROFILE_CACHE
+    :return: pd.DataFrame
+        profile with DatetimeIndex
+    """
+    file = None
+    if cache:
+        file = cache_file(path, cache_dir=cache_dir, sep=sep, decimal=decimal, time_format=time_format,
+                          dayfirst=dayfirst)
+    if file is not None and os.path.isfile(file):
+        df = pd.read_pickle(file)
+        check_time_steps(index=df.index, step=step)
+        return df
+    df = read_csv(path=path, sep=sep, decimal=decimal, time_format=time_format)
+    df.index = parse_time(values=df.index, time_format=time_format, dayfirst=dayfirst)
+    check_time_steps(index=df.index, step=step)
+    if file is not None:
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        tmp = f'{file}.{os.getpid()}.tmp'
+        df.to_pickle(tmp)
+        os.replace(tmp, file)
+
+    return df
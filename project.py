@@ -0,0 +1,132 @@
+import io
+import json
+import pickle
+import zipfile
+import datetime as dt
+# MiGUEL modules
+from operation import Operator
+from evaluation import Evaluation
+from cache import ResultCache, code_version
+
+
+class Project:
+    """
+    MiGUEL project file (.miguel)
+    Compressed archive of a complete system:
+        project.json: format version, code version and system overview (readable without loading the project)
+        environment.pkl: Environment with weather data, load profile, components and their yields and
+                         dispatched states
+        results.pkl: Operator results and Evaluation of the last dispatch (optional)
+    Loading a project restores Environment, Operator and Evaluation without weather requests, yield
+    calculation or dispatch.
+    """
+
+    format = 'miguel-project'
+    version = 1
+    suffix = '.miguel'
+
+    def __init__(self,
+                 env,
+                 operator: Operator = None,
+                 evaluation: Evaluation = None):
+        """
+        :param env: environment.Environment
+            system environment
+        :param operator: operation.Operator
+            dispatch results, the dispatched environment of the operator is stored
+        :param evaluation: evaluation.Evaluation
+            evaluation of the dispatch results
+        """
+        self.env = operator.env if operator is not None else env
+        self.operator = operator
+        self.evaluation = evaluation
+        self.info = None
+
+    ''' Archive '''
+
+    def overview(self):
+        """
+        :return: dict
+            project metadata and system overview
+        """
+        env = self.env
+        components = env.re_supply + env.storage + env.electrolyser + env.H2Storage + env.fuel_cell
+        components += getattr(env, 'diesel_generator', [])
+        if env.grid is not None:
+            components.append(env.grid)
+
+        return {'format': self.format,
+                'version': self.version,
+                'code_version': code_version(),
+                'created': dt.datetime.now().isoformat(timespec='seconds'),
+                'name': env.name,
+                'location': {'latitude': env.latitude, 'longitude': env.longitude},
+                'time': {'start': str(env.t_start), 'end': str(env.t_end), 'step': str(env.t_step)},
+                'components': [{'type': type(c).__name__, 'name': getattr(c, 'name', None)} for c in components],
+                'results': self.operator is not None,
+                'strategy': getattr(getattr(self.operator, 'strategy', None), 'name', None),
+                'h2_policy': getattr(self.operator, 'h2_policy', None)}
+
+    def save(self, path: str):
+        """
+        Write project file
+        :param path: str
+            file path (.miguel)
+        :return: str
+            file path
+        """
+        if not path.endswith(self.suffix):
+            path += self.suffix
+        self.info = self.overview()
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('project.json', json.dumps(self.info, indent=2, default=str))
+            archive.writestr('environment.pkl', pickle.dumps(self.env, protocol=pickle.HIGHEST_PROTOCOL))
+            if self.operator is not None:
+                entry = ResultCache.result_entry(operator=self.operator, evaluation=self.evaluation)
+                archive.writestr('results.pkl', pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+
+        return path
+
+    @classmethod
+    def read_info(cls, path: str):
+        """
+        :param path: str
+            file path (.miguel)
+        :return: dict
+            project metadata and system overview
+        """
+        with zipfile.ZipFile(path, 'r') as archive:
+            info = json.loads(archive.read('project.json'))
+        if info.get('format') != cls.format:
+            raise ValueError(f'{path} is not a MiGUEL project file.')
+        if info.get('version', 0) > cls.version:
+            raise ValueError(f'Project file version {info["version"]} is not supported (version {cls.version}).')
+
+        return info
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Read project file
+        :param path: str
+            file path (.miguel)
+        :return: Project
+        """
+        info = cls.read_info(path)
+        if info['code_version'] != code_version():
+            print(f'Project {info["name"]} was saved with another MiGUEL version.')
+        with zipfile.ZipFile(path, 'r') as archive:
+            env = pickle.load(io.BytesIO(archive.read('environment.pkl')))
+            operator, evaluation = None, None
+            if 'results.pkl' in archive.namelist():
+                entry = pickle.load(io.BytesIO(archive.read('results.pkl')))
+                operator, evaluation = ResultCache.restore_results(entry=entry,
+                                                                   env=env,
+                                                                   operator_class=Operator,
+                                                                   evaluation_class=Evaluation,
+                                                                   h2_policy=info['h2_policy'],
+                                                                   strategy=info['strategy'])
+        project = cls(env=env, operator=operator, evaluation=evaluation)
+        project.info = info
+
+        return project
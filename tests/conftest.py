@@ -0,0 +1,106 @@
+import os
+import sys
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from environment import Environment
+from components.windturbine import WindTurbine
+from components.storage import Storage
+from components.electrolyser import Electrolyser
+from components.H2_Storage import H2Storage
+from components.fuel_cell import FuelCell
+from components.grid import Grid
+
+
+class Production(WindTurbine):
+    """
+    RE component with a given production profile (no weather data or turbine library)
+    """
+
+    def __init__(self, env, name: str, power: np.ndarray):
+        self.env = env
+        self.name = name
+        self.p_n = float(np.max(power))
+        self.df = pd.DataFrame({'P [W]': power}, index=env.time)
+        self.c_invest = 0.0
+        self.c_op_main = 0.0
+        self.c_var_n = 0.0
+        self.co2_init = 0.0
+
+
+def build_environment(days: int = 7,
+                      step: int = 60,
+                      grid: bool = False,
+                      h2: bool = True,
+                      storage: int = 1,
+                      storage_policy: str = 'priority'):
+    """
+    Offline environment with a daily RE profile, an evening load peak, energy storages and an optional
+    hydrogen chain (Environment.__init__ requests weather data and needs the component data files)
+    :param days: int
+    :param step: int
+        time step [min]
+    :param grid: bool
+        stable grid connection
+    :param h2: bool
+        electrolyser, hydrogen storage and fuel cell
+    :param storage: int
+        number of energy storages
+    :param storage_policy: str
+    :return: environment.Environment
+    """
+    env = Environment.__new__(Environment)
+    n = int(days * 24 * 60 / step)
+    env.name = 'test'
+    env.t_step = dt.timedelta(minutes=step)
+    env.i_step = step
+    env.t_start = dt.datetime(2023, 1, 1)
+    env.time_series = pd.date_range(env.t_start, periods=n, freq=env.t_step)
+    env.time = pd.Series(env.time_series)
+    env.t_end = env.time_series[-1]
+    env.timezone = None
+    env.latitude, env.longitude, env.altitude = 5.0, 0.0, 0
+    env.lifetime, env.d_rate, env.currency = 20, 0.03, 'US$'
+    env.electricity_price, env.avg_co2_price, env.diesel_price = 0.2, 0, 1.2
+    env.pv_feed_in_tariff, env.wt_feed_in_tariff = 0.0, 0.0
+    env.co2_grid, env.co2_diesel = 0.5, 0.2665
+    env.csv_sep, env.csv_decimal = ',', '.'
+    env.tariff = None
+    env.feed_in = False
+    env.storage_policy = storage_policy
+    env.fuel_cell, env.H2Storage, env.electrolyser = [], [], []
+    env.load, env.loads, env.flexible_loads = None, [], []
+    env.pv, env.wind_turbine, env.diesel_generator, env.storage = [], [], [], []
+    hour = np.arange(n) * step / 60 % 24
+    production = np.clip(np.sin((hour - 6) / 12 * np.pi), 0, None) * 60000
+    load = np.full(n, 10000.0) + 5000 * (hour > 17)
+    env.df = pd.DataFrame({'P_Res [W]': load, 'PV total power [W]': 0.0}, index=env.time)
+    env.re_supply = [Production(env, name='WT_1', power=production)]
+    env.wind_turbine = list(env.re_supply)
+    env.supply_components = list(env.re_supply)
+    env.grid_connection = grid
+    env.blackout = False
+    env.grid = Grid(env, name='Grid_1') if grid else None
+    for j in range(storage):
+        es = Storage(env, name=f'ES_{j + 1}', p_n=20000 / (j + 1), c=60000 / (j + 1), soc=0.25)
+        es.df['P [W]'] = 0.0
+        env.storage.append(es)
+    if h2:
+        env.electrolyser = [Electrolyser(env, name='Electrolyser_1', p_n=20000, life_time=20)]
+        env.H2Storage = [H2Storage(env, capacity=50, initial_level=0.1, name='H2_Storage_1')]
+        env.fuel_cell = [FuelCell(env, max_power=15000)]
+    env.weather_data = [pd.DataFrame()]
+    env.wt_weather_data = pd.DataFrame()
+    env.monthly_weather_data = pd.DataFrame()
+
+    return env
+
+
+@pytest.fixture
+def make_env():
+    return build_environment
@@ -0,0 +1,85 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operation import Operator
+from dispatch.checkpoint import DispatchCheckpoint
+
+
+class Interrupt(Exception):
+    pass
+
+
+def interrupt_at(fraction):
+    def progress(value):
+        if value >= fraction:
+            raise Interrupt
+    return progress
+
+
+def storage_results(env):
+    return [es.df[list(DispatchCheckpoint.storage_columns)] for es in env.storage]
+
+
+@pytest.fixture
+def reference(make_env):
+    env = make_env(days=7, storage=2)
+    operator = Operator(env, strategy='greedy-current', export=False)
+
+    return operator.df, storage_results(env)
+
+
+def test_resume(make_env, reference, tmp_path):
+    path = str(tmp_path / 'dispatch.npz')
+    env = make_env(days=7, storage=2)
+    # 168 time steps, interrupted after time step 100 (last checkpoint: time step 99)
+    with pytest.raises(Interrupt):
+        Operator(env, strategy='greedy-current', checkpoint=path, checkpoint_interval=25,
+                 progress=interrupt_at(101 / 168), export=False)
+    checkpoint = DispatchCheckpoint.load(path)
+    assert checkpoint.cursor == 99
+    assert len(checkpoint.segments) == 4
+    assert checkpoint.storage == ['ES_1', 'ES_2']
+
+    env = make_env(days=7, storage=2)
+    operator = Operator(env, strategy='greedy-current', checkpoint=path, checkpoint_interval=25, resume=path,
+                        export=False)
+    df, storage = reference
+    pd.testing.assert_frame_equal(operator.df, df, check_dtype=False)
+    for result, expected in zip(storage_results(env), storage):
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    # Continued checkpoint keeps the segments of the resumed checkpoint
+    assert DispatchCheckpoint.load(path).cursor == 149
+    assert DispatchCheckpoint.load(path).segments[:4] == checkpoint.segments
+
+
+def test_resume_complete(make_env, reference, tmp_path):
+    path = str(tmp_path / 'dispatch.npz')
+    Operator(make_env(days=7, storage=2), strategy='greedy-current', checkpoint=path, checkpoint_interval=24,
+             export=False)
+    # Nothing left to dispatch but the hydrogen subsystem and grid supply
+    env = make_env(days=7, storage=2)
+    operator = Operator(env, strategy='greedy-current', resume=path, export=False)
+    pd.testing.assert_frame_equal(operator.df, reference[0], check_dtype=False)
+
+
+def test_resume_mismatch(make_env, tmp_path):
+    path = str(tmp_path / 'dispatch.npz')
+    Operator(make_env(days=2, storage=2), strategy='greedy-current', checkpoint=path, checkpoint_interval=24,
+             export=False)
+    with pytest.raises(ValueError):
+        Operator(make_env(days=2, storage=3), strategy='greedy-current', resume=path, export=False)
+    env = make_env(days=2, storage=2, step=30)
+    with pytest.raises(ValueError):
+        Operator(env, strategy='greedy-current', resume=path, export=False)
+
+
+def test_strategy_without_checkpoints(make_env, tmp_path):
+    with pytest.raises(ValueError):
+        Operator(make_env(days=2), strategy='vectorized-greedy', checkpoint=str(tmp_path / 'dispatch.npz'),
+                 export=False)
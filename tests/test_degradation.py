@@ -0,0 +1,62 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components.degradation import count_cycles, turning_points
+
+
+def reference_rainflow(values):
+    """
+    ASTM E1049 three point rainflow count of the whole series (reference)
+    :param values: list
+    :return: dict
+        range: count
+    """
+    counts = {}
+    stack = []
+    for point in turning_points(np.asarray(values, dtype=float)).tolist():
+        stack.append(point)
+        while len(stack) >= 3:
+            x = abs(stack[-1] - stack[-2])
+            y = abs(stack[-2] - stack[-3])
+            if x < y:
+                break
+            if len(stack) == 3:
+                counts[round(y, 9)] = counts.get(round(y, 9), 0) + 0.5
+                del stack[0]
+            else:
+                counts[round(y, 9)] = counts.get(round(y, 9), 0) + 1
+                del stack[-3:-1]
+    for a, b in zip(stack[:-1], stack[1:]):
+        counts[round(abs(b - a), 9)] = counts.get(round(abs(b - a), 9), 0) + 0.5
+
+    return counts
+
+
+def as_dict(ranges, counts):
+    result = {}
+    for r, c in zip(ranges.tolist(), counts.tolist()):
+        result[round(r, 9)] = result.get(round(r, 9), 0) + c
+
+    return result
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 1000])
+def test_last_point_passes_stack(chunk_size):
+    assert as_dict(*count_cycles(np.array([3, 1, 2, 0]), chunk_size=chunk_size)) == {1: 1, 3: 0.5}
+    series = np.array([0.9, 0.5, 0.6, 0.4, 0.7, 0.3, 0.8, 0.1])
+    result = as_dict(*count_cycles(series, chunk_size=chunk_size))
+    assert result == reference_rainflow(series)
+    assert result[0.8] == 0.5
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 50, 100000])
+def test_matches_reference(chunk_size):
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        series = np.round(rng.random(int(rng.integers(1, 300))), 3)
+        assert as_dict(*count_cycles(series, chunk_size=chunk_size)) == reference_rainflow(series)
@@ -0,0 +1,40 @@
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components.dieselgenerator import DieselGenerator
+
+
+def generator(min_runtime):
+    dg = DieselGenerator.__new__(DieselGenerator)
+    dg.env = types.SimpleNamespace(i_step=60)
+    dg.min_runtime = min_runtime
+
+    return dg
+
+
+def test_min_runtime():
+    dg = generator(min_runtime=3)
+    running = np.array([[False, True, False, False, False, True, True, True, True, False]])
+    expected = np.array([[False, True, True, True, False, True, True, True, True, False]])
+    assert (dg.min_runtime_steps(running) == expected).all()
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 5, 13])
+def test_runtime_carried_across_chunks(chunk_size):
+    dg = generator(min_runtime=4)
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        running = np.atleast_2d(rng.random(int(rng.integers(1, 80))) < 0.15)
+        carry = None
+        chunks = []
+        for start in range(0, running.shape[1], chunk_size):
+            chunk = running[:, start:start + chunk_size]
+            chunks.append(dg.min_runtime_steps(chunk, carry=carry))
+            carry = dg.runtime_carry(chunk, carry=carry)
+        assert (np.concatenate(chunks, axis=1) == dg.min_runtime_steps(running)).all()
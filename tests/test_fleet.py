@@ -0,0 +1,80 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dispatch.fleet import StorageFleet
+
+
+def unit(p_n, c, cycle_life=5000):
+    """
+    Loss free energy storage with the parameters read by StorageFleet
+    """
+    return SimpleNamespace(p_n=p_n, c=c, soc_min=0.0, soc_max=1.0, n_charge=1.0, n_discharge=1.0,
+                           cycle_life=cycle_life)
+
+
+def fleet(policy):
+    # Unit 1: 10 kW / 20 kWh (5000 cycles), unit 2: 10 kW / 10 kWh (20000 cycles)
+    return StorageFleet(storage=[unit(10000, 20000, 5000), unit(10000, 10000, 20000)], dt=1, policy=policy)
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        fleet('random')
+
+
+def test_envelope():
+    q = np.array([5000.0, 9000.0])
+    p_charge, p_discharge = fleet('priority').envelope(q)
+    assert p_charge == pytest.approx(10000 + 1000)
+    assert p_discharge == pytest.approx(5000 + 9000)
+
+
+def test_priority():
+    q = np.array([15000.0, 0.0])
+    shares = fleet('priority').charge(q, np.array(8000.0))
+    # Unit 1 takes its free capacity (5 kWh), the rest goes to unit 2
+    assert shares == pytest.approx([5000, 3000])
+    assert q == pytest.approx([20000, 3000])
+    shares = fleet('priority').discharge(q, np.array(21000.0))
+    # Request above the envelope is limited to unit 1 power + unit 2 energy
+    assert shares == pytest.approx([10000, 3000])
+    assert q == pytest.approx([10000, 0])
+
+
+def test_pro_rata():
+    q = np.array([10000.0, 0.0])
+    shares = fleet('pro_rata').charge(q, np.array(6000.0))
+    # Free capacity 10 kWh each: equal split, both units end at the same level
+    assert shares == pytest.approx([3000, 3000])
+    q = np.array([16000.0, 4000.0])
+    shares = fleet('pro_rata').discharge(q, np.array(10000.0))
+    # Available energy 16 kWh : 4 kWh
+    assert shares == pytest.approx([8000, 2000])
+    assert q / np.array([20000, 10000]) == pytest.approx([0.4, 0.2])
+
+
+def test_aging():
+    q = np.array([10000.0, 5000.0])
+    shares = fleet('aging').charge(q, np.array(3000.0))
+    # Lifetime throughput 20 kWh x 5000 : 10 kWh x 20000 = 1 : 2
+    assert shares == pytest.approx([1000, 2000])
+    shares = fleet('aging').discharge(np.array([10000.0, 5000.0]), np.array(12000.0))
+    # Unit 2 share (8 kW) is capped by its 5 kWh, the excess is passed on to unit 1
+    assert shares == pytest.approx([7000, 5000])
+
+
+@pytest.mark.parametrize('policy', StorageFleet.policies)
+def test_runs(policy):
+    # Levels of several runs (units x runs) are dispatched like single runs
+    q = np.array([[15000.0, 0.0], [0.0, 8000.0]])
+    power = np.array([8000.0, 4000.0])
+    shares = fleet(policy).charge(q.copy(), power)
+    for r in range(2):
+        assert shares[:, r] == pytest.approx(fleet(policy).charge(q[:, r].copy(), power[r]))
+    assert shares.sum(axis=0) == pytest.approx(np.minimum(power, fleet(policy).envelope(q)[0]))
@@ -0,0 +1,94 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components.grid import BlackoutSchedule, Tariff
+
+# Two days across a billing period boundary (hourly)
+TIME = pd.date_range('2023-01-31 00:00', periods=48, freq='h')
+
+
+def tou_tariff(**kwargs):
+    return Tariff(import_price=0.1,
+                  periods=[{'price': 0.3, 'hours': ('17:00', '21:00')},
+                           {'price': 0.05, 'hours': ('22:00', '06:00')}],
+                  **kwargs)
+
+
+def test_import_prices():
+    prices = tou_tariff().import_prices(TIME)
+    hours = TIME.hour
+    assert np.all(prices[(hours >= 17) & (hours < 21)] == 0.3)
+    # Night period spans midnight
+    assert np.all(prices[(hours >= 22) | (hours < 6)] == 0.05)
+    assert np.all(prices[(hours >= 6) & (hours < 17) | (hours == 21)] == 0.1)
+
+
+def test_period_filters():
+    # Later periods override earlier ones, months and weekdays restrict a period
+    tariff = Tariff(import_price=0.1,
+                    periods=[{'price': 0.2, 'months': [2]},
+                             {'price': 0.4, 'months': [2], 'hours': ('12:00', '13:00'), 'weekdays': [2]}])
+    prices = pd.Series(tariff.import_prices(TIME), index=TIME)
+    assert prices['2023-01-31'].eq(0.1).all()
+    # 2023-02-01 is a Wednesday (weekday 2)
+    assert prices['2023-02-01 12:00'] == 0.4
+    assert prices['2023-02-01'].drop(pd.Timestamp('2023-02-01 12:00')).eq(0.2).all()
+
+
+def test_bill():
+    grid_import = np.full(48, 1000.0)
+    grid_import[18] += 4000     # Jan 31 18:00, peak price
+    grid_import[26] += 2000     # Feb 1 02:00, night price
+    pv_export = np.zeros(48)
+    pv_export[10:13] = 2000
+    tariff = tou_tariff(demand_charge=10, export_price={'PV': 0.08}, export_cap=1500)
+    bill = tariff.bill(grid_import, TIME, i_step=60, grid_export={'PV': pv_export})
+    # 1 kW base load: 8 h x 0.05 + 4 h x 0.3 + 12 h x 0.1 = 2.8 per day
+    assert bill['Import [kWh]'] == pytest.approx(48 + 4 + 2)
+    assert bill['Energy cost'] == pytest.approx(2 * 2.8 + 4 * 0.3 + 2 * 0.05)
+    # Monthly peaks: 5 kW (January), 3 kW (February)
+    assert tariff.peak_demand(grid_import, TIME) == pytest.approx([5, 3])
+    assert bill['Demand cost'] == pytest.approx((5 + 3) * 10)
+    # Export capped at 1.5 kW for 3 h
+    assert bill['Export [kWh]'] == pytest.approx(4.5)
+    assert bill['Export revenue'] == pytest.approx(4.5 * 0.08)
+    assert bill['Total'] == pytest.approx(6.9 + 80 - 0.36)
+
+
+def test_compare():
+    grid_import = np.random.default_rng(0).uniform(0, 5000, size=(48,))
+    tariffs = [tou_tariff(demand_charge=10), Tariff(import_price=0.2, billing_period='D')]
+    df = Tariff.compare(tariffs, grid_import, TIME, i_step=60)
+    for i, tariff in enumerate(tariffs):
+        bill = tariff.bill(grid_import, TIME, i_step=60)
+        assert df['Total'].iloc[i] == pytest.approx(bill['Total'])
+
+
+@pytest.mark.parametrize('mask', [np.zeros(48, dtype=bool),
+                                  np.ones(48, dtype=bool),
+                                  np.isin(np.arange(48), [0, 1, 5, 20, 21, 22, 47])])
+def test_mask_round_trip(mask):
+    schedule = BlackoutSchedule.from_mask(TIME, mask)
+    assert np.array_equal(schedule.to_mask(TIME), mask)
+
+
+def test_interval_round_trip():
+    intervals = [(pd.Timestamp('2023-01-31 03:00'), pd.Timestamp('2023-01-31 06:00')),
+                 (pd.Timestamp('2023-02-01 23:00'), pd.Timestamp('2023-02-02 00:00'))]
+    mask = BlackoutSchedule(intervals).to_mask(TIME)
+    assert mask.sum() == 4
+    assert BlackoutSchedule.from_mask(TIME, mask).intervals == intervals
+
+
+def test_mask_other_horizon():
+    # Intervals outside the time stamps are ignored, partial steps count from the next time step
+    schedule = BlackoutSchedule([(pd.Timestamp('2023-01-30'), pd.Timestamp('2023-01-31 02:00')),
+                                 (pd.Timestamp('2023-01-31 10:30'), pd.Timestamp('2023-01-31 12:00'))])
+    mask = schedule.to_mask(TIME)
+    assert np.flatnonzero(mask).tolist() == [0, 1, 11]
@@ -0,0 +1,33 @@
+import os
+import sys
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Libraries only needed for plotting, remote services or modelling (imported inside the methods)
+LAZY = ('matplotlib.pyplot', 'plotly', 'geopy', 'requests', 'pvlib', 'windpowerlib', 'lcoe')
+# Import time of the MiGUEL modules without numpy and pandas [s]
+BUDGET = 1.0
+
+SCRIPT = f"""
+import sys, json, time
+import numpy, pandas
+start = time.perf_counter()
+import operation, environment, evaluation, batch
+duration = time.perf_counter() - start
+print(json.dumps({{'duration': duration, 'loaded': [m for m in {LAZY!r} if m in sys.modules]}}))
+"""
+
+
+def import_modules():
+    result = subprocess.run([sys.executable, '-c', SCRIPT], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_lazy_imports():
+    assert import_modules()['loaded'] == []
+
+
+def test_import_time_budget():
+    assert import_modules()['duration'] < BUDGET
@@ -0,0 +1,95 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pipeline
+from pipeline import SimulationPipeline
+
+
+class RecordedEvaluation:
+    """
+    Evaluation stand-in (the LCOE calculation needs the optional lcoe package), the pipeline only decides
+    whether the stage is rerun
+    """
+
+    def __init__(self, env, operator, export=True):
+        self.env = env
+        self.operator = operator
+        self.d_rate = env.d_rate
+
+
+@pytest.fixture
+def run(make_env, monkeypatch):
+    monkeypatch.setattr(pipeline, 'Evaluation', RecordedEvaluation)
+    env = make_env(days=7, storage=2)
+    simulation = SimulationPipeline(env, export=False)
+    simulation.run()
+    assert simulation.last_run == ['re_supply', 'storage', 'dispatch', 'evaluation']
+
+    return env, simulation
+
+
+def fresh_dispatch(make_env, edit):
+    env = make_env(days=7, storage=2)
+    edit(env)
+
+    return SimulationPipeline(env, export=False).dispatch().df
+
+
+def test_unchanged(run):
+    env, simulation = run
+    operator, evaluation = simulation.operator, simulation.evaluation
+    simulation.run()
+    assert simulation.last_run == []
+    assert simulation.operator is operator and simulation.evaluation is evaluation
+
+
+def test_storage_edit(run, make_env):
+    env, simulation = run
+    re_stage = simulation.re_stage
+    env.storage[0].c = 40000
+    simulation.run()
+    assert simulation.last_run == ['storage', 'dispatch', 'evaluation']
+    assert simulation.re_stage is re_stage
+    expected = fresh_dispatch(make_env, lambda e: setattr(e.storage[0], 'c', 40000))
+    pd.testing.assert_frame_equal(simulation.operator.df, expected)
+
+
+def test_storage_policy_edit(run):
+    env, simulation = run
+    env.storage_policy = 'pro_rata'
+    simulation.run()
+    assert simulation.last_run == ['storage', 'dispatch', 'evaluation']
+
+
+def test_hydrogen_edit(run, make_env):
+    env, simulation = run
+    storage_stage = simulation.storage_stage
+    env.H2Storage[0].capacity = 80
+    simulation.run()
+    assert simulation.last_run == ['dispatch', 'evaluation']
+    assert simulation.storage_stage is storage_stage
+    # Hydrogen storage level is reset to the initial level before the dispatch
+    expected = fresh_dispatch(make_env, lambda e: setattr(e.H2Storage[0], 'capacity', 80))
+    pd.testing.assert_frame_equal(simulation.operator.df, expected)
+
+
+def test_economic_edit(run):
+    env, simulation = run
+    operator = simulation.operator
+    env.d_rate = 0.05
+    simulation.run()
+    assert simulation.last_run == ['evaluation']
+    assert simulation.operator is operator
+    assert simulation.evaluation.d_rate == 0.05
+
+
+def test_invalidate(run):
+    env, simulation = run
+    simulation.invalidate('dispatch')
+    simulation.run()
+    assert simulation.last_run == ['dispatch', 'evaluation']
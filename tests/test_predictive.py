@@ -0,0 +1,28 @@
+import time
+
+import numpy as np
+
+from operation import Operator
+
+
+def dispatch(env, strategy):
+    start = time.perf_counter()
+    operator = Operator(env=env, strategy=strategy, export=False)
+
+    return operator, time.perf_counter() - start
+
+
+def test_perfect_foresight_covers_more_load(make_env):
+    greedy, _ = dispatch(make_env(days=14), 'vectorized-greedy')
+    predictive, _ = dispatch(make_env(days=14), 'predictive')
+    assert predictive.unmet_load.energy <= greedy.unmet_load.energy + 1e-6
+    soc = predictive.df['ES_1 soc'].to_numpy(dtype=float)
+    assert np.all(soc >= 0.1 - 1e-6) and np.all(soc <= 0.95 + 1e-6)
+
+
+def test_year_runtime_against_vectorized_greedy(make_env):
+    # Year-long hourly dispatch: 365 LP windows with cached constraint matrices
+    _, greedy = min((dispatch(make_env(days=365), 'vectorized-greedy') for _ in range(2)), key=lambda r: r[1])
+    operator, predictive = dispatch(make_env(days=365), 'predictive')
+    assert operator.strategy.windows == 365
+    assert predictive < 10 * greedy + 1.0
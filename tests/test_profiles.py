@@ -0,0 +1,36 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from profiles import read_profile
+
+
+def write_profile(path, time, sep=','):
+    pd.DataFrame({'time': time, 'P [W]': np.arange(len(time), dtype=float)}).to_csv(path, sep=sep, index=False)
+
+
+def test_iso_profile_longer_than_12_days(tmp_path):
+    time = pd.date_range('2024-01-01', periods=20 * 24, freq='h')
+    write_profile(tmp_path / 'load.csv', time.strftime('%Y-%m-%d %H:%M:%S'))
+    for dayfirst in (False, True):
+        df = read_profile(path=str(tmp_path / 'load.csv'), dayfirst=dayfirst, cache_dir=str(tmp_path / 'cache'))
+        assert df.index.equals(pd.DatetimeIndex(time, name=df.index.name))
+
+
+def test_dayfirst_profile(tmp_path):
+    time = pd.date_range('2024-01-01', periods=20 * 24, freq='h')
+    write_profile(tmp_path / 'load.csv', time.strftime('%d.%m.%Y %H:%M'), sep=';')
+    df = read_profile(path=str(tmp_path / 'load.csv'), sep=';', dayfirst=True, cache=False)
+    assert df.index.equals(pd.DatetimeIndex(time, name=df.index.name))
+
+
+def test_cache_outside_source_tree(tmp_path):
+    time = pd.date_range('2024-01-01', periods=48, freq='h')
+    write_profile(tmp_path / 'load.csv', time.strftime('%Y-%m-%d %H:%M:%S'))
+    first = read_profile(path=str(tmp_path / 'load.csv'), cache_dir=str(tmp_path / 'cache'))
+    assert len(os.listdir(tmp_path / 'cache')) == 1
+    assert read_profile(path=str(tmp_path / 'load.csv'), cache_dir=str(tmp_path / 'cache')).equals(first)